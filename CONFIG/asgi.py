@@ -3,6 +3,9 @@ ASGI config for CONFIG project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+/api/notifications/stream/ (Server-Sent Events) Django-dan tısqarı, tikkeley
+ASGI dárejesinde xızmet etiledi; qalǵan barlıq soraw Django-ǵa ótedi.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -13,4 +16,12 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'CONFIG.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from core.realtime import STREAM_PATH, notification_stream  # noqa: E402 (Django setup-tan keyin)
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == STREAM_PATH:
+        return await notification_stream(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -45,19 +45,61 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.StatelessJWTAuthentication',
+    ),
+    # orjson ornatılmaǵan bolsa standart json-ǵa qaytadı (core/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
+SIMPLE_JWT = {
+    # Token-ǵa username qosıladı, request.user bazadan oqılmaydı (core/authentication.py)
+    'TOKEN_OBTAIN_SERIALIZER': 'core.authentication.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'core.authentication.ClaimsTokenRefreshSerializer',
+}
+# Logout denylist-i hám token bıykar etiw waqıtı ulıwma keshte (SHARED_CACHE_ALIAS).
+# Bazadaǵı tokens_valid_after keshte usı waqıt (sekund) saqlanadı.
+AUTH_REVOCATION_CACHE_TIMEOUT = 60
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Instagram Backend API',
     'DESCRIPTION': 'API documentation',
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
 }
+CACHES = {
+    # Process ishindegi LRU kesh. Kóp process/server bolsa ulıwma backend (Redis/Memcached) kerek.
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'default',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+# REDIS_URL berilse process-ler arasında ulıwma kesh: oqılmaǵan notification sanawıshları
+# (core/notifications.py) hám Idempotency-Key juwapları (core/idempotency.py)
+if os.environ.get('REDIS_URL'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+SHARED_CACHE_ALIAS = 'shared' if 'shared' in CACHES else 'default'
+# Post hám profil payload-larınıń keshi (core/cache.py)
+SERIALIZER_CACHE_ALIAS = 'default'
+SERIALIZER_CACHE_TIMEOUT = 5 * 60
+# Idempotency-Key boyınsha saqlanǵan juwaplar (core/idempotency.py), sekund
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+IDEMPOTENCY_LOCK_TIMEOUT = 30
 MIDDLEWARE = [
+    # PROFILING_ENABLED = False bolsa óshiriledi (core/profiling.py)
+    'core.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -90,12 +132,83 @@ WSGI_APPLICATION = 'CONFIG.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Konfiguraciya environment-ten: DB_ENGINE=postgresql bolsa PostgreSQL, áytpese SQLite.
+# DB_REPLICAS - replica-lar (útir menen): PostgreSQL ushın host-lar, SQLite ushın fayl jolları
+# (lokal test: DB_REPLICAS=db_replica.sqlite3 - eki fayl, replikaciya qolda: fayldı kóshiriw).
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite3')
+# Bir node-lı SQLite ushın ónimlilik profili (DB_SQLITE_TUNING=1): WAL (oqıwshılar jazıwshını
+# kútpeydi), pragma-lar, busy timeout hám jazıwlardıń náwbeti (core/write_queue.py).
+SQLITE_TUNING = os.environ.get('DB_SQLITE_TUNING') == '1'
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    # WAL-da NORMAL qáwipsiz: tek elektr óshse sońǵı commit-ler joǵalıwı múmkin
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-64000',  # 64 MB
+    'PRAGMA mmap_size=268435456',  # 256 MB
+    'PRAGMA temp_store=MEMORY',
+)
+
+
+def database(name, host=''):
+    if DB_ENGINE != 'postgresql':
+        config = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': name}
+        if SQLITE_TUNING:
+            config['OPTIONS'] = {
+                'init_command': ';'.join(SQLITE_PRAGMAS),
+                # Jazıw transaction-ı birden lock aladı: ortasında `database is locked` bolmaydı
+                'transaction_mode': 'IMMEDIATE',
+                # Lock bos bolǵansha kútiw (sekund)
+                'timeout': int(os.environ.get('DB_SQLITE_BUSY_TIMEOUT', 20)),
+            }
+        return config
+
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': name,
+        'USER': os.environ.get('DB_USER', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': host,
+        'PORT': os.environ.get('DB_PORT', ''),
+        # Turaqlı baylanıs (hár request ushın jańa connection ashılmaydı)
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
+    if os.environ.get('DB_POOL') == '1':
+        # psycopg 3 connection pool (Django 5.1+), CONN_MAX_AGE 0 bolıwı shárt
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+        }
+    return config
+
+
+DATABASES = {
+    'default': database(
+        os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'), os.environ.get('DB_HOST', '')
+    ),
 }
+for index, replica in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(','))):
+    if DB_ENGINE == 'postgresql':
+        config = database(DATABASES['default']['NAME'], replica.strip())
+    else:
+        config = database(BASE_DIR / replica.strip())
+    # Testlerde replica - default-tıń ózi (bólek test bazası jaratılmaydı)
+    config['TEST'] = {'MIRROR': 'default'}
+    DATABASES[f'replica{index}' if index else 'replica'] = config
+
+# Oqıw view-ları replica-dan oqıydı, jazıwdan keyin paydalanıwshı primary-ge baylanadı (core/db_routers.py)
+DATABASE_ROUTERS = ['core.db_routers.PrimaryReplicaRouter']
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 5))
+
+# Like / kommentariy jazıwları bir writer aǵımında toplap jazıladı (tek SQLite profilinde)
+WRITE_QUEUE_ENABLED = SQLITE_TUNING and DB_ENGINE != 'postgresql'
+WRITE_QUEUE_BATCH_SIZE = 100
+WRITE_QUEUE_FLUSH_INTERVAL = 0.005
+WRITE_QUEUE_TIMEOUT = 10
+# Timeout-ta baslanbaǵan jazıw bıykar etiledi, client 503 hám usı Retry-After (sekund) aladı
+WRITE_QUEUE_RETRY_AFTER = 1
 
 
 # Password validation
@@ -142,4 +255,57 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-AUTH_USER_MODEL = 'core.CustomUser'
\ No newline at end of file
+AUTH_USER_MODEL = 'core.CustomUser'
+
+
+# Feed (fan-out-on-write)
+# Jazılıwshıları bunnan kóp avtorlardıń postları feed oqılǵanda alınadı.
+
+FEED_FANOUT_FOLLOWER_LIMIT = 10000
+FEED_BACKFILL_SIZE = 50
+
+
+# Notifications
+# Notification-lar fon aǵımında (worker thread) toplap jazıladı.
+
+NOTIFICATION_QUEUE_ASYNC = True
+NOTIFICATION_BATCH_SIZE = 500
+NOTIFICATION_FLUSH_INTERVAL = 0.2
+NOTIFICATION_MAX_RETRIES = 3
+# Bir posttaǵı like/kommentariy hám follow-lar usı waqıt (sekund) ishinde bir qatarǵa jıynaladı.
+NOTIFICATION_AGGREGATION_WINDOW = 24 * 60 * 60
+
+
+# Real-time (SSE) notification stream
+# Kóp process/server bolsa ulıwma pub/sub backend kerek (mısalı Redis).
+
+REALTIME_BROKER = 'core.realtime.InMemoryBroker'
+
+
+# Image variants (thumbnail / feed / full, WebP)
+
+IMAGE_VARIANTS_ASYNC = True
+IMAGE_VARIANT_WORKERS = 2
+
+
+# Post image uploads
+# Úlken súwretler /api/uploads/ arqalı bólip júklenedi (core/uploads.py).
+
+POST_IMAGE_MAX_SIZE = 20 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40_000_000
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_SESSION_TTL = 24 * 60 * 60
+# Bir neshe server bolsa ulıwma papka kerek (None - sistema temp papkası)
+UPLOAD_PARTIAL_DIR = None
+# Multipart-taǵı usınnan úlken fayllar yadta emes, diskte (temp fayl) saqlanadı
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+
+
+# Request profiling (/api/metrics/, /api/metrics/slow/)
+# Barlıq request-lerdiń waqıtı jazıladı, PROFILING_SAMPLE_RATE bólegi ushın SQL / serializer / render.
+
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED') == '1'
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', 0.05))
+# Usınnan uzaq request-ler (sekund) /api/metrics/slow/ diziminde saqlanadı
+PROFILING_SLOW_THRESHOLD = 1.0
+PROFILING_SLOW_REQUESTS = 20
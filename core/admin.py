@@ -9,15 +9,16 @@ class CustomUserAdmin(BaseUserAdmin):
     Standart Django UserAdmin-di keńeytiw.
     Avatar, Bio, Website hám Followers maydanların qosamız.
     """
-    list_display = ('id', 'username', 'email', 'first_name', 'last_name', 'is_staff', 'date_joined')
+    list_display = ('id', 'username', 'email', 'first_name', 'last_name', 'followers_count', 'is_staff', 'date_joined')
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'groups')
     search_fields = ('username', 'first_name', 'last_name', 'email')
     ordering = ('username',)
+    readonly_fields = ('followers_count', 'following_count')
 
     fieldsets = (
         (None, {'fields': ('username', 'password')}),
         (_('Personal info'), {'fields': ('first_name', 'last_name', 'email')}),
-        (_('Profile Info'), {'fields': ('avatar', 'bio', 'website', 'followers')}),
+        (_('Profile Info'), {'fields': ('avatar', 'bio', 'website', 'followers', 'followers_count', 'following_count')}),
         (_('Permissions'), {
             'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions'),
         }),
@@ -33,20 +34,12 @@ class PostAdmin(admin.ModelAdmin):
     list_display = ('id', 'author', 'caption_preview', 'created_at', 'likes_count', 'comments_count')
     list_filter = ('created_at', 'author')
     search_fields = ('caption', 'author__username')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'likes_count', 'comments_count')
     
     def caption_preview(self, obj):
         return obj.caption[:50] + "..." if len(obj.caption) > 50 else obj.caption
     caption_preview.short_description = "Túsindirme"
 
-    def likes_count(self, obj):
-        return obj.likes.count()
-    likes_count.short_description = "Like sanı"
-
-    def comments_count(self, obj):
-        return obj.comments.count()
-    comments_count.short_description = "Pikir sanı"
-
 
 @admin.register(PostLike)
 class PostLikeAdmin(admin.ModelAdmin):
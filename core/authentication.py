@@ -0,0 +1,168 @@
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import get_shared_cache
+from .models import CustomUser
+
+# Token ishine jazılatuǵın paydalanıwshı maǵlıwmatları (request.user ushın bazaǵa barılmaydı)
+USER_CLAIMS = ('username',)
+
+# Bunnan aldın berilgen token-lar (iat) jaramsız: `valid_after`-diń keshi (bazada tokens_valid_after).
+# iat pútin sekund, sonlıqtan valid_after keyingi sekundqa dóńgeleklenedi: bıykar etiw menen
+# bir sekundta berilgen token da jaramsız (bir sekundtan keyin qayta kiriw kerek)
+REVOKED = float('inf')
+
+
+def _denied_key(jti):
+    return f'auth:denied:{jti}'
+
+
+def _valid_after_key(user_id):
+    return f'auth:valid_after:{user_id}'
+
+
+def revocation_cache_timeout():
+    return getattr(settings, 'AUTH_REVOCATION_CACHE_TIMEOUT', 60)
+
+
+def add_user_claims(token, user):
+    token['username'] = user.username
+    return token
+
+
+def ensure_not_revoked(token):
+    """
+    Token denylist-te (logout) yamasa paydalanıwshınıń barlıq token-ları bıykar etilgen
+    (parol ózgertildi, akkaunt óshirildi/bloklandı) bolsa InvalidToken.
+    Ádette bir kesh soraw (get_many), bazaǵa tek keshte `valid_after` bolmaǵanda barıladı.
+    Denylist hám `valid_after` ulıwma keshte: logout barlıq process-lerde birden kúshke kiredi.
+    """
+    cache = get_shared_cache()
+    user_id = int(token[api_settings.USER_ID_CLAIM])
+    denied_key, valid_after_key = _denied_key(token[api_settings.JTI_CLAIM]), _valid_after_key(user_id)
+    found = cache.get_many([denied_key, valid_after_key])
+    if denied_key in found:
+        raise InvalidToken("Token bıykar etilgen.")
+
+    valid_after = found.get(valid_after_key)
+    if valid_after is None:
+        user = CustomUser.objects.filter(pk=user_id).values('is_active', 'tokens_valid_after').first()
+        if user is None or not user['is_active']:
+            valid_after = REVOKED
+        elif user['tokens_valid_after'] is None:
+            valid_after = 0
+        else:
+            valid_after = math.ceil(user['tokens_valid_after'].timestamp())
+        cache.set(valid_after_key, valid_after, revocation_cache_timeout())
+
+    if token.get('iat', 0) < valid_after:
+        raise InvalidToken("Token bıykar etilgen.")
+    return user_id
+
+
+def deny_token(token):
+    """Bir token-dı (jti) ol jaramlı bolǵan waqıtqa shekem denylist-ke qosadı."""
+    remaining = int(token['exp'] - timezone.now().timestamp())
+    if remaining > 0:
+        get_shared_cache().set(_denied_key(token[api_settings.JTI_CLAIM]), True, remaining)
+
+
+def revoke_user_tokens(user_id):
+    """Paydalanıwshınıń házirge shekem berilgen barlıq token-ların bıykar etedi."""
+    CustomUser.objects.filter(pk=user_id).update(tokens_valid_after=timezone.now())
+    cache = get_shared_cache()
+    cache.delete(_valid_after_key(user_id))
+    transaction.on_commit(lambda: cache.delete(_valid_after_key(user_id)))
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    Token claims-ten jaratılǵan request.user. id, username, is_authenticated bazasız alınadı,
+    basqa atributlar (mısalı set_password, followers_count) birinshi kerek bolǵanda
+    CustomUser bir ret júklenedi.
+    View-larda modeldi ID arqalı qollanıń (author_id=request.user.id), áytpese júklenedi.
+    """
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+
+    def __init__(self, token):
+        user_id = int(token[api_settings.USER_ID_CLAIM])
+        super().__init__(lambda: CustomUser.objects.get(pk=user_id))
+        self.__dict__['claims'] = {claim: token.get(claim) for claim in USER_CLAIMS}
+        self.__dict__['user_id'] = user_id
+
+    @property
+    def id(self):
+        return self.__dict__['user_id']
+
+    pk = id
+
+    @property
+    def username(self):
+        return self.__dict__['claims']['username']
+
+    def __bool__(self):
+        return True
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, CustomUser)):
+            return self.pk == other.pk
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return self.username or str(self.pk)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Access token-niń qol tańbası (signature) jetkilikli: hár request ushın
+    CustomUser SELECT qılınbaydı. Bıykar etiw - ensure_not_revoked() (kesh).
+    Eski token-lar (claims joq) standart JWTAuthentication sıyaqlı bazadan tekseriledi.
+    """
+
+    def get_user(self, validated_token):
+        if 'username' not in validated_token:
+            return super().get_user(validated_token)
+        try:
+            ensure_not_revoked(validated_token)
+        except (KeyError, ValueError):
+            raise InvalidToken("Token-da paydalanıwshı ID-i joq.")
+        return TokenUser(validated_token)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """/api/auth/token/ - token-ǵa username qosıladı."""
+
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    /api/auth/token/refresh/ - bıykar etilgen refresh token qabıl etilmeydi,
+    jańa access token-niń claims-i bazadaǵı házirgi maǵlıwmattan alınadı.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user_id = ensure_not_revoked(refresh)
+        user = CustomUser.objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            raise exceptions.AuthenticationFailed(
+                self.error_messages['no_active_account'], 'no_active_account'
+            )
+        return {'access': str(add_user_claims(refresh.access_token, user))}
@@ -0,0 +1,214 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .db_routers import read_from
+from .models import CustomUser, Post, PostComment
+from .viewer import ViewerContext, get_viewer
+
+# Serializer maydanları ózgergende kóbeytiledi: eski payload-lar endi oqılmaydı
+SCHEMA_VERSION = 1
+
+
+def get_cache():
+    return caches[getattr(settings, 'SERIALIZER_CACHE_ALIAS', 'default')]
+
+
+def get_shared_cache():
+    """Barlıq process-ler ushın ulıwma kesh (SHARED_CACHE_ALIAS): sanawıshlar, idempotency kiltleri."""
+    return caches[getattr(settings, 'SHARED_CACHE_ALIAS', 'default')]
+
+
+def cache_timeout():
+    return getattr(settings, 'SERIALIZER_CACHE_TIMEOUT', 5 * 60)
+
+
+class SerializedCache:
+    """
+    Serializer nátiyjesiniń versiyalanǵan keshi (read-through).
+    Payload viewer-ge baylanıslı emes (viewer_field viewer-siz esaplanadı), viewer jaǵdayı
+    (is_liked / is_following) bólek keshlenip juwapta qosıladı.
+    Obyekt ózgergende versiyası kóbeytiledi (signals.py), eski payload endi oqılmaydı.
+    Tez ózgeretuǵın sanawıshlar (volatile_fields) versiyanı kóbeytpeydi: olar hár juwapta
+    bazadan alınıp payload ústine qoyıladı, sonlıqtan like basılsa da payload keshte qaladı.
+    """
+    kind = None
+    model = None
+    viewer_field = None
+    volatile_fields = ()
+
+    def version_key(self, pk):
+        return f'serialized:{self.kind}:{pk}:version'
+
+    def payload_key(self, pk, version, origin):
+        # URL-lar absolute (request host-ı menen), sonlıqtan origin de kilt bólegi
+        return f'serialized:{SCHEMA_VERSION}:{self.kind}:{pk}:{version}:{origin}'
+
+    def viewer_key(self, user_id, pk):
+        return f'viewer:{user_id}:{self.kind}:{pk}'
+
+    def load(self, ids, context):
+        """{pk: payload} - bazadan oqıp serializaciya qıladı (fast_serializers arqalı)."""
+        raise NotImplementedError
+
+    def load_viewer_state(self, viewer, ids):
+        """{pk: bool} - ViewerContext arqalı bir soraw menen."""
+        raise NotImplementedError
+
+    def versions(self, ids):
+        cache = get_cache()
+        keys = {self.version_key(pk): pk for pk in ids}
+        found = cache.get_many(keys)
+        versions = {keys[key]: version for key, version in found.items()}
+        for key, pk in keys.items():
+            if key in found:
+                continue
+            # Versiya joq (eviction): eski payload-lar menen sáykes kelmeytuǵın jańa mán
+            version = time.time_ns()
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+            versions[pk] = version
+        return versions
+
+    def load_counters(self, ids):
+        """{pk: {volatile maydan: mán}} - bir soraw (primary key boyınsha)."""
+        rows = self.model.objects.filter(pk__in=ids).values('id', *self.volatile_fields)
+        return {row.pop('id'): row for row in rows}
+
+    def get_many(self, ids, context, counters=None, versions=None):
+        """
+        Payload-lardı ids tártibinde qaytaradı (bazada joqları túsirip qaldırıladı).
+        Keshte barları ushın bazaǵa soraw jiberilmeydi, joqları bir ret júklenip keshke jazıladı.
+        counters - {pk: {volatile maydan: mán}} (view bet sorawında oqıǵan bolsa).
+        Berilmese keshten alınǵan payload-lardıń sanawıshları bir soraw menen oqıladı.
+        versions - versions(ids) nátiyjesi: ETag sol versiyalardan esaplanǵan bolsa
+        payload ta tap solardan alınadı.
+        """
+        cache = get_cache()
+        ids = list(dict.fromkeys(ids))
+        request = context.get('request')
+        origin = f'{request.scheme}://{request.get_host()}' if request is not None else ''
+
+        if versions is None:
+            versions = self.versions(ids)
+        keys = {self.payload_key(pk, versions[pk], origin): pk for pk in ids}
+        payloads = {keys[key]: payload for key, payload in cache.get_many(keys).items()}
+
+        missing = [pk for pk in ids if pk not in payloads]
+        loaded = {}
+        if missing:
+            # Viewer-siz context: is_liked / is_following ushın soraw jiberilmeydi.
+            # Keshke jazılatuǵın payload primary-den (artta qalǵan replica jańa versiya astına
+            # eski maǵlıwmattı jazıp qoymawı ushın)
+            with read_from(replica=False):
+                loaded = self.load(missing, {**context, 'viewer': ViewerContext(None)})
+            cache.set_many({
+                self.payload_key(pk, versions[pk], origin): payload for pk, payload in loaded.items()
+            }, cache_timeout())
+            payloads.update(loaded)
+
+        found = [pk for pk in ids if pk in payloads]
+        if counters is None and self.volatile_fields:
+            cached = [pk for pk in found if pk not in loaded]
+            counters = self.load_counters(cached) if cached else {}
+        state = self.viewer_state(context, found)
+        results = []
+        for pk in found:
+            payload = dict(payloads[pk])
+            if counters and pk in counters:
+                payload.update(counters[pk])
+            payload[self.viewer_field] = state.get(pk, False)
+            results.append(payload)
+        return results
+
+    def viewer_state(self, context, ids):
+        viewer = get_viewer(context)
+        if viewer.user_id is None or not ids:
+            return {}
+
+        cache = get_cache()
+        keys = {self.viewer_key(viewer.user_id, pk): pk for pk in ids}
+        state = {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+        missing = [pk for pk in ids if pk not in state]
+        if missing:
+            loaded = self.load_viewer_state(viewer, missing)
+            cache.set_many({
+                self.viewer_key(viewer.user_id, pk): value for pk, value in loaded.items()
+            }, cache_timeout())
+            state.update(loaded)
+        return state
+
+    def invalidate(self, ids):
+        """
+        Obyektlerdiń versiyasın kóbeytedi: birden (usı transaction ishindegi oqıwlar ushın)
+        hám commit-ten keyin (aradaǵı waqıtta eski maǵlıwmat keshke jazılǵan bolıwı múmkin).
+        """
+        keys = [self.version_key(pk) for pk in set(ids)]
+
+        def bump():
+            cache = get_cache()
+            for key in keys:
+                try:
+                    cache.incr(key)
+                except ValueError:
+                    # Versiya joq: keyingi oqıwda jańası jaratıladı
+                    pass
+
+        bump()
+        transaction.on_commit(bump)
+
+    def invalidate_viewer(self, user_id, ids):
+        keys = [self.viewer_key(user_id, pk) for pk in set(ids)]
+        get_cache().delete_many(keys)
+        transaction.on_commit(lambda: get_cache().delete_many(keys))
+
+
+class PostCache(SerializedCache):
+    kind = 'post'
+    viewer_field = 'is_liked'
+    model = Post
+    volatile_fields = ('likes_count', 'comments_count')
+
+    def invalidate_user(self, user_id):
+        """
+        Paydalanıwshı (author / recent_comments ishinde) payload-qa kirgen postlar:
+        username yamasa avatar ózgergende olardıń versiyası da kóbeytiledi.
+        """
+        ids = set(Post.objects.filter(author_id=user_id).values_list('id', flat=True))
+        ids.update(PostComment.objects.filter(user_id=user_id).values_list('post_id', flat=True))
+        if ids:
+            self.invalidate(ids)
+
+    def load(self, ids, context):
+        from .fast_serializers import serialize_posts
+
+        data = serialize_posts(ids, context.get('request'))
+        return {payload['id']: payload for payload in data}
+
+    def load_viewer_state(self, viewer, ids):
+        viewer.prime_posts(ids)
+        return {pk: viewer.has_liked(pk) for pk in ids}
+
+
+class UserCache(SerializedCache):
+    kind = 'user'
+    viewer_field = 'is_following'
+    model = CustomUser
+    volatile_fields = ('followers_count', 'following_count')
+
+    def load(self, ids, context):
+        from .fast_serializers import serialize_users
+
+        data = serialize_users(ids, context.get('request'))
+        return {payload['id']: payload for payload in data}
+
+    def load_viewer_state(self, viewer, ids):
+        viewer.prime_users(ids)
+        return {pk: viewer.is_following(pk) for pk in ids}
+
+
+post_cache = PostCache()
+user_cache = UserCache()
@@ -0,0 +1,39 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    """Validator bólimlerinen (updated_at, sanawıshlar, viewer, ...) kúshli ETag."""
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'"{digest}"'
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified. Validator body serializaciya qılınbastan aldın esaplanadı,
+    client-tegi nusqa ózgermegen bolsa 304 qaytadı hám body múlde jıynalmaydı.
+    """
+
+    def conditional_get(self, request, etag, last_modified, render):
+        """
+        render() - 200 juwaptı jıynaytuǵın funkciya (tek kerek bolǵanda shaqırıladı).
+        last_modified - datetime yamasa None.
+        """
+        etag = make_etag(request.user.id, request.get_full_path(), *etag)
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+
+        not_modified = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if not_modified is not None:
+            return not_modified
+
+        response = render()
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            # Juwap viewer-ge baylanıslı (is_liked / is_following)
+            response['Cache-Control'] = 'private, no-cache'
+            response['Vary'] = 'Authorization'
+        return response
@@ -0,0 +1,53 @@
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import CustomUser, Post, PostLike, PostComment
+
+Follow = CustomUser.followers.through
+
+
+def increment(queryset, field, amount=1):
+    """
+    Sanawıshtı bazada atomar (F-expression) ózgertedi. Hesh qashan 0-den túspeydi.
+    Modelde updated_at bolsa ol da jańalanadı (ETag / Last-Modified sol boyınsha esaplanadı).
+    """
+    changes = {}
+    if any(model_field.name == 'updated_at' for model_field in queryset.model._meta.concrete_fields):
+        changes['updated_at'] = timezone.now()
+    if amount >= 0:
+        changes[field] = F(field) + amount
+    else:
+        changes[field] = Greatest(F(field) + amount, 0)
+    return queryset.update(**changes)
+
+
+def count_subquery(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+            c=Count('pk')
+        ).values('c')
+    ), 0)
+
+
+COUNTERS = (
+    (Post, 'likes_count', PostLike, 'post'),
+    (Post, 'comments_count', PostComment, 'post'),
+    (CustomUser, 'followers_count', Follow, 'from_customuser'),
+    (CustomUser, 'following_count', Follow, 'to_customuser'),
+)
+
+
+def reconcile_counters():
+    """
+    Denormalizaciya qılınǵan sanawıshlardı haqıyqıy qatarlar sanı menen salıstırıp dúzetedi.
+    {'Post.likes_count': dúzetilgen qatarlar sanı, ...} qaytaradı.
+    """
+    fixed = {}
+    for model, field, related_model, related_field in COUNTERS:
+        actual = count_subquery(related_model, related_field)
+        drifted = model.objects.annotate(actual=actual).filter(~Q(**{field: F('actual')}))
+        fixed[f'{model.__name__}.{field}'] = model.objects.filter(
+            pk__in=drifted.values('pk')
+        ).update(**{field: actual})
+    return fixed
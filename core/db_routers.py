@@ -0,0 +1,104 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework import permissions
+
+# Usı request-tegi oqıwlar replica-ǵa barıwı múmkin be (ReplicaReadMixin ornatadı)
+_read_replica = ContextVar('read_replica', default=False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+@contextmanager
+def read_from(replica):
+    """Blok ishindegi oqıwlar: replica=True - replica-dan, False - primary-den."""
+    token = _read_replica.set(replica)
+    try:
+        yield
+    finally:
+        _read_replica.reset(token)
+
+
+def _sticky_key(user_id):
+    return f'db:sticky:{user_id}'
+
+
+def _sticky_cache():
+    # core.cache modelslerdi import qıladı, router bolsa settings júklengende import qılınadı
+    from .cache import get_shared_cache
+    return get_shared_cache()
+
+
+def mark_sticky(user_id):
+    """
+    Jazıwdan keyin paydalanıwshınıń oqıwları birneshe sekund primary-den boladı
+    (read-your-writes: replica artta qalsa óz like / kommentariyin kórmey qalmaydı).
+    Belgi ulıwma keshte: keyingi request basqa process-ke tússe de primary-den oqıydı.
+    """
+    _sticky_cache().set(_sticky_key(user_id), True, getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 5))
+
+
+def is_sticky(user_id):
+    return _sticky_cache().get(_sticky_key(user_id), False)
+
+
+class PrimaryReplicaRouter:
+    """
+    Jazıw hám migraciya - tek default (primary). Oqıw - replica, eger request
+    ReplicaReadMixin-niń oqıw action-ı bolsa hám replica konfiguraciya qılınǵan bolsa.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _read_replica.get():
+            replicas = replica_aliases()
+            if replicas:
+                return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replica - primary-diń kóshirmesi, obyektler bir bazadan dep esaplanadı
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaReadMixin:
+    """
+    replica_actions-taǵı GET request-ler replica-dan oqıladı (paydalanıwshı sticky bolmasa).
+    Tabıslı jazıw request-inen (POST/PATCH/DELETE) keyin paydalanıwshı sticky boladı.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            self.action in self.replica_actions
+            and request.method in permissions.SAFE_METHODS
+            and not (request.user.is_authenticated and is_sticky(request.user.id))
+        ):
+            self._replica_token = _read_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _read_replica.reset(token)
+            self._replica_token = None
+
+        # request._user - autentifikaciya qátesinde qaytadan autentifikaciya qılmaw ushın
+        user = getattr(request, '_user', None)
+        if (
+            request.method not in permissions.SAFE_METHODS
+            and response.status_code < 400
+            and user is not None
+            and user.is_authenticated
+        ):
+            mark_sticky(user.id)
+        return super().finalize_response(request, response, *args, **kwargs)
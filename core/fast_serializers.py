@@ -0,0 +1,165 @@
+"""
+Oqıw ushın tez serializerler: `.values()` qatarlarınan juwaptı tuwrıdan-tuwrı jıynaydı,
+model obyektleri hám ModelSerializer maydanları jaratılmaydı.
+Nátiyje PostSerializer / UserSerializer / NotificationSerializer menen bayt-ba-bayt birdey
+bolıwı shárt (core/tests.py tekseredi) - serializers.py ózgerse bul jer de ózgeriwi kerek.
+"""
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from rest_framework import serializers
+
+from .images import build_variant_urls
+from .models import CustomUser, Post, PostComment
+from .serializers import RECENT_COMMENTS_LIMIT
+
+# DRF formatı menen birdey (mısalı '2024-01-01T10:00:00.123456Z')
+format_datetime = serializers.DateTimeField().to_representation
+
+POST_STORAGE = Post._meta.get_field('image').storage
+AVATAR_STORAGE = CustomUser._meta.get_field('avatar').storage
+
+POST_FIELDS = (
+    'id', 'image', 'image_variants', 'caption', 'created_at', 'likes_count', 'comments_count',
+    'author_id', 'author__username', 'author__avatar', 'author__avatar_variants',
+)
+COMMENT_FIELDS = (
+    'id', 'post_id', 'text', 'created_at',
+    'user_id', 'user__username', 'user__avatar', 'user__avatar_variants',
+)
+USER_FIELDS = (
+    'id', 'username', 'first_name', 'last_name', 'avatar', 'avatar_variants',
+    'bio', 'website', 'followers_count', 'following_count',
+)
+NOTIFICATION_FIELDS = (
+    'id', 'type', 'count', 'recent_senders', 'post_id', 'post__image', 'is_read', 'created_at',
+    'sender_id', 'sender__username', 'sender__avatar', 'sender__avatar_variants',
+)
+
+
+def file_url(storage, name, request):
+    """DRF ImageField.to_representation menen birdey."""
+    if not name:
+        return None
+    url = storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def user_mini(row, prefix, request):
+    """UserMiniSerializer: prefix - 'author__', 'user__' yamasa 'sender__'."""
+    user_id = row[prefix[:-2] + '_id']
+    avatar = row[prefix + 'avatar']
+    return {
+        'id': user_id,
+        'username': row[prefix + 'username'],
+        'avatar': file_url(AVATAR_STORAGE, avatar, request),
+        'avatar_variants': build_variant_urls(
+            CustomUser, user_id, avatar, row[prefix + 'avatar_variants'], request
+        ),
+    }
+
+
+def recent_comments(post_ids, limit=RECENT_COMMENTS_LIMIT):
+    """{post_id: [kommentariy qatarları]} - pútkil bet ushın bir soraw (ROW_NUMBER() OVER post_id)."""
+    rows = PostComment.objects.filter(post_id__in=post_ids).annotate(
+        row_number=Window(
+            RowNumber(),
+            partition_by=F('post_id'),
+            order_by=[F('created_at').desc(), F('id').desc()],
+        )
+    ).filter(row_number__lte=limit).order_by(
+        '-created_at', '-id'
+    ).values(*COMMENT_FIELDS)
+
+    comments = {}
+    for row in rows:
+        comments.setdefault(row['post_id'], []).append(row)
+    return comments
+
+
+def serialize_posts(ids, request=None, viewer=None, comments_limit=RECENT_COMMENTS_LIMIT):
+    """
+    PostSerializer(many=True) nátiyjesi, ids tártibinde. Bet ushın eki soraw:
+    postlar (avtorı menen) hám sońǵı kommentariyler.
+    """
+    rows = {row['id']: row for row in Post.objects.filter(pk__in=ids).values(*POST_FIELDS)}
+    ids = [pk for pk in ids if pk in rows]
+    comments = recent_comments(ids, comments_limit) if ids else {}
+    if viewer is not None:
+        viewer.prime_posts(ids)
+
+    results = []
+    for pk in ids:
+        row = rows[pk]
+        results.append({
+            'id': pk,
+            'author': user_mini(row, 'author__', request),
+            'image': file_url(POST_STORAGE, row['image'], request),
+            'image_variants': build_variant_urls(Post, pk, row['image'], row['image_variants'], request),
+            'caption': row['caption'],
+            'created_at': format_datetime(row['created_at']),
+            'likes_count': row['likes_count'],
+            'comments_count': row['comments_count'],
+            'is_liked': viewer.has_liked(pk) if viewer is not None else False,
+            # PostSerializer kommentariylerdi request-siz serializaciya qıladı (salıstırmalı URL)
+            'recent_comments': [
+                {
+                    'id': comment['id'],
+                    'user': user_mini(comment, 'user__', None),
+                    'text': comment['text'],
+                    'created_at': format_datetime(comment['created_at']),
+                }
+                for comment in comments.get(pk, ())
+            ],
+        })
+    return results
+
+
+def serialize_users(ids, request=None, viewer=None):
+    """UserSerializer(many=True) nátiyjesi, ids tártibinde."""
+    rows = {row['id']: row for row in CustomUser.objects.filter(pk__in=ids).values(*USER_FIELDS)}
+    ids = [pk for pk in ids if pk in rows]
+    if viewer is not None:
+        viewer.prime_users(ids)
+
+    results = []
+    for pk in ids:
+        row = rows[pk]
+        results.append({
+            'id': pk,
+            'username': row['username'],
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+            'avatar': file_url(AVATAR_STORAGE, row['avatar'], request),
+            'avatar_variants': build_variant_urls(
+                CustomUser, pk, row['avatar'], row['avatar_variants'], request
+            ),
+            'bio': row['bio'],
+            'website': row['website'],
+            'followers_count': row['followers_count'],
+            'following_count': row['following_count'],
+            'is_following': viewer.is_following(pk) if viewer is not None else False,
+        })
+    return results
+
+
+def notification_rows(queryset):
+    return queryset.values(*NOTIFICATION_FIELDS)
+
+
+def serialize_notifications(rows, request=None):
+    """NotificationSerializer(many=True) nátiyjesi notification_rows() qatarlarınan."""
+    return [
+        {
+            'id': row['id'],
+            'type': row['type'],
+            'sender': user_mini(row, 'sender__', request),
+            'count': row['count'],
+            'recent_senders': row['recent_senders'],
+            'post': row['post_id'],
+            # NotificationSerializer.get_post_image - salıstırmalı URL
+            'post_image': POST_STORAGE.url(row['post__image']) if row['post__image'] else None,
+            'is_read': row['is_read'],
+            'created_at': format_datetime(row['created_at']),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,138 @@
+from django.conf import settings
+from django.db.models import F
+
+from .models import CustomUser, Post, FeedItem
+
+Follow = CustomUser.followers.through
+
+# Jazılıwshıları bunnan kóp bolǵan avtorlardıń postları tarqatılmaydı,
+# olar feed oqılǵanda tikkeley alınadı (hybrid).
+FANOUT_FOLLOWER_LIMIT = getattr(settings, 'FEED_FANOUT_FOLLOWER_LIMIT', 10000)
+BACKFILL_SIZE = getattr(settings, 'FEED_BACKFILL_SIZE', 50)
+BATCH_SIZE = 1000
+
+
+def is_popular(user):
+    return user.followers_count > FANOUT_FOLLOWER_LIMIT
+
+
+def popular_following_ids(user):
+    """
+    Paydalanıwshı jazılǵan "populyar" avtorlardıń ID-leri.
+    Olardıń postları FeedItem-ge jazılmaydı.
+    """
+    return list(
+        CustomUser.objects.filter(
+            followers__id=user.id, followers_count__gt=FANOUT_FOLLOWER_LIMIT
+        ).values_list('id', flat=True)
+    )
+
+
+def fan_out_post(post):
+    """
+    Jańa posttı avtordıń barlıq jazılıwshılarınıń lentasına qosadı.
+    """
+    if is_popular(post.author):
+        return
+
+    follower_ids = Follow.objects.filter(
+        from_customuser_id=post.author_id
+    ).values_list('to_customuser_id', flat=True)
+
+    FeedItem.objects.bulk_create(
+        (FeedItem(owner_id=follower_id, post_id=post.id, created_at=post.created_at)
+         for follower_id in follower_ids.iterator()),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_author(owner, author):
+    """
+    Follow qılınǵanda avtordıń sońǵı postların lentaǵa qosadı.
+    """
+    if is_popular(author):
+        return
+
+    posts = Post.objects.filter(author_id=author.id).order_by('-created_at').values_list(
+        'id', 'created_at'
+    )[:BACKFILL_SIZE]
+
+    FeedItem.objects.bulk_create(
+        [FeedItem(owner_id=owner.id, post_id=post_id, created_at=created_at)
+         for post_id, created_at in posts],
+        ignore_conflicts=True,
+    )
+
+
+def backfill_followers(author, exclude_owner_id=None):
+    """
+    Avtordıń sońǵı postların barlıq jazılıwshılarınıń lentasına qosadı.
+    """
+    posts = list(Post.objects.filter(author_id=author.id).order_by('-created_at').values_list(
+        'id', 'created_at'
+    )[:BACKFILL_SIZE])
+    follower_ids = Follow.objects.filter(
+        from_customuser_id=author.id
+    ).exclude(to_customuser_id=exclude_owner_id).values_list('to_customuser_id', flat=True)
+
+    FeedItem.objects.bulk_create(
+        (FeedItem(owner_id=follower_id, post_id=post_id, created_at=created_at)
+         for follower_id in follower_ids.iterator() for post_id, created_at in posts),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def followers_decreased(author_ids, amount, exclude_owner_id=None):
+    """
+    followers_count `amount`-qa kemeygennen keyin shaqırıladı. Populyarlıqtan shıqqan avtordıń
+    populyar waqıtta jazǵan postları tarqatılmaǵan edi - olar endi FeedItem arqalı oqıladı,
+    sonlıqtan jazılıwshılarınıń lentası toltırıladı.
+    """
+    authors = CustomUser.objects.filter(
+        pk__in=author_ids,
+        followers_count__lte=FANOUT_FOLLOWER_LIMIT,
+        followers_count__gt=FANOUT_FOLLOWER_LIMIT - amount,
+    ).only('id')
+    for author in authors:
+        backfill_followers(author, exclude_owner_id)
+
+
+def trim_author(owner, author):
+    """
+    Unfollow qılınǵanda avtordıń postların lentadan óshiredi.
+    """
+    FeedItem.objects.filter(owner_id=owner.id, post__author_id=author.id).delete()
+
+
+def feed_sources(user, fields=()):
+    """
+    Feed derekleri - (post_id, created_at, *fields) qatarları, bir gilt (created_at, post_id) menen:
+    tarqatılǵan postlar (FeedItem, feeditem_owner_created_idx) hám hár populyar avtordıń postları
+    (post_author_created_idx). FeedPagination olardı birlestiredi, hár biri indeks diapazonı.
+    Avtor populyar bolǵanǵa shekem tarqatılǵan postlar eki derekte de bar - birlestiriwde
+    bir ret alınadı.
+    fields - Post maydanları (sanawıshlar, updated_at).
+    """
+    sources = [
+        FeedItem.objects.filter(owner_id=user.id).values(
+            'post_id', 'created_at', **{field: F(f'post__{field}') for field in fields}
+        )
+    ]
+    for author_id in popular_following_ids(user):
+        sources.append(
+            Post.objects.filter(author_id=author_id).values('created_at', *fields, post_id=F('id'))
+        )
+    return sources
+
+
+def rebuild_feed(user):
+    """
+    Paydalanıwshınıń lentasın noldan qayta jıynaydı.
+    """
+    FeedItem.objects.filter(owner_id=user.id).delete()
+
+    authors = CustomUser.objects.filter(followers__id=user.id).only('id', 'followers_count')
+    for author in authors:
+        backfill_author(user, author)
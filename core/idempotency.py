@@ -0,0 +1,66 @@
+"""
+Idempotency-Key header: klient request-ti qayta jiberse (timeout, tarmaq úzilisi) view
+qayta orınlanbaydı, birinshi juwap keshten qaytarıladı (Idempotent-Replayed: true).
+Kilt paydalanıwshı, method hám path menen baylanıslı. Kiltler ulıwma keshte (SHARED_CACHE_ALIAS):
+REDIS_URL berilmese ol process ishindegi LocMem - ol waqıtta kepillik tek bir process ushın.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .cache import get_shared_cache
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def _cache_key(request, key):
+    digest = hashlib.sha256(f'{request.method}:{request.path}:{key}'.encode()).hexdigest()
+    return f'idempotency:{request.user.id}:{digest}'
+
+
+def idempotent(view):
+    """
+    Action-dı Idempotency-Key boyınsha qorǵaydı (header bolmasa ádettegidey orınlanadı).
+    Sol kilt penen request ele orınlanıp atırǵan bolsa 409 qaytarıladı.
+    5xx juwaplar saqlanbaydı - klient qayta urınıwı múmkin.
+    """
+    @wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            raise ValidationError({HEADER: f"Eń kóp {MAX_KEY_LENGTH} belgi."})
+
+        cache = get_shared_cache()
+        cache_key = _cache_key(request, key)
+        stored = cache.get(cache_key)
+        if stored is not None:
+            response = Response(stored['data'], status=stored['status'])
+            response['Idempotent-Replayed'] = 'true'
+            return response
+
+        lock_key = f'{cache_key}:lock'
+        if not cache.add(lock_key, 1, timeout=getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 30)):
+            return Response(
+                {"detail": "Usı Idempotency-Key menen request ele orınlanıp atır."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        try:
+            response = view(self, request, *args, **kwargs)
+            if response.status_code < 500:
+                cache.set(
+                    cache_key,
+                    {'status': response.status_code, 'data': response.data},
+                    timeout=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60),
+                )
+        finally:
+            cache.delete(lock_key)
+        return response
+
+    return wrapper
@@ -0,0 +1,165 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .cache import post_cache, user_cache
+
+logger = logging.getLogger(__name__)
+
+# Nusqa atı -> eń úlken tárep (px)
+VARIANTS = {
+    'post': {'thumbnail': 150, 'feed': 640, 'full': 1080},
+    'avatar': {'small': 40, 'thumbnail': 150},
+}
+VARIANT_FORMAT = 'WEBP'
+VARIANT_EXTENSION = 'webp'
+VARIANT_QUALITY = 80
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'IMAGE_VARIANT_WORKERS', 2),
+                    thread_name_prefix='image-variants',
+                )
+    return _executor
+
+
+def _target(model):
+    """(kind, image field atı, variants field atı)"""
+    from .models import Post
+    if issubclass(model, Post):
+        return 'post', 'image', 'image_variants'
+    return 'avatar', 'avatar', 'avatar_variants'
+
+
+def variant_name(source_name, variant):
+    stem = os.path.splitext(os.path.basename(source_name))[0]
+    return f'variants/{os.path.dirname(source_name)}/{stem}_{variant}.{VARIANT_EXTENSION}'
+
+
+def render_variant(image, size):
+    variant = image.copy()
+    variant.thumbnail((size, size), Image.LANCZOS)
+    if variant.mode not in ('RGB', 'RGBA'):
+        variant = variant.convert('RGBA' if 'A' in variant.getbands() else 'RGB')
+    buffer = io.BytesIO()
+    variant.save(buffer, VARIANT_FORMAT, quality=VARIANT_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def generate_variants(model, pk):
+    """
+    Súwrettiń barlıq nusqaların (WebP) jaratıp, variants maydanına jazadı.
+    Qátelik bolsa {'source': ..., 'failed': True} jazıladı, qayta urınılmaydı.
+    """
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return None
+    kind, image_field, variants_field = _target(model)
+    file = getattr(instance, image_field)
+    if not file:
+        return None
+
+    variants = {'source': file.name}
+    try:
+        with file.open('rb') as source:
+            image = ImageOps.exif_transpose(Image.open(source))
+            image.load()
+        for variant, size in VARIANTS[kind].items():
+            variants[variant] = file.storage.save(
+                variant_name(file.name, variant), ContentFile(render_variant(image, size))
+            )
+    except Exception:
+        logger.exception("%s %s ushın súwret nusqaları jaratılmadı.", model.__name__, pk)
+        variants = {'source': file.name, 'failed': True}
+
+    # Tek súwret ózgermegen bolsa jazamız
+    model.objects.filter(pk=pk, **{image_field: file.name}).update(**{variants_field: variants})
+    if kind == 'post':
+        post_cache.invalidate([pk])
+    else:
+        user_cache.invalidate([pk])
+        post_cache.invalidate_user(pk)
+    return variants
+
+
+def _run(model, pk):
+    try:
+        generate_variants(model, pk)
+    finally:
+        with _pending_lock:
+            _pending.discard((model, pk))
+        close_old_connections()
+
+
+def schedule_variants(instance):
+    """
+    Nusqalardı fon aǵımlar pulında (thread pool) jaratıwdı rejelestiredi.
+    IMAGE_VARIANTS_ASYNC = False bolsa birden (sinxron) jaratadı.
+    Sinxron rejimde jańa variants sózligin qaytaradı.
+    """
+    return _schedule(type(instance), instance.pk)
+
+
+def _schedule(model, pk):
+    if not getattr(settings, 'IMAGE_VARIANTS_ASYNC', True):
+        return generate_variants(model, pk)
+
+    def submit():
+        with _pending_lock:
+            if (model, pk) in _pending:
+                return
+            _pending.add((model, pk))
+        _get_executor().submit(_run, model, pk)
+
+    transaction.on_commit(submit)
+    return None
+
+
+def variant_urls(instance, request=None):
+    """
+    {'thumbnail': url, 'feed': url, ...}. Jaratılmaǵan nusqa ornına original URL
+    qaytadı hám nusqa fon rejiminde jaratıladı (lazy).
+    """
+    model = type(instance)
+    kind, image_field, variants_field = _target(model)
+    return build_variant_urls(
+        model, instance.pk, getattr(instance, image_field).name,
+        getattr(instance, variants_field), request,
+    )
+
+
+def build_variant_urls(model, pk, name, variants, request=None):
+    """variant_urls()-diń model obyektisiz (`.values()` qatarları ushın) nusqası."""
+    if not name:
+        return None
+    kind, image_field, variants_field = _target(model)
+    storage = model._meta.get_field(image_field).storage
+
+    variants = variants or {}
+    if variants.get('source') != name:
+        variants = _schedule(model, pk) or {}
+
+    original = storage.url(name)
+    urls = {}
+    for variant in VARIANTS[kind]:
+        name = variants.get(variant)
+        url = storage.url(name) if name else original
+        urls[variant] = request.build_absolute_uri(url) if request is not None else url
+    return urls
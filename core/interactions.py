@@ -0,0 +1,134 @@
+"""
+Like hám follow jazıwları: hár biri bir shártli SQL jazıw (INSERT ... ON CONFLICT DO NOTHING
+yamasa DELETE ... RETURNING). Parallel eki request bir qatardı eki ret qosa/óshire almaydı,
+IntegrityError bolmaydı. Sanawısh, notification hám kesh tek qatar haqıyqatında ózgergende
+jańalanadı. Jazıw ORM-nen ótpeydi, sonlıqtan signals.py bul jerde iske túspeydi -
+olardıń isi usı jerde anıq orınlanadı.
+RETURNING: PostgreSQL yamasa SQLite 3.35+.
+"""
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from . import feed as feed_service
+from .cache import post_cache, user_cache
+from .counters import increment
+from .models import CustomUser, Post, PostLike
+from .notifications import dispatcher
+
+Follow = CustomUser.followers.through
+TOGGLE_ATTEMPTS = 3
+
+
+def _insert(model, values, unique_fields):
+    """Qatardı qosadı, bar bolsa hesh nárse qılmaydı. Qatar qosıldı ma?"""
+    using = router.db_for_write(model)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    opts = model._meta
+    fields = [opts.get_field(name) for name in values]
+    params = [field.get_db_prep_save(values[field.name], connection) for field in fields]
+    sql = 'INSERT INTO {} ({}) VALUES ({}) ON CONFLICT ({}) DO NOTHING RETURNING {}'.format(
+        quote(opts.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+        ', '.join(quote(opts.get_field(name).column) for name in unique_fields),
+        quote(opts.pk.column),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone() is not None
+
+
+def _delete(model, **filters):
+    """Qatardı óshiredi. Qatar bar edi me?"""
+    using = router.db_for_write(model)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    opts = model._meta
+    fields = [opts.get_field(name) for name in filters]
+    sql = 'DELETE FROM {} WHERE {} RETURNING {}'.format(
+        quote(opts.db_table),
+        ' AND '.join(f'{quote(field.column)} = %s' for field in fields),
+        quote(opts.pk.column),
+    )
+    params = [field.get_db_prep_value(filters[field.name], connection) for field in fields]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone() is not None
+
+
+def _like_changed(user_id, post_id, amount):
+    increment(Post.objects.filter(pk=post_id), 'likes_count', amount)
+    post_cache.invalidate_viewer(user_id, [post_id])
+
+
+def like(user_id, post):
+    """Like basadı. Jańa like bolsa True, aldın basılǵan bolsa False."""
+    with transaction.atomic(using=router.db_for_write(PostLike)):
+        created = _insert(
+            PostLike,
+            {'user': user_id, 'post': post.id, 'created_at': timezone.now()},
+            unique_fields=('user', 'post'),
+        )
+        if created:
+            _like_changed(user_id, post.id, 1)
+            dispatcher.emit(sender_id=user_id, receiver_id=post.author_id, type='like', post_id=post.id)
+    return created
+
+
+def unlike(user_id, post):
+    """Like-tı alıp taslaydı. Like bar bolsa True."""
+    with transaction.atomic(using=router.db_for_write(PostLike)):
+        deleted = _delete(PostLike, user=user_id, post=post.id)
+        if deleted:
+            _like_changed(user_id, post.id, -1)
+    return deleted
+
+
+def toggle_like(user_id, post):
+    """
+    Eski POST toggle: like bar bolsa aladı, bolmasa basadı. Sońǵı jaǵdaydı qaytaradı.
+    Bir transaction ishinde. Parallel toggle aradaǵı jaǵdaydı ózgertse (óshiretuǵın qatar joq,
+    biraq qosıw conflict berdi) onıń nátiyjesi kórinip turǵanda qayta urınıladı.
+    """
+    with transaction.atomic(using=router.db_for_write(PostLike)):
+        for _ in range(TOGGLE_ATTEMPTS):
+            if unlike(user_id, post):
+                return False
+            if like(user_id, post):
+                return True
+    # Like bar (conflict) - jaǵday: basılǵan
+    return True
+
+
+def _follow_changed(follower_id, followee_id, amount):
+    increment(CustomUser.objects.filter(pk=followee_id), 'followers_count', amount)
+    increment(CustomUser.objects.filter(pk=follower_id), 'following_count', amount)
+    user_cache.invalidate_viewer(follower_id, [followee_id])
+
+
+def follow(user, target):
+    """user target-qa jazıladı (lentaǵa postları qosıladı). Jańa jazılıw bolsa True."""
+    with transaction.atomic(using=router.db_for_write(Follow)):
+        # from_customuser - jazılıp atırǵan adam (target), to_customuser - jazılıwshı
+        created = _insert(
+            Follow,
+            {'from_customuser': target.id, 'to_customuser': user.id},
+            unique_fields=('from_customuser', 'to_customuser'),
+        )
+        if created:
+            _follow_changed(user.id, target.id, 1)
+            dispatcher.emit(sender_id=user.id, receiver_id=target.id, type='follow')
+            feed_service.backfill_author(user, target)
+    return created
+
+
+def unfollow(user, target):
+    """Jazılıwdı bıykar etedi (lentadan postları óshiriledi). Jazılıw bar bolsa True."""
+    with transaction.atomic(using=router.db_for_write(Follow)):
+        deleted = _delete(Follow, from_customuser=target.id, to_customuser=user.id)
+        if deleted:
+            _follow_changed(user.id, target.id, -1)
+            feed_service.trim_author(user, target)
+            feed_service.followers_decreased([target.id], 1)
+    return deleted
@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from core.fast_serializers import notification_rows, serialize_notifications, serialize_posts
+from core.models import Notification, Post
+from core.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = "Standart JSONRenderer menen ORJSONRenderer-di feed hám notification payload-larında salıstıradı."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=50, help="Bir payload-taǵı obyektler sanı.")
+        parser.add_argument('--repeat', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/api/posts/feed/', SERVER_NAME='localhost')
+        ids = list(Post.objects.order_by('-created_at').values_list('id', flat=True)[:options['size']])
+        rows = notification_rows(Notification.objects.order_by('-created_at')[:options['size']])
+        payloads = {
+            'feed': {'next': None, 'previous': None, 'results': serialize_posts(ids, request)},
+            'notifications': {'next': None, 'previous': None, 'results': serialize_notifications(rows, request)},
+        }
+
+        for name, payload in payloads.items():
+            if not payload['results']:
+                self.stdout.write(self.style.WARNING(f"{name}: bazada maǵlıwmat joq, ótkerip jiberildi."))
+                continue
+
+            timings = {}
+            outputs = {}
+            for renderer in (JSONRenderer(), ORJSONRenderer()):
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    outputs[type(renderer).__name__] = renderer.render(payload)
+                timings[type(renderer).__name__] = (time.perf_counter() - started) / options['repeat']
+
+            same = len(set(outputs.values())) == 1
+            baseline, fast = timings['JSONRenderer'], timings['ORJSONRenderer']
+            self.stdout.write(
+                f"{name} ({len(payload['results'])} obyekt, {len(outputs['JSONRenderer'])} bayt): "
+                f"JSONRenderer {baseline * 1e6:.0f} µs, ORJSONRenderer {fast * 1e6:.0f} µs, "
+                f"x{baseline / fast:.1f}, birdey: {'awa' if same else 'joq'}"
+            )
@@ -0,0 +1,113 @@
+import random
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from core.models import CustomUser, Post, PostLike
+from core.notifications import dispatcher
+from core.write_queue import write_queue
+
+PREFIX = 'bench_sqlite_'
+
+
+def percentile(values, p):
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100)[p - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "SQLite-te bir waqıtta like toggle (jazıw) hám post dizimi (oqıw) aǵımların iske túsiredi, "
+        "oqıw kútiwi hám `database is locked` qátelerin kórsetedi. "
+        "Salıstırıw ushın DB_SQLITE_TUNING=1 menen hám onısız iske túsiriń."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=5.0, help="Sekund.")
+        parser.add_argument('--posts', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        self.stdout.write(
+            f"journal_mode={journal_mode}, write_queue={'on' if write_queue.enabled else 'off'}, "
+            f"readers={options['readers']}, writers={options['writers']}, {options['duration']} s"
+        )
+
+        users, post_ids = self.seed(options['writers'], options['posts'])
+        try:
+            stats = self.run(users, post_ids, options)
+        finally:
+            write_queue.flush()
+            dispatcher.flush()
+            CustomUser.objects.filter(username__startswith=PREFIX).delete()
+
+        for name, (timings, errors) in stats.items():
+            rate = len(timings) / options['duration']
+            self.stdout.write(
+                f"{name}: {len(timings)} ({rate:.0f}/s), p50 {percentile(timings, 50) * 1000:.1f} ms, "
+                f"p95 {percentile(timings, 95) * 1000:.1f} ms, max {max(timings, default=0) * 1000:.1f} ms, "
+                f"locked qáteleri: {errors}"
+            )
+
+    def seed(self, writers, posts):
+        CustomUser.objects.filter(username__startswith=PREFIX).delete()
+        author = CustomUser.objects.create_user(f'{PREFIX}author')
+        users = [CustomUser.objects.create_user(f'{PREFIX}{i}') for i in range(writers)]
+        Post.objects.bulk_create([
+            Post(author=author, image='posts/benchmark.jpg', caption=f'benchmark {i}') for i in range(posts)
+        ])
+        post_ids = list(Post.objects.filter(author=author).values_list('id', flat=True))
+        return users, post_ids
+
+    def run(self, users, post_ids, options):
+        stop = threading.Event()
+        stats = {'oqıw': ([], [0]), 'jazıw': ([], [0])}
+
+        def measure(name, operation):
+            timings, errors = stats[name]
+            try:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        operation()
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        errors[0] += 1
+                        continue
+                    timings.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        def read():
+            list(Post.objects.order_by('-created_at').values('id', 'likes_count', 'comments_count')[:20])
+
+        def write(user):
+            def toggle():
+                post_id = random.choice(post_ids)
+                deleted, _ = PostLike.objects.filter(user=user, post_id=post_id).delete()
+                if not deleted:
+                    PostLike.objects.create(user=user, post_id=post_id)
+            return lambda: write_queue.run(toggle)
+
+        threads = [
+            threading.Thread(target=measure, args=('oqıw', read)) for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=measure, args=('jazıw', write(user))) for user in users
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        return {name: (timings, errors[0]) for name, (timings, errors) in stats.items()}
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.uploads import clear_expired_uploads
+
+
+class Command(BaseCommand):
+    help = "Waqtı ótken (UPLOAD_SESSION_TTL) tamamlanbaǵan upload-lardı óshiredi."
+
+    def handle(self, *args, **options):
+        total = clear_expired_uploads()
+        self.stdout.write(self.style.SUCCESS(f"{total} upload óshirildi."))
@@ -0,0 +1,348 @@
+import bisect
+import io
+import itertools
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from core.feed import BACKFILL_SIZE, FANOUT_FOLLOWER_LIMIT
+from core.images import VARIANTS, render_variant, variant_name
+from core.models import CustomUser, FeedItem, Notification, NotificationSender, Post, PostComment, PostLike
+from core.notifications import DEDUPLICATED_TYPES, RECENT_SENDERS_LIMIT
+
+Follow = CustomUser.followers.through
+POST_STORAGE = Post._meta.get_field('image').storage
+
+WORDS = (
+    'sálem', 'dúnya', 'teńiz', 'quyash', 'tawlar', 'dala', 'bazar', 'shay', 'kitap', 'muzıka',
+    'sport', 'futbol', 'saparlar', 'awıl', 'qala', 'bahár', 'gúz', 'qıs', 'jaz', 'ásirler',
+    'dos', 'shańaraq', 'tabıyat', 'foto', 'kofe', 'kesh', 'tań', 'jol', 'dáriya', 'aspan',
+)
+FIRST_NAMES = ('Aydos', 'Berdaq', 'Gúlnara', 'Dilnoza', 'Erlan', 'Jamila', 'Zarina', 'Islam', 'Kamila', 'Marat')
+LAST_NAMES = ('Abdullaev', 'Berdimuratov', 'Qurbanova', 'Saparov', 'Tájieva', 'Utepov', 'Yusupova', 'Orazov')
+PASSWORD = 'Qazwsx987!'
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """bulk_create-te created_at / updated_at qolda beriliwi ushın auto_now(_add)-tı waqtınsha óshiredi."""
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+class PowerLaw:
+    """Zipf bólistiriw: rank-ı kishi (populyar) elementler kóbirek tańlanadı."""
+
+    def __init__(self, items, exponent, rng):
+        self.items = list(items)
+        rng.shuffle(self.items)
+        self.cumulative = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, len(self.items) + 1)))
+        self.rng = rng
+
+    def choice(self):
+        point = self.rng.random() * self.cumulative[-1]
+        return self.items[bisect.bisect_left(self.cumulative, point)]
+
+
+class Senders:
+    """
+    Bir top ishindegi aggregation toparları: (receiver, type, post) -> [sanı, jiberiwshiler, sońǵı waqıt].
+    Top jazılǵannan keyin toparlar notification bolıp jazıladı hám tazalanadı (Command.flush_notifications),
+    sonlıqtan yadta tek bir toptıń toparları turadı.
+    """
+
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, key, sender_id, created_at):
+        if key[0] == sender_id:
+            return
+        group = self.groups.setdefault(key, [0, {}, created_at])
+        group[0] += 1
+        # Sońǵı jiberiwshi aqırında
+        group[1].pop(sender_id, None)
+        group[1][sender_id] = True
+        group[2] = max(group[2], created_at)
+
+    def pop(self):
+        groups, self.groups = self.groups, {}
+        return groups
+
+
+class Command(BaseCommand):
+    help = (
+        "Offlayn sintetik maǵlıwmat: paydalanıwshılar, power-law follow grafı, lokal jaratılǵan "
+        "súwretli postlar, like, kommentariy hám notification-lar (bulk_create, toplap). "
+        f"Barlıq paydalanıwshılardıń paroli: {PASSWORD}"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--posts', type=float, default=5, help="Bir paydalanıwshıǵa ortasha post.")
+        parser.add_argument('--follows', type=float, default=20, help="Bir paydalanıwshıǵa ortasha follow.")
+        parser.add_argument('--likes', type=float, default=30, help="Bir paydalanıwshıǵa ortasha like.")
+        parser.add_argument('--comments', type=float, default=5, help="Bir paydalanıwshıǵa ortasha kommentariy.")
+        parser.add_argument('--images', type=int, default=40, help="Postlar ortaq qollanatuǵın súwretler sanı.")
+        parser.add_argument('--days', type=int, default=90, help="Postlar usı kúnler ishinde tarqatıladı.")
+        parser.add_argument('--prefix', default='user', help="Username prefiksi: <prefix><n>.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--skip-feeds', action='store_true', help="Feed lentaların (FeedItem) jıynamaw.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.since = self.now - timedelta(days=options['days'])
+        self.notifications = Senders()
+        self.notification_count = 0
+
+        with explicit_timestamps(CustomUser, Post, PostLike, PostComment, Notification):
+            user_ids = self.step('paydalanıwshılar', self.create_users, options['users'], options['prefix'])
+            popularity = PowerLaw(user_ids, 1.1, self.rng)
+            self.step('follow', self.create_follows, user_ids, popularity, options['follows'])
+            images = self.step('súwretler', self.create_images, options['images'])
+            post_ids = self.step('postlar', self.create_posts, popularity, images, int(len(user_ids) * options['posts']))
+            if post_ids:
+                posts = PowerLaw(post_ids, 0.9, self.rng)
+                self.step('like', self.create_likes, user_ids, posts, options['likes'])
+                self.step('kommentariy', self.create_comments, user_ids, posts, int(len(user_ids) * options['comments']))
+            self.stdout.write(f"notification: {self.notification_count}")
+            if not options['skip_feeds']:
+                self.step('feed lentaları', self.create_feeds)
+
+        self.step('sanawıshlar', call_command, 'reconcile_counters', stdout=io.StringIO())
+        self.step('izlew indeksi', call_command, 'rebuild_search_index', stdout=io.StringIO())
+        self.stdout.write(self.style.SUCCESS("Maǵlıwmat jaratıldı."))
+
+    def step(self, name, func, *args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        if isinstance(result, int):
+            total = f"{result} "
+        else:
+            total = f"{len(result)} " if isinstance(result, (list, dict)) else ''
+        self.stdout.write(f"{name}: {total}{time.perf_counter() - started:.1f} s")
+        return result
+
+    def random_time(self, after=None):
+        start = max(after or self.since, self.since)
+        return start + (self.now - start) * self.rng.random()
+
+    def words(self, low, high):
+        return ' '.join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    def insert(self, model, objects, on_batch=None, **kwargs):
+        """
+        Toplap bulk_create, hár top óz transaction-ında. Jazılǵan obyektler sanın qaytaradı -
+        obyektler yadta saqlanbaydı, kerek bolsa on_batch(top) hár toptan keyin shaqırıladı.
+        """
+        total = 0
+        for batch in batched(objects, self.batch_size):
+            with transaction.atomic():
+                created = model.objects.bulk_create(batch, batch_size=self.batch_size, **kwargs)
+                if on_batch is not None:
+                    on_batch(created)
+            total += len(created)
+        return total
+
+    def create_users(self, count, prefix):
+        # Parol xeshi bir ret esaplanadı (hár paydalanıwshı ushın PBKDF2 júdá áste)
+        password = make_password(PASSWORD)
+        start = CustomUser.objects.filter(username__startswith=prefix).count()
+        users = (
+            CustomUser(
+                username=f'{prefix}{start + i}',
+                password=password,
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                bio=self.words(0, 8),
+                date_joined=(created_at := self.random_time()),
+                created_at=created_at,
+                updated_at=created_at,
+            )
+            for i in range(count)
+        )
+        self.joined = {}
+
+        def created(batch):
+            for user in batch:
+                self.joined[user.pk] = user.created_at
+
+        self.insert(CustomUser, users, on_batch=created)
+        return list(self.joined)
+
+    def create_follows(self, user_ids, popularity, average):
+        def follows():
+            for follower_id in user_ids:
+                # Kóp adam az, az adam kóp jazıladı (eksponencial)
+                count = min(int(self.rng.expovariate(1 / average)) if average else 0, len(user_ids) - 1)
+                followees = {popularity.choice() for _ in range(count)} - {follower_id}
+                for followee_id in followees:
+                    created_at = self.random_time(max(self.joined[follower_id], self.joined[followee_id]))
+                    self.notifications.add((followee_id, 'follow', None), follower_id, created_at)
+                    yield Follow(from_customuser_id=followee_id, to_customuser_id=follower_id)
+
+        # Feed lentaları keyin usı ID-den keyingi follow qatarlarınan oqıladı
+        self.first_follow_id = Follow.objects.aggregate(last=Max('id'))['last'] or 0
+        self.followers = Counter()
+
+        def created(batch):
+            self.followers.update(follow.from_customuser_id for follow in batch)
+            self.flush_notifications()
+
+        return self.insert(Follow, follows(), on_batch=created, ignore_conflicts=True)
+
+    def create_images(self, count):
+        """Lokal jaratılǵan súwretler hám olardıń nusqaları: {name: variants}."""
+        images = {}
+        for i in range(count):
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            image = Image.new('RGB', (1080, 1080), color)
+            draw = ImageDraw.Draw(image)
+            for _ in range(12):
+                (x0, x1), (y0, y1) = (sorted(self.rng.randrange(1080) for _ in range(2)) for _ in range(2))
+                draw.ellipse((x0, y0, x1, y1), fill=tuple(self.rng.randrange(256) for _ in range(3)))
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=85)
+
+            name = POST_STORAGE.save(f'posts/generated_{i}.jpg', ContentFile(buffer.getvalue()))
+            variants = {'source': name}
+            for variant, size in VARIANTS['post'].items():
+                variants[variant] = POST_STORAGE.save(
+                    variant_name(name, variant), ContentFile(render_variant(image, size))
+                )
+            images[name] = variants
+        return images
+
+    def create_posts(self, authors, images, count):
+        names = list(images)
+        posts = (
+            Post(
+                author_id=(author_id := authors.choice()),
+                image=(name := self.rng.choice(names)),
+                image_variants=images[name],
+                caption=self.words(0, 20),
+                created_at=(created_at := self.random_time(self.joined[author_id])),
+                updated_at=created_at,
+            )
+            for _ in range(count)
+        )
+        self.posted = {}
+
+        def created(batch):
+            for post in batch:
+                self.posted[post.pk] = (post.author_id, post.created_at)
+
+        self.insert(Post, posts, on_batch=created)
+        return list(self.posted)
+
+    def create_likes(self, user_ids, posts, average):
+        def likes():
+            for user_id in user_ids:
+                count = int(self.rng.expovariate(1 / average)) if average else 0
+                for post_id in {posts.choice() for _ in range(count)}:
+                    author_id, posted_at = self.posted[post_id]
+                    created_at = self.random_time(max(posted_at, self.joined[user_id]))
+                    self.notifications.add((author_id, 'like', post_id), user_id, created_at)
+                    yield PostLike(user_id=user_id, post_id=post_id, created_at=created_at)
+
+        return self.insert(PostLike, likes(), on_batch=self.flush_notifications, ignore_conflicts=True)
+
+    def create_comments(self, user_ids, posts, count):
+        def comments():
+            for _ in range(count):
+                user_id, post_id = self.rng.choice(user_ids), posts.choice()
+                author_id, posted_at = self.posted[post_id]
+                created_at = self.random_time(max(posted_at, self.joined[user_id]))
+                self.notifications.add((author_id, 'comment', post_id), user_id, created_at)
+                yield PostComment(
+                    user_id=user_id, post_id=post_id, text=self.words(1, 12),
+                    created_at=created_at, updated_at=created_at,
+                )
+
+        return self.insert(PostComment, comments(), on_batch=self.flush_notifications)
+
+    def flush_notifications(self, batch=None):
+        """
+        Toptıń toparların NotificationDispatcher aggregation nátiyjesi sıyaqlı jazadı: hár (receiver, type, post)
+        bir qatar, like/follow ushın sanalǵan jiberiwshiler (NotificationSender) menen.
+        Bir topar bir neshe topqa tússe bir neshe qatar boladı (bólek aggregation window-lar sıyaqlı).
+        """
+        notifications = []
+        counted = []
+        for (receiver_id, type, post_id), (count, senders, created_at) in self.notifications.pop().items():
+            senders = list(senders)
+            deduplicated = type in DEDUPLICATED_TYPES
+            notification = Notification(
+                sender_id=senders[-1],
+                receiver_id=receiver_id,
+                type=type,
+                post_id=post_id,
+                count=len(senders) if deduplicated else count,
+                recent_senders=senders[::-1][:RECENT_SENDERS_LIMIT],
+                is_read=self.rng.random() < 0.7,
+                created_at=created_at,
+            )
+            notifications.append(notification)
+            if deduplicated:
+                counted.append((notification, senders))
+
+        Notification.objects.bulk_create(notifications, batch_size=self.batch_size)
+        NotificationSender.objects.bulk_create(
+            [NotificationSender(notification_id=notification.pk, sender_id=sender_id)
+             for notification, senders in counted for sender_id in senders],
+            batch_size=self.batch_size,
+        )
+        self.notification_count += len(notifications)
+
+    def create_feeds(self):
+        """
+        rebuild_feed() sıyaqlı (hár avtordan sońǵı BACKFILL_SIZE post): postlar yadtaǵı maǵlıwmattan,
+        follow qatarları bazadan aǵım menen oqıladı.
+        """
+        latest = {}
+        for post_id, (author_id, created_at) in self.posted.items():
+            latest.setdefault(author_id, []).append((created_at, post_id))
+        for posts in latest.values():
+            posts.sort(reverse=True)
+            del posts[BACKFILL_SIZE:]
+
+        follows = Follow.objects.filter(pk__gt=self.first_follow_id).values_list(
+            'from_customuser_id', 'to_customuser_id'
+        )
+        items = (
+            FeedItem(owner_id=owner_id, post_id=post_id, created_at=created_at)
+            for author_id, owner_id in follows.iterator(chunk_size=self.batch_size)
+            # Populyar avtorlardıń postları tarqatılmaydı (feed oqılǵanda alınadı)
+            if self.followers[author_id] <= FANOUT_FOLLOWER_LIMIT
+            for created_at, post_id in latest.get(author_id, ())
+        )
+        return self.insert(FeedItem, items, ignore_conflicts=True)
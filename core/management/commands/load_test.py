@@ -0,0 +1,161 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import CustomUser, Post
+
+from .generate_data import PASSWORD, WORDS
+
+# (endpoint atı, salmaǵı) - oqıw kóp, jazıw az (mobil qosımsha profili)
+MIX = (
+    ('feed', 35),
+    ('posts_list', 10),
+    ('post_retrieve', 15),
+    ('post_comments', 5),
+    ('notifications', 8),
+    ('unread_count', 7),
+    ('users_me', 4),
+    ('users_search', 4),
+    ('like', 8),
+    ('comment', 3),
+    ('follow', 1),
+)
+
+
+def percentile(values, p):
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100)[p - 1]
+
+
+class HttpClient:
+    """Minimal asyncio HTTP/1.1 klient (standart kitapxana menen, hár request jańa baylanıs)."""
+
+    def __init__(self, base_url):
+        url = urlsplit(base_url)
+        if url.scheme != 'http':
+            raise CommandError("Tek http:// qollap-quwatlanadı.")
+        self.host, self.port = url.hostname, url.port or 80
+        self.prefix = url.path.rstrip('/')
+
+    async def request(self, method, path, token=None, data=None):
+        body = json.dumps(data).encode() if data is not None else b''
+        headers = [
+            f'{method} {self.prefix}{path} HTTP/1.1',
+            f'Host: {self.host}:{self.port}',
+            'Accept: application/json',
+            'Connection: close',
+            f'Content-Length: {len(body)}',
+        ]
+        if data is not None:
+            headers.append('Content-Type: application/json')
+        if token is not None:
+            headers.append(f'Authorization: Bearer {token}')
+
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write('\r\n'.join(headers).encode() + b'\r\n\r\n' + body)
+            await writer.drain()
+            response = await reader.read()
+        finally:
+            writer.close()
+        head, _, content = response.partition(b'\r\n\r\n')
+        return int(head.split(b' ', 2)[1]), content
+
+
+class Command(BaseCommand):
+    help = (
+        "Islep turǵan serverge (runserver / gunicorn) parallel oqıw/jazıw aralaspasın jiberedi, "
+        "hár endpoint ushın throughput hám p50/p95/p99 kórsetedi. "
+        "Paydalanıwshılar generate_data arqalı jaratılǵan bolıwı kerek."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api')
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--duration', type=float, default=30.0, help="Sekund.")
+        parser.add_argument('--users', type=int, default=50, help="Neshe paydalanıwshı atınan.")
+        parser.add_argument('--prefix', default='user')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        usernames = list(
+            CustomUser.objects.filter(username__startswith=options['prefix'])
+            .order_by('id').values_list('username', flat=True)[:options['users']]
+        )
+        if not usernames:
+            raise CommandError("Paydalanıwshılar joq: aldın `manage.py generate_data` iske túsiriń.")
+        self.user_ids = list(CustomUser.objects.order_by('-id').values_list('id', flat=True)[:10000])
+        self.post_ids = list(Post.objects.order_by('-id').values_list('id', flat=True)[:10000])
+        if not self.post_ids:
+            raise CommandError("Postlar joq.")
+
+        self.client = HttpClient(options['url'])
+        self.rng = random.Random(options['seed'])
+        stats = asyncio.run(self.run(usernames, options))
+        self.report(stats, options['duration'])
+
+    async def run(self, usernames, options):
+        tokens = []
+        for username in usernames:
+            status, content = await self.client.request(
+                'POST', '/auth/token/', data={'username': username, 'password': PASSWORD}
+            )
+            if status != 200:
+                raise CommandError(f"{username}: token alınbadı ({status}).")
+            tokens.append(json.loads(content)['access'])
+
+        stats = {name: ([], []) for name, _ in MIX}
+        names, weights = zip(*MIX)
+        deadline = time.monotonic() + options['duration']
+
+        async def worker():
+            while time.monotonic() < deadline:
+                name = self.rng.choices(names, weights)[0]
+                method, path, data = self.scenario(name)
+                started = time.perf_counter()
+                try:
+                    status, _ = await self.client.request(method, path, self.rng.choice(tokens), data)
+                except OSError:
+                    status = 0
+                timings, errors = stats[name]
+                if status >= 400 or status == 0:
+                    errors.append(status)
+                else:
+                    timings.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker() for _ in range(options['concurrency'])))
+        return stats
+
+    def scenario(self, name):
+        """(method, path, data)"""
+        post_id = self.rng.choice(self.post_ids)
+        return {
+            'feed': ('GET', '/posts/feed/', None),
+            'posts_list': ('GET', '/posts/', None),
+            'post_retrieve': ('GET', f'/posts/{post_id}/', None),
+            'post_comments': ('GET', f'/posts/{post_id}/comments/', None),
+            'notifications': ('GET', '/notifications/', None),
+            'unread_count': ('GET', '/notifications/unread-count/', None),
+            'users_me': ('GET', '/users/me/', None),
+            'users_search': ('GET', f'/users/search/?q={self.rng.choice(WORDS)[:3]}', None),
+            'like': (self.rng.choice(('PUT', 'DELETE')), f'/posts/{post_id}/like/', None),
+            'comment': ('POST', f'/posts/{post_id}/comment/', {'text': ' '.join(self.rng.choices(WORDS, k=5))}),
+            'follow': ('PUT', f'/users/{self.rng.choice(self.user_ids)}/follow/', None),
+        }[name]
+
+    def report(self, stats, duration):
+        total = sum(len(timings) for timings, _ in stats.values())
+        self.stdout.write(f"{'endpoint':<15}{'req':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'qáte':>7}")
+        for name, (timings, errors) in stats.items():
+            self.stdout.write(
+                f"{name:<15}{len(timings):>8}{len(timings) / duration:>9.1f}"
+                f"{percentile(timings, 50) * 1000:>9.1f}{percentile(timings, 95) * 1000:>9.1f}"
+                f"{percentile(timings, 99) * 1000:>9.1f}{len(errors):>7}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Jámi: {total} request, {total / duration:.1f} req/s"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.feed import rebuild_feed
+from core.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Paydalanıwshılardıń feed lentaların (FeedItem) qayta jıynaydı."
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help="Tek usı paydalanıwshılar ushın.")
+
+    def handle(self, *args, **options):
+        users = CustomUser.objects.only('id')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        total = 0
+        for user in users.iterator():
+            rebuild_feed(user)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{total} paydalanıwshınıń lentası jańalandı."))
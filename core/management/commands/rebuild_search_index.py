@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from core.models import CustomUser, Post, SearchTerm
+from core.search import INDEXED_FIELDS, document_terms
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Post hám paydalanıwshılar ushın izlew indeksin (SearchTerm) noldan qayta jıynaydı."
+
+    def handle(self, *args, **options):
+        for kind, model in (('post', Post), ('user', CustomUser)):
+            SearchTerm.objects.filter(kind=kind).delete()
+
+            batch = []
+            total = 0
+            for obj in model.objects.only('pk', *INDEXED_FIELDS[kind]).iterator(chunk_size=BATCH_SIZE):
+                batch += [SearchTerm(kind=kind, object_id=obj.pk, term=term) for term in document_terms(kind, obj)]
+                total += 1
+                if len(batch) >= BATCH_SIZE:
+                    SearchTerm.objects.bulk_create(batch, ignore_conflicts=True)
+                    batch = []
+            SearchTerm.objects.bulk_create(batch, ignore_conflicts=True)
+
+            self.stdout.write(f"{kind}: {total} obyekt indekslendi.")
+
+        self.stdout.write(self.style.SUCCESS("Izlew indeksi jańalandı."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "likes_count, comments_count, followers_count, following_count sanawıshların dúzetedi."
+
+    def handle(self, *args, **options):
+        for counter, fixed in reconcile_counters().items():
+            self.stdout.write(f"{counter}: {fixed} qatar dúzetildi.")
+        self.stdout.write(self.style.SUCCESS("Sanawıshlar sáykeslendi."))
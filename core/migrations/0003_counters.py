@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:17
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+            c=Count('pk')
+        ).values('c')
+    ), 0)
+
+
+def populate_counters(apps, schema_editor):
+    CustomUser = apps.get_model('core', 'CustomUser')
+    Post = apps.get_model('core', 'Post')
+    PostLike = apps.get_model('core', 'PostLike')
+    PostComment = apps.get_model('core', 'PostComment')
+    Follow = CustomUser.followers.through
+
+    Post.objects.update(
+        likes_count=count_subquery(PostLike, 'post'),
+        comments_count=count_subquery(PostComment, 'post'),
+    )
+    CustomUser.objects.update(
+        followers_count=count_subquery(Follow, 'from_customuser'),
+        following_count=count_subquery(Follow, 'to_customuser'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_feeditem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+from core.search import INDEXED_FIELDS, document_terms
+
+
+def build_search_index(apps, schema_editor):
+    SearchTerm = apps.get_model('core', 'SearchTerm')
+    for kind, model_name in (('post', 'Post'), ('user', 'CustomUser')):
+        model = apps.get_model('core', model_name)
+        SearchTerm.objects.bulk_create(
+            [
+                SearchTerm(kind=kind, object_id=obj.pk, term=term)
+                for obj in model.objects.only('pk', *INDEXED_FIELDS[kind]).iterator()
+                for term in document_terms(kind, obj)
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_notification_unread_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Post'), ('user', 'User')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('term', models.CharField(max_length=64)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'object_id'], name='searchterm_object_idx')],
+                'unique_together': {('kind', 'term', 'object_id')},
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from core.tags import extract_hashtags
+
+
+def extract_existing_hashtags(apps, schema_editor):
+    Post = apps.get_model('core', 'Post')
+    Hashtag = apps.get_model('core', 'Hashtag')
+    PostHashtag = apps.get_model('core', 'PostHashtag')
+
+    for post in Post.objects.exclude(caption='').only('id', 'caption', 'created_at').iterator():
+        for name in extract_hashtags(post.caption):
+            hashtag, _ = Hashtag.objects.get_or_create(name=name)
+            PostHashtag.objects.create(post=post, hashtag=hashtag, created_at=post.created_at)
+            Hashtag.objects.filter(pk=hashtag.pk).update(posts_count=models.F('posts_count') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_searchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Hashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='type',
+            field=models.CharField(choices=[('like', 'Like'), ('comment', 'Comment'), ('follow', 'Follow'), ('mention', 'Mention')], max_length=50),
+        ),
+        migrations.CreateModel(
+            name='Mention',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('comment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to='core.postcomment')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to='core.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at'], name='mention_user_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PostHashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_links', to='core.hashtag')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hashtag_links', to='core.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hashtag', '-created_at'], name='posthashtag_tag_created_idx')],
+                'unique_together': {('hashtag', 'post')},
+            },
+        ),
+        migrations.RunPython(extract_existing_hashtags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_senders(apps, schema_editor):
+    # Burınǵı qatarlar ushın belgili jiberiwshiler - sońǵıları (recent_senders)
+    Notification = apps.get_model('core', 'Notification')
+    NotificationSender = apps.get_model('core', 'NotificationSender')
+    notifications = Notification.objects.filter(type__in=('like', 'follow')).values_list(
+        'id', 'sender_id', 'recent_senders'
+    )
+    NotificationSender.objects.bulk_create(
+        (NotificationSender(notification_id=notification_id, sender_id=sender_id)
+         for notification_id, last_sender_id, recent in notifications.iterator()
+         for sender_id in set(recent or [last_sender_id])),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_feeditem_owner_created_post'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationSender',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='senders', to='core.notification')),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('notification', 'sender')},
+            },
+        ),
+        migrations.RunPython(populate_senders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def use_c_collation(apps, schema_editor):
+    # prefix_match() diapazonı ('abc' <= term < 'abc' + U+10FFFF) tek binary tártipte durıs:
+    # PostgreSQL-de baǵan C collation-ǵa ótkeriledi (indeks qayta dúziledi). SQLite - BINARY.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE core_searchterm ALTER COLUMN term TYPE varchar(64) COLLATE "C"'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_notification_sender'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_c_collation, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_searchterm_term_collation'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='posthashtag',
+            name='posthashtag_tag_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='posthashtag',
+            index=models.Index(fields=['hashtag', '-created_at', '-id'], name='posthashtag_tag_created_idx'),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
@@ -5,9 +7,15 @@ from django.contrib.auth.models import AbstractUser
 
 class CustomUser(AbstractUser):
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
+    # Kishireytilgen nusqalar (core/images.py): {'source': ..., 'small': 'variants/...webp', ...}
+    avatar_variants = models.JSONField(default=dict, blank=True)
     bio = models.TextField(max_length=500, blank=True)
     website = models.URLField(max_length=200, blank=True)
     followers = models.ManyToManyField('self', symmetrical=False, related_name='following', blank=True)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    # Bunnan aldın berilgen JWT token-lar jaramsız (core/authentication.py)
+    tokens_valid_after = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -33,10 +41,21 @@ class CustomUser(AbstractUser):
 class Post(models.Model):
     author = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='posts')
     image = models.ImageField(upload_to='posts/')
+    image_variants = models.JSONField(default=dict, blank=True)
     caption = models.TextField(max_length=2200, blank=True)
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset paginaciya (created_at, id) tártibinde: sort qádemi joq
+            models.Index(fields=['-created_at', '-id'], name='post_created_idx'),
+            # Avtor(lar)dıń sońǵı postları (feed-tegi populyar avtorlar, backfill)
+            models.Index(fields=['author', '-created_at', '-id'], name='post_author_created_idx'),
+        ]
+
     def __str__(self):
         return f"Post by {self.author.username} at {self.created_at}"
 
@@ -58,6 +77,12 @@ class PostComment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Posttıń kommentariyleri hám sońǵı kommentariyler (jańaları birinshi)
+            models.Index(fields=['post', '-created_at', '-id'], name='postcomment_post_created_idx'),
+        ]
+
     def __str__(self):
         return f"Comment by {self.user.username} on Post {self.post.id}"
 
@@ -66,6 +91,7 @@ class Notification(models.Model):
         ('like', 'Like'),
         ('comment', 'Comment'),
         ('follow', 'Follow'),
+        ('mention', 'Mention'),
     )
 
     sender = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='sent_notifications')
@@ -73,7 +99,142 @@ class Notification(models.Model):
     type = models.CharField(max_length=50, choices=NOTIFICATION_TYPES)
     post = models.ForeignKey(Post, on_delete=models.CASCADE, null=True, blank=True)
     is_read = models.BooleanField(default=False)
+    # Bir (receiver, type, post) toparı ushın jıynalǵan hádiyseler sanı hám sońǵı jiberiwshiler.
+    # sender - eń sońǵı jiberiwshi.
+    count = models.PositiveIntegerField(default=1)
+    recent_senders = models.JSONField(default=list, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Oqılmaǵan notification-lar sanı (unread_count) ushın partial index
+            models.Index(fields=['receiver'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+            # Paydalanıwshınıń notification dizimi (jańaları birinshi)
+            models.Index(fields=['receiver', '-created_at', '-id'], name='notification_receiver_idx'),
+        ]
+
+    def __str__(self):
+        return f"Notification for {self.receiver.username} from {self.sender.username}"
+
+
+class NotificationSender(models.Model):
+    """
+    Aggregation qatarına sanalǵan jiberiwshiler (like, follow): hár adam toparda bir ret sanaladı,
+    like/unlike qaytalanıwı count-tı ósirmeydi.
+    """
+    notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='senders')
+    sender = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        unique_together = ('notification', 'sender')
+
+    def __str__(self):
+        return f"User {self.sender_id} in notification {self.notification_id}"
+
+class FeedItem(models.Model):
+    """
+    Paydalanıwshınıń aldınnan jıynalǵan (materialized) feed lentası.
+    Post jaratılǵanda avtordıń jazılıwshılarına tarqatıladı (fan-out-on-write).
+    """
+    owner = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='feed_items')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='feed_items')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('owner', 'post')
+        indexes = [
+            # Feed beti: (owner, created_at, post) boyınsha bir diapazon oqıw, bólek sort joq
+            models.Index(fields=['owner', '-created_at', '-post'], name='feeditem_owner_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id} in feed of user {self.owner_id}"
+
+
+class SearchTerm(models.Model):
+    """
+    Izlew ushın inverted index: hár post/paydalanıwshı sózi bir qatar.
+    (kind, term) indeksi arqalı sóz hám prefiks boyınsha izlew index seek boladı,
+    LIKE '%...%' arqalı pútkil kesteni oqıw kerek emes.
+    """
+    KINDS = (
+        ('post', 'Post'),
+        ('user', 'User'),
+    )
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    object_id = models.BigIntegerField()
+    term = models.CharField(max_length=64)
+
+    class Meta:
+        unique_together = ('kind', 'term', 'object_id')
+        indexes = [
+            models.Index(fields=['kind', 'object_id'], name='searchterm_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.kind} {self.object_id}"
+
+
+class Hashtag(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    posts_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"#{self.name}"
+
+
+class PostHashtag(models.Model):
+    """
+    Post caption-ınan alınǵan hashtag. created_at - posttıń waqıtı,
+    (hashtag, -created_at, -id) indeksi arqalı teg boyınsha postlar beti (keyset) index seek penen,
+    bólek sort-sız oqıladı.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='hashtag_links')
+    hashtag = models.ForeignKey(Hashtag, on_delete=models.CASCADE, related_name='post_links')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('hashtag', 'post')
+        indexes = [
+            models.Index(fields=['hashtag', '-created_at', '-id'], name='posthashtag_tag_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.hashtag.name} on Post {self.post_id}"
+
+
+class Mention(models.Model):
+    """Post caption-ında yamasa kommentariyde @username arqalı belgilengen paydalanıwshı."""
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='mentions')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='mentions')
+    comment = models.ForeignKey(PostComment, on_delete=models.CASCADE, null=True, blank=True, related_name='mentions')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='mention_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"@{self.user.username} in Post {self.post_id}"
+
+class UploadSession(models.Model):
+    """
+    Bólip (chunk) júklenetuǵın súwret (core/uploads.py). Bólekler diskke tuwrıdan-tuwrı
+    jazıladı, `received` - client qay jerden dawam etiwi kerek ekenin kórsetedi.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='uploads')
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    format = models.CharField(max_length=10, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    completed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __str__(self):
-        return f"Notification for {self.receiver.username} from {self.sender.username}"
\ No newline at end of file
+        return f"Upload {self.id} ({self.received}/{self.size})"
@@ -0,0 +1,301 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import get_shared_cache
+from .db_routers import read_from
+from .models import Notification, NotificationSender
+from .realtime import publish_notifications
+
+logger = logging.getLogger(__name__)
+
+# Usı túrdegi notification-lar (receiver, type, post) boyınsha bir qatarǵa jıynaladı:
+# "alice hám taǵı 1203 adam postıńızǵa like bastı".
+AGGREGATED_TYPES = ('like', 'comment', 'follow')
+# Bul túrlerde toparǵa aldın sanalǵan adam (NotificationSender) qayta sanalmaydı (like/unlike,
+# follow/unfollow qaytalanıwı). Kommentariy hár waqıt jańa hádiyse.
+DEDUPLICATED_TYPES = ('like', 'follow')
+RECENT_SENDERS_LIMIT = 3
+
+
+UNREAD_CACHE_TIMEOUT = 5 * 60
+
+
+def _unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user_id):
+    """
+    Oqılmaǵan notification-lar sanı. Keshtegi sanawısh (change_unread arqalı jańalanadı),
+    tek keshte joq bolsa partial index (receiver WHERE is_read = false) boyınsha sanaladı.
+    """
+    cache = get_shared_cache()
+    key = _unread_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        # Keshke jazılatuǵın mán primary-den (replica artta qalıwı múmkin)
+        with read_from(replica=False):
+            count = Notification.objects.filter(receiver_id=user_id, is_read=False).count()
+        # add: aradaǵı change_unread ózgerisleri ústinen jazılmaydı
+        if not cache.add(key, count, UNREAD_CACHE_TIMEOUT):
+            count = cache.get(key, count)
+    return max(count, 0)
+
+
+def change_unread(deltas):
+    """
+    {user_id: ózgeris} - sanawıshlardı commit-ten keyin incr/decr menen ózgertedi.
+    Keshte joq sanawısh ózgertilmeydi (keyingi oqıwda sanaladı). TTL saqlanadı,
+    sonlıqtan qanday da bir parallel ózgeris jıljıwı TTL ótkende dúzeledi.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    def apply():
+        cache = get_shared_cache()
+        for user_id, delta in deltas.items():
+            try:
+                cache.incr(_unread_key(user_id), delta)
+            except ValueError:
+                pass
+
+    transaction.on_commit(apply)
+
+
+class NotificationEvent(NamedTuple):
+    sender_id: int
+    receiver_id: int
+    type: str
+    post_id: Optional[int] = None
+
+
+class NotificationDispatcher:
+    """
+    Notification jazıwdı request-ten ajıratadı.
+    Request tek hádiyseni (event) náwbetke qoyadı, fon aǵımı (worker thread) olardı
+    toplap bulk_create menen jazadı hám qátelikte qayta urınıp kóredi.
+    NOTIFICATION_QUEUE_ASYNC = False bolsa hádiyse sol transaction ishinde birden jazıladı.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    @property
+    def asynchronous(self):
+        return getattr(settings, 'NOTIFICATION_QUEUE_ASYNC', True)
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'NOTIFICATION_BATCH_SIZE', 500)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'NOTIFICATION_FLUSH_INTERVAL', 0.2)
+
+    @property
+    def max_retries(self):
+        return getattr(settings, 'NOTIFICATION_MAX_RETRIES', 3)
+
+    @property
+    def aggregation_window(self):
+        return timedelta(seconds=getattr(settings, 'NOTIFICATION_AGGREGATION_WINDOW', 24 * 60 * 60))
+
+    def emit(self, sender_id, receiver_id, type, post_id=None):
+        """Hádiyseni jazıp qoyadı. Óz-ózine notification jiberilmeydi."""
+        if sender_id == receiver_id:
+            return
+
+        event = NotificationEvent(sender_id, receiver_id, type, post_id)
+        if not self.asynchronous:
+            self.write([event])
+            return
+
+        # Transaction qaytarılsa (rollback) hádiyse de jiberilmeydi
+        transaction.on_commit(lambda: self._enqueue(event))
+
+    def _enqueue(self, event):
+        self._ensure_worker()
+        self._queue.put(event)
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name='notification-dispatcher', daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_with_retries(batch)
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_with_retries(self, events):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.write(events)
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    logger.exception("Notification jazılmadı, %d hádiyse joǵaldı.", len(events))
+                    return
+                close_old_connections()
+                time.sleep(0.1 * 2 ** attempt)
+
+    def write(self, events):
+        groups = {}
+        single = []
+        for event in events:
+            if event.type in AGGREGATED_TYPES:
+                key = (event.receiver_id, event.type, event.post_id)
+                # [jiberiwshiler (sońǵısı aqırında), hádiyseler sanı]
+                group = groups.setdefault(key, [[], 0])
+                senders = group[0]
+                if event.sender_id in senders:
+                    senders.remove(event.sender_id)
+                senders.append(event.sender_id)
+                group[1] += 1
+            else:
+                single.append(event)
+
+        with transaction.atomic():
+            new, updated, counted = self._aggregate(groups)
+            new += [
+                Notification(
+                    sender_id=event.sender_id,
+                    receiver_id=event.receiver_id,
+                    type=event.type,
+                    post_id=event.post_id,
+                )
+                for event in single
+            ]
+            Notification.objects.bulk_create(new, batch_size=self.batch_size)
+            NotificationSender.objects.bulk_create(
+                [NotificationSender(notification_id=notification.pk, sender_id=sender_id)
+                 for notification, senders in counted for sender_id in senders],
+                batch_size=self.batch_size,
+                ignore_conflicts=True,
+            )
+
+        receiver_ids = {event.receiver_id for event in events}
+        # Jańa qatarlar hám qayta oqılmaǵan bolǵan (is_read True -> False) aggregation qatarları
+        unread = Counter(notification.receiver_id for notification in new)
+        unread.update(notification.receiver_id for notification in updated if notification.is_read)
+        change_unread(unread)
+
+        notification_ids = [notification.pk for notification in updated]
+        notification_ids += [notification.pk for notification in new if notification.pk]
+        transaction.on_commit(lambda: publish_notifications(notification_ids, receiver_ids))
+
+    def _aggregate(self, groups):
+        """
+        Hár topar ushın aggregation window ishindegi bar qatardı jańalaydı
+        (count, sońǵı jiberiwshiler), bolmasa jańa qatar qaytaradı.
+        (jańa qatarlar, jańalanǵan qatarlar - ózgeriwden aldınǵı kórinisi,
+        [(qatar, toparǵa jańa sanalǵan jiberiwshiler), ...]) qaytaradı.
+        DEDUPLICATED_TYPES: toparǵa aldın sanalǵan adam (NotificationSender) qayta sanalmaydı.
+        Kommentariy hár waqıt sanaladı hám qatardı kóteredi (created_at, is_read).
+        """
+        if not groups:
+            return [], [], []
+
+        now = timezone.now()
+        condition = Q()
+        for receiver_id, type, post_id in groups:
+            condition |= Q(receiver_id=receiver_id, type=type, post_id=post_id)
+
+        existing = {}
+        candidates = Notification.objects.filter(
+            condition, created_at__gte=now - self.aggregation_window
+        ).order_by('created_at')
+        for notification in candidates:
+            existing[(notification.receiver_id, notification.type, notification.post_id)] = notification
+
+        members = set(NotificationSender.objects.filter(
+            notification_id__in=[
+                notification.pk for notification in existing.values() if notification.type in DEDUPLICATED_TYPES
+            ],
+            sender_id__in={sender_id for senders, _ in groups.values() for sender_id in senders},
+        ).values_list('notification_id', 'sender_id'))
+
+        new = []
+        updated = []
+        counted = []
+        for key, (senders, total) in groups.items():
+            receiver_id, type, post_id = key
+            deduplicated = type in DEDUPLICATED_TYPES
+            notification = existing.get(key)
+            if notification is None:
+                notification = Notification(
+                    sender_id=senders[-1],
+                    receiver_id=receiver_id,
+                    type=type,
+                    post_id=post_id,
+                    count=len(senders) if deduplicated else total,
+                    recent_senders=senders[::-1][:RECENT_SENDERS_LIMIT],
+                )
+                new.append(notification)
+                if deduplicated:
+                    counted.append((notification, senders))
+                continue
+
+            recent = notification.recent_senders or [notification.sender_id]
+            if deduplicated:
+                fresh = [sender_id for sender_id in senders if (notification.pk, sender_id) not in members]
+                if not fresh:
+                    continue
+                added = len(fresh)
+                counted.append((notification, fresh))
+            else:
+                fresh, added = senders, total
+            recent = [sender_id for sender_id in recent if sender_id not in fresh]
+
+            Notification.objects.filter(pk=notification.pk).update(
+                sender_id=fresh[-1],
+                count=F('count') + added,
+                recent_senders=(fresh[::-1] + recent)[:RECENT_SENDERS_LIMIT],
+                is_read=False,
+                created_at=now,
+            )
+            updated.append(notification)
+        return new, updated, counted
+
+    def flush(self):
+        """Náwbettegi barlıq hádiyseler jazılǵansha kútedi."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.join()
+
+
+dispatcher = NotificationDispatcher()
+atexit.register(dispatcher.flush)
@@ -0,0 +1,177 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) paginaciya. COUNT(*) hám OFFSET joq:
+    hár bet aldınǵı bettiń sońǵı elementinen (created_at, id) baslap oqıladı.
+    `ordering` maydanları kemeyiw tártibinde (descending) boladı.
+    Bir neshe queryset (dizim) berilse hár birinen bet oqılıp, sol gilt boyınsha birlestiriledi
+    (gilti birdey qatarlar bir ret).
+    """
+    page_size = 10
+    ordering = ('-created_at', '-id')
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = "Cursor qáte."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+        position, reverse = self.decode_cursor(request)
+
+        querysets = queryset if isinstance(queryset, (list, tuple)) else [queryset]
+        if position is not None:
+            position = self.parse_position(querysets[0], position)
+
+        results = []
+        for queryset in querysets:
+            if reverse:
+                queryset = queryset.order_by(*self.fields)
+            else:
+                queryset = queryset.order_by(*self.ordering)
+
+            if position is not None:
+                queryset = queryset.filter(self.position_filter(position, reverse))
+
+            results += queryset[:self.page_size + 1]
+        if len(querysets) > 1:
+            # Gilt qatardı anıqlaydı: bir neshe derekte bar qatar bir ret alınadı
+            results = list({self.get_key(item): item for item in results}.values())
+            results.sort(key=self.get_key, reverse=not reverse)
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        return self.page
+
+    def position_filter(self, position, reverse):
+        """
+        (a, b) < (x, y)  =>  a < x OR (a = x AND b < y)
+        """
+        lookup = '__gt' if reverse else '__lt'
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.fields, position):
+            condition |= Q(**equal, **{field + lookup: value})
+            equal[field] = value
+        return condition
+
+    def get_key(self, item):
+        if isinstance(item, dict):
+            return tuple(item[field] for field in self.fields)
+        return tuple(getattr(item, field) for field in self.fields)
+
+    def get_position(self, item):
+        return [value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in self.get_key(item)]
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position, reverse = data['p'], bool(data['r'])
+            if len(position) != len(self.fields):
+                raise ValueError
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    def parse_position(self, queryset, position):
+        """
+        Cursor mánlerin ordering maydanlarınıń túrine keltiredi (maydan yamasa annotation
+        output_field-i arqalı). Jaramsız mán filtrge jetpeydi - 404.
+        """
+        annotations = queryset.query.annotations
+        values = []
+        try:
+            for name, value in zip(self.fields, position):
+                if name in annotations:
+                    field = annotations[name].output_field
+                else:
+                    field = queryset.model._meta.get_field(name)
+                value = field.to_python(value) if value is not None else None
+                if value is None:
+                    raise ValueError(name)
+                values.append(value)
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def encode_cursor(self, position, reverse):
+        data = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(data.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'description': "Paginaciya cursorı (aldınǵı juwaptıń next/previous siltemesinen).",
+            'schema': {'type': 'string'},
+        }]
+
+
+class FeedPagination(KeysetPagination):
+    """
+    Feed ushın: FeedItem hám populyar avtorlardıń postları (created_at, post_id) boyınsha
+    (core/feed.py feed_sources).
+    """
+    ordering = ('-created_at', '-post_id')
+
+
+class SearchPagination(KeysetPagination):
+    """
+    Izlew nátiyjeleri ushın: (rank, object_id) boyınsha keyset.
+    """
+    ordering = ('-rank', '-object_id')
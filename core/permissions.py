@@ -9,4 +9,5 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        return obj.author == request.user
\ No newline at end of file
+        # ID boyınsha: request.user (TokenUser) bazadan júklenbeydi
+        return obj.author_id == request.user.id
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+Request profiling (PROFILING_ENABLED): hár endpoint ushın waqıt histogrammaları (process ishinde),
+Prometheus formatında /api/metrics/, eń áste request-ler hám talap boyınsha cProfile /api/metrics/slow/.
+Kóp process bolsa hár process óz metrikasın beredi (Prometheus hár birin bólek jıynawı kerek).
+"""
+import cProfile
+import heapq
+import io
+import itertools
+import pstats
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+PROFILE_STATS_LINES = 40
+
+
+class Histogram:
+    """Prometheus histogram: label-lar boyınsha kumulyativ bucket-lar, sum hám count."""
+
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * len(self.buckets), 0, 0]
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        series[1] += value
+        series[2] += 1
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            for bound, bucket in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{format_labels(labels, le=bound)} {bucket}')
+            lines.append(f'{self.name}_bucket{format_labels(labels, le="+Inf")} {count}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {total:.6f}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {count}')
+        return lines
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels, **extra):
+    pairs = [('view', labels[0]), ('method', labels[1]), *extra.items()]
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in pairs) + '}'
+
+
+class RequestRecord:
+    """Bir request-tiń bólimleri (tek tańlanǵan / profillenetuǵın request-ler ushın)."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.view_started = None
+        self.render_started = None
+        self.render_time = 0.0
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+
+    def start_render(self, response):
+        self.render_started = time.perf_counter()
+
+        def rendered(response):
+            self.render_time = time.perf_counter() - self.render_started
+
+        response.add_post_render_callback(rendered)
+
+    def serializer_time(self, finished):
+        """View ishindegi SQL-siz waqıt: serializaciya hám basqa Python kodı."""
+        if self.view_started is None:
+            return 0.0
+        view_finished = self.render_started or finished
+        return max(view_finished - self.view_started - self.sql_time, 0.0)
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._armed = 0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.duration = Histogram(
+                'http_request_duration_seconds', "Request waqıtı (barlıq request-ler).", DURATION_BUCKETS
+            )
+            self.queries = Histogram('db_queries_per_request', "SQL sorawlar sanı (tańlanǵan).", QUERY_BUCKETS)
+            self.sql = Histogram('db_duration_seconds', "SQL waqıtı (tańlanǵan).", DURATION_BUCKETS)
+            self.serializer = Histogram(
+                'serializer_duration_seconds', "View-daǵı SQL-siz waqıt (tańlanǵan).", DURATION_BUCKETS
+            )
+            self.render = Histogram('render_duration_seconds', "Juwaptı render qılıw (tańlanǵan).", DURATION_BUCKETS)
+            self.slow = []
+
+    def arm(self, count):
+        """Keyingi `count` request cProfile menen profillenedi."""
+        with self._lock:
+            self._armed = count
+
+    def take_armed(self):
+        if not self._armed:
+            return False
+        with self._lock:
+            if self._armed:
+                self._armed -= 1
+                return True
+        return False
+
+    def observe(self, labels, status, duration, record, finished):
+        with self._lock:
+            key = (*labels, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.duration.observe(labels, duration)
+            if record is not None:
+                self.queries.observe(labels, record.queries)
+                self.sql.observe(labels, record.sql_time)
+                self.serializer.observe(labels, record.serializer_time(finished))
+                self.render.observe(labels, record.render_time)
+
+    def add_slow(self, entry, limit):
+        with self._lock:
+            item = (entry['duration'], next(self._sequence), entry)
+            if len(self.slow) < limit:
+                heapq.heappush(self.slow, item)
+            else:
+                heapq.heappushpop(self.slow, item)
+
+    def slowest(self):
+        with self._lock:
+            return [entry for _, _, entry in sorted(self.slow, key=lambda item: item[0], reverse=True)]
+
+    def expose(self):
+        with self._lock:
+            lines = ['# HELP http_requests_total Request-ler sanı.', '# TYPE http_requests_total counter']
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{format_labels((view, method), status=status)} {count}')
+            for histogram in (self.duration, self.queries, self.sql, self.serializer, self.render):
+                lines += histogram.expose()
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class ProfilingMiddleware:
+    """
+    Barlıq request-ler: waqıt hám status (tek perf_counter, overhead júdá kishi).
+    PROFILING_SAMPLE_RATE bólegi: SQL sanı/waqıtı (execute_wrapper), serializer hám render waqıtı.
+    Talap etilgende (metrics.arm) cProfile. PROFILING_ENABLED = False bolsa middleware óshiriledi.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.05)
+        self.slow_threshold = getattr(settings, 'PROFILING_SLOW_THRESHOLD', 1.0)
+        self.slow_limit = getattr(settings, 'PROFILING_SLOW_REQUESTS', 20)
+
+    def __call__(self, request):
+        profile = cProfile.Profile() if metrics.take_armed() else None
+        record = RequestRecord() if profile is not None or random.random() < self.sample_rate else None
+        request._profiling = record
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            if record is not None:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(record.execute))
+            if profile is not None:
+                profile.enable()
+                stack.callback(profile.disable)
+            response = self.get_response(request)
+        finished = time.perf_counter()
+        duration = finished - started
+
+        labels = (view_label(request), request.method)
+        metrics.observe(labels, response.status_code, duration, record, finished)
+        if profile is not None or duration >= self.slow_threshold:
+            metrics.add_slow(self.slow_entry(request, response, duration, record, profile, finished), self.slow_limit)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        record = getattr(request, '_profiling', None)
+        if record is not None:
+            record.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        record = getattr(request, '_profiling', None)
+        if record is not None:
+            record.start_render(response)
+        return response
+
+    def slow_entry(self, request, response, duration, record, profile, finished):
+        entry = {
+            'view': view_label(request),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration': round(duration, 6),
+            'at': time.time(),
+        }
+        if record is not None:
+            entry.update({
+                'queries': record.queries,
+                'sql': round(record.sql_time, 6),
+                'serializer': round(record.serializer_time(finished), 6),
+                'render': round(record.render_time, 6),
+            })
+        if profile is not None:
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(PROFILE_STATS_LINES)
+            entry['profile'] = stream.getvalue()
+        return entry
@@ -0,0 +1,220 @@
+import asyncio
+import io
+import json
+import logging
+import threading
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import DisallowedHost
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+STREAM_PATH = '/api/notifications/stream/'
+KEEPALIVE_INTERVAL = 15
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """Bir SSE baylanısınıń náwbeti (asyncio.Queue) hám onıń event loop-ı."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, payload):
+        """Basqa aǵımnan (thread) shaqırılsa da qáwipsiz."""
+        self.loop.call_soon_threadsafe(self._put, payload)
+
+    def _put(self, payload):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Client artta qaldı, ol /api/notifications/ arqalı qayta oqıydı
+            logger.warning("User %s ushın SSE náwbeti tolı, notification taslandı.", self.user_id)
+
+
+class InMemoryBroker:
+    """
+    Bir process ishindegi pub/sub. Testler hám bir worker-li deploy ushın.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.user_id, None)
+
+    def listening(self, user_ids):
+        """Házir baylanısta turǵan paydalanıwshılar."""
+        with self._lock:
+            return {user_id for user_id in user_ids if user_id in self._subscriptions}
+
+    def publish(self, user_id, payload):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.deliver(payload)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, 'REALTIME_BROKER', 'core.realtime.InMemoryBroker')
+                _broker = import_string(backend)()
+    return _broker
+
+
+def publish_notifications(notification_ids, receiver_ids):
+    """
+    Jańa yamasa jańalanǵan notification-lardı baylanısta turǵan qabıllawshılarǵa jiberedi.
+    Hesh kim tıńlamasa bazaǵa soraw jiberilmeydi.
+    """
+    broker = get_broker()
+    if not notification_ids or not broker.listening(receiver_ids):
+        return
+
+    from .models import Notification
+    from .serializers import NotificationSerializer
+
+    notifications = Notification.objects.filter(
+        pk__in=notification_ids, receiver_id__in=broker.listening(receiver_ids)
+    ).select_related('sender', 'post')
+    for notification in notifications:
+        broker.publish(notification.receiver_id, NotificationSerializer(notification).data)
+
+
+def absolute_urls(payload, request):
+    """
+    Payload request-siz serializaciya qılınǵan (bir ret, barlıq tıńlawshılar ushın).
+    REST sıyaqlı sender avatar URL-ları baylanıstıń host-ı menen absolute etiledi
+    (post_image REST-te de salıstırmalı).
+    """
+    sender = payload.get('sender')
+    if not sender:
+        return payload
+    sender = dict(sender)
+    if sender.get('avatar'):
+        sender['avatar'] = request.build_absolute_uri(sender['avatar'])
+    if sender.get('avatar_variants'):
+        sender['avatar_variants'] = {
+            name: request.build_absolute_uri(url) for name, url in sender['avatar_variants'].items()
+        }
+    return {**payload, 'sender': sender}
+
+
+async def respond(send, status, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def authenticate_token(scope):
+    """
+    `Authorization: Bearer <token>` header yamasa `?token=` parametrinen (EventSource
+    header jibere almaydı) access token-di tekserip, user_id qaytaradı.
+    Bıykar etilgen token-lar qabıl etilmeydi (keshte joq bolsa bazaǵa barıladı - sinxron).
+    """
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+    from rest_framework_simplejwt.settings import api_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from .authentication import ensure_not_revoked
+
+    raw = None
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            parts = value.decode('latin-1').split()
+            if len(parts) == 2 and parts[0] in api_settings.AUTH_HEADER_TYPES:
+                raw = parts[1]
+    if raw is None:
+        raw = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+    if raw is None:
+        return None
+
+    try:
+        return ensure_not_revoked(AccessToken(raw))
+    except (TokenError, InvalidToken, KeyError, ValueError):
+        return None
+
+
+async def notification_stream(scope, receive, send):
+    """
+    Server-Sent Events: /api/notifications/stream/
+    Jańa notification-lar NotificationSerializer kórinisinde `notification` event retinde keledi.
+    """
+    user_id = await sync_to_async(authenticate_token)(scope)
+    if user_id is None:
+        await respond(send, 401, b'{"detail": "Token qate yamasa joq."}')
+        return
+
+    # Absolute URL-lar ushın (REST-tegi request.build_absolute_uri sıyaqlı, ALLOWED_HOSTS tekseriledi)
+    request = ASGIRequest(scope, io.BytesIO())
+    try:
+        request.get_host()
+    except DisallowedHost:
+        await respond(send, 400, b'{"detail": "Host qate."}')
+        return
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+
+    broker = get_broker()
+    subscription = broker.subscribe(user_id)
+
+    async def wait_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    disconnected = asyncio.ensure_future(wait_disconnect())
+    try:
+        await send({'type': 'http.response.body', 'body': b': connected\n\n', 'more_body': True})
+        while not disconnected.done():
+            next_payload = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {next_payload, disconnected},
+                timeout=KEEPALIVE_INTERVAL,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if next_payload in done:
+                data = json.dumps(absolute_urls(next_payload.result(), request), default=str)
+                body = f'event: notification\ndata: {data}\n\n'.encode()
+            else:
+                next_payload.cancel()
+                body = b': keepalive\n\n'
+            if not disconnected.done():
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    finally:
+        disconnected.cancel()
+        broker.unsubscribe(subscription)
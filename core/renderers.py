@@ -0,0 +1,48 @@
+from rest_framework import renderers, parsers
+from rest_framework.exceptions import ParseError
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson ornatılmaǵan bolsa standart json qollanıladı
+    orjson = None
+
+
+if orjson is not None:
+    # datetime / date / time DRF formatında (millisekund, 'Z') qalıwı ushın default() arqalı ótedi
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    """
+    orjson (C) arqalı JSON. Juwap standart JSONRenderer menen birdey (compact, UTF-8),
+    orjson bilmeytuǵın tipler (datetime, Decimal, lazy str, ...) DRF JSONEncoder-ine beriledi.
+    Tek eksponentalı float-lar basqasha: `1e20` (json modulinde `1e+20`), mánisi birdey.
+    indent soralsa yamasa orjson joq bolsa standart renderer isleydi.
+    """
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.get_indent(accepted_media_type or '', renderer_context or {})
+            or not (api_settings.COMPACT_JSON and api_settings.UNICODE_JSON)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=self.encoder.default, option=ORJSON_OPTIONS)
+
+
+class ORJSONParser(parsers.JSONParser):
+    """orjson arqalı JSON request body. orjson joq bolsa standart JSONParser."""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,103 @@
+import re
+
+from django.db.models import Case, F, IntegerField, Max, Q, Value, When
+from rest_framework import filters
+
+from .models import SearchTerm
+
+TERM_MAX_LENGTH = 64
+QUERY_MAX_TERMS = 8
+
+INDEXED_FIELDS = {
+    'post': ('caption',),
+    'user': ('username', 'first_name', 'last_name'),
+}
+
+WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Tekstti kishi háripli, qaytalanbaytuǵın sózlerge bóledi."""
+    terms = []
+    for word in WORD_RE.findall(text.casefold()):
+        term = word[:TERM_MAX_LENGTH]
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+
+def document_terms(kind, obj):
+    terms = []
+    for field in INDEXED_FIELDS[kind]:
+        for term in tokenize(getattr(obj, field) or ''):
+            if term not in terms:
+                terms.append(term)
+    return terms
+
+
+def index_object(kind, obj):
+    """Obyekttiń sózlerin indekske qayta jazadı."""
+    SearchTerm.objects.filter(kind=kind, object_id=obj.pk).delete()
+    SearchTerm.objects.bulk_create(
+        [SearchTerm(kind=kind, object_id=obj.pk, term=term) for term in document_terms(kind, obj)],
+        ignore_conflicts=True,
+    )
+
+
+def remove_object(kind, object_id):
+    SearchTerm.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def prefix_match(term):
+    """
+    `term LIKE 'abc%'` ornına diapazon: 'abc' <= term < 'abc' + eń úlken Unicode belgisi.
+    SQLite-te LIKE (case-insensitive) indeksten paydalanbaydı, diapazon bolsa B-tree seek.
+    Diapazon tek binary (kod noqatı) tártipte durıs: SQLite BINARY, PostgreSQL-de term baǵanı
+    C collation-da (migraciya 0014). Basqa collation-da U+10FFFF prefiks sózlerinen aldın turıwı múmkin.
+    """
+    return Q(term__gte=term, term__lt=term + '\U0010ffff')
+
+
+def search(kind, query, match_all=False):
+    """
+    Izlew nátiyjeleri: {'object_id', 'rank'} qatarları, rank boyınsha (kemeyiw) tártiplengen.
+    rank - sáykes kelgen soraw sózleriniń sanı. Hár sóz prefiks retinde izlenedi (typeahead).
+    match_all=True bolsa tek barlıq sózlerge sáykes kelgenler qaytadı.
+    """
+    terms = tokenize(query)[:QUERY_MAX_TERMS]
+    if not terms:
+        return SearchTerm.objects.none().values('object_id').annotate(rank=Value(0))
+
+    matches = Q()
+    flags = {}
+    for i, term in enumerate(terms):
+        # kind hár OR tarmaǵında: SQLite hár diapazon ushın (kind, term) indeksin bólek qollanadı
+        matches |= Q(kind=kind) & prefix_match(term)
+        flags[f'm{i}'] = Max(Case(
+            When(prefix_match(term), then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+
+    rank = sum((F(name) for name in flags), Value(0))
+    hits = SearchTerm.objects.filter(matches).values('object_id').annotate(
+        **flags
+    ).annotate(rank=rank).values('object_id', 'rank').order_by('-rank', '-object_id')
+
+    if match_all:
+        hits = hits.filter(rank=len(terms))
+    return hits
+
+
+class IndexedSearchFilter(filters.SearchFilter):
+    """
+    `?search=` parametrin saqlaydı, biraq icontains ornına SearchTerm indeksinen paydalanadı.
+    Hár sóz (prefiks) tabılıwı shárt, tártip view-dıń ózinde qaladı.
+    """
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+
+        hits = search(view.search_kind, query, match_all=True)
+        return queryset.filter(pk__in=hits.values('object_id'))
@@ -1,41 +1,81 @@
+from django.db import models
 from rest_framework import serializers
-from .models import CustomUser, Post, PostComment, Notification
+from .models import CustomUser, Post, PostComment, Notification, Hashtag, UploadSession
+from .viewer import get_viewer
+from .images import variant_urls
+from . import uploads
 from django.contrib.auth.password_validation import validate_password
 
 
+class ViewerListSerializer(serializers.ListSerializer):
+    """
+    Betti serializaciya qılıwdan aldın viewer jaǵdayın (is_liked / is_following)
+    barlıq obyektler ushın bir soraw menen júkleydi.
+    """
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        self.prime_viewer(get_viewer(self.context), [item.id for item in items])
+        return super().to_representation(items)
+
+    def prime_viewer(self, viewer, ids):
+        raise NotImplementedError
+
+
+class PostListSerializer(ViewerListSerializer):
+    # Endpoint-lar post_cache / fast_serializers arqalı ótedi; PostSerializer(many=True) - olardıń
+    # salıstırmalı (reference) nátiyjesi (FastSerializerTests) hám OpenAPI sxeması
+    def prime_viewer(self, viewer, ids):
+        viewer.prime_posts(ids)
+
+
+class UserListSerializer(ViewerListSerializer):
+    def prime_viewer(self, viewer, ids):
+        viewer.prime_users(ids)
+
+
 class UserMiniSerializer(serializers.ModelSerializer):
     """
     Basqa modellerdiń ishinde (Nested) qollanıw ushın qısqasha User maǵlıwmatı.
     Mısalı: Posttıń avtorı, Kommentariy jazǵan adam.
     """
+    avatar_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = CustomUser
-        fields = ['id', 'username', 'avatar']
+        fields = ['id', 'username', 'avatar', 'avatar_variants']
+
+    def get_avatar_variants(self, obj):
+        return variant_urls(obj, self.context.get('request'))
 
 class UserSerializer(serializers.ModelSerializer):
     """
     Paydalanıwshınıń tolıq profili.
-    Followers hám Following sanın qosamız (View-da annotate qılınǵan).
+    Followers hám Following sanı modeldiń ózinde saqlanadı (signals arqalı jańalanadı).
     """
     followers_count = serializers.IntegerField(read_only=True)
     following_count = serializers.IntegerField(read_only=True)
     
     is_following = serializers.SerializerMethodField()
+    avatar_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = CustomUser
         fields = [
             'id', 'username', 'first_name', 'last_name', 
-            'avatar', 'bio', 'website', 
+            'avatar', 'avatar_variants', 'bio', 'website', 
             'followers_count', 'following_count', 'is_following'
         ]
         read_only_fields = ['followers_count', 'following_count']
+        list_serializer_class = UserListSerializer
 
     def get_is_following(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.followers.filter(id=request.user.id).exists()
-        return False
+        return get_viewer(self.context).is_following(obj.id)
+
+    def get_avatar_variants(self, obj):
+        return variant_urls(obj, self.context.get('request'))
+
+RECENT_COMMENTS_LIMIT = 3
+
 
 class CommentSerializer(serializers.ModelSerializer):
     user = UserMiniSerializer(read_only=True)
@@ -49,10 +89,52 @@ class PostCreateSerializer(serializers.ModelSerializer):
     """
     Post jaratıw ushın (Tekst hám Súwret).
     Avtor avtomatlıq qoyıladı.
+    Súwret multipart `image` arqalı yamasa aldın júklengen `upload_id` arqalı beriledi.
     """
+    upload_id = serializers.UUIDField(write_only=True, required=False)
+
     class Meta:
         model = Post
-        fields = ['id', 'image', 'caption']
+        fields = ['id', 'image', 'upload_id', 'caption']
+        extra_kwargs = {'image': {'required': False}}
+
+    def validate_image(self, value):
+        uploads.validate_image_file(value)
+        return value
+
+    def validate(self, attrs):
+        if ('image' in attrs) == ('upload_id' in attrs):
+            raise serializers.ValidationError("`image` yamasa `upload_id` - tek birewi beriliwi kerek.")
+        if 'upload_id' in attrs:
+            attrs['upload'], attrs['image'] = uploads.completed_upload(
+                self.context['request'].user.id, attrs.pop('upload_id')
+            )
+        return attrs
+
+    def create(self, validated_data):
+        upload = validated_data.pop('upload', None)
+        try:
+            post = super().create(validated_data)
+        finally:
+            if upload is not None:
+                validated_data['image'].close()
+        if upload is not None:
+            uploads.discard_upload(upload)
+        return post
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Bólip júklew (resumable upload). `received` - keyingi bólek baslanatuǵın bayt.
+    """
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'size', 'received', 'completed', 'format', 'width', 'height', 'created_at']
+        read_only_fields = ['received', 'completed', 'format', 'width', 'height']
+
+    def validate_size(self, value):
+        uploads.check_size(value)
+        return value
 
 class PostSerializer(serializers.ModelSerializer):
     """
@@ -64,6 +146,8 @@ class PostSerializer(serializers.ModelSerializer):
     likes_count = serializers.IntegerField(read_only=True)
     comments_count = serializers.IntegerField(read_only=True)
     
+    image_variants = serializers.SerializerMethodField()
+
     is_liked = serializers.SerializerMethodField()
     
     recent_comments = serializers.SerializerMethodField()
@@ -71,23 +155,26 @@ class PostSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = [
-            'id', 'author', 'image', 'caption', 
+            'id', 'author', 'image', 'image_variants', 'caption', 
             'created_at', 'likes_count', 'comments_count', 
             'is_liked', 'recent_comments'
         ]
+        list_serializer_class = PostListSerializer
+
+    def get_image_variants(self, obj):
+        """thumbnail / feed / full (WebP) URL-ları"""
+        return variant_urls(obj, self.context.get('request'))
 
     def get_is_liked(self, obj):
         """Házirgi paydalanıwshı like basqan ba?"""
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user).exists()
-        return False
+        return get_viewer(self.context).has_liked(obj.id)
 
     def get_recent_comments(self, obj):
         """
-        Postqa jazılǵan sońǵı 3 kommentariydi qaytaradı.
+        Postqa jazılǵan sońǵı 3 kommentariydi qaytaradı (bir soraw).
+        Tek bir post juwabında qollanıladı (update); betler fast_serializers.recent_comments() arqalı.
         """
-        comments = obj.comments.all().order_by('-created_at')[:3]
+        comments = obj.comments.select_related('user').order_by('-created_at', '-id')[:RECENT_COMMENTS_LIMIT]
         return CommentSerializer(comments, many=True).data
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -96,13 +183,25 @@ class NotificationSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Notification
-        fields = ['id', 'type', 'sender', 'post', 'post_image', 'is_read', 'created_at']
+        fields = ['id', 'type', 'sender', 'count', 'recent_senders', 'post', 'post_image', 'is_read', 'created_at']
 
     def get_post_image(self, obj):
         if obj.post and obj.post.image:
             return obj.post.image.url
         return None
 
+class HashtagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Hashtag
+        fields = ['name', 'posts_count']
+
+class MarkReadSerializer(serializers.Serializer):
+    """
+    Notification-lardı oqılǵan dep belgilew.
+    up_to berilse - usı notification hám onnan eskileri, bolmasa barlıǵı.
+    """
+    up_to = serializers.IntegerField(required=False)
+
 class RegisterSerializer(serializers.ModelSerializer):
     """
     Paydalanıwshını dizimnen ótkeriw ushın.
@@ -146,4 +245,28 @@ class ChangePasswordSerializer(serializers.Serializer):
         user = self.context['request'].user
         if not user.check_password(value):
             raise serializers.ValidationError("Eski parol qáte.")
-        return value
\ No newline at end of file
+        return value
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+    all = serializers.BooleanField(default=False)
+
+    def validate_refresh(self, value):
+        """Refresh token tekseriledi hám tek óz token-ıńızdı bıykar ete alasız."""
+        from rest_framework_simplejwt.exceptions import TokenError
+        from rest_framework_simplejwt.settings import api_settings
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        try:
+            token = RefreshToken(value)
+        except TokenError as error:
+            raise serializers.ValidationError(str(error))
+        if str(token[api_settings.USER_ID_CLAIM]) != str(self.context['request'].user.id):
+            raise serializers.ValidationError("Bul token sizdiki emes.")
+        return token
+
+
+class ProfileRequestsSerializer(serializers.Serializer):
+    """Keyingi neshe request cProfile menen profillenedi."""
+    requests = serializers.IntegerField(min_value=0, max_value=100)
@@ -1,25 +1,28 @@
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from .models import CustomUser, PostLike, PostComment, Notification
+from .models import CustomUser, Notification, Post, PostLike, PostComment, PostHashtag, Hashtag
+from .counters import increment
+from .notifications import change_unread, dispatcher
+from . import feed
+from . import search
+from . import tags
+from .cache import post_cache, user_cache
+from .authentication import revoke_user_tokens
 
 @receiver(post_save, sender=PostLike)
 def notify_post_like(sender, instance, created, **kwargs):
     """
     Paydalanıwshı postqa like basqanda (created=True) iske túsedi.
+    Notification request ishinde jazılmaydı, dispatcher náwbetine qoyıladı.
     """
     if created:
         like = instance
-        post = like.post
-        sender_user = like.user
-        receiver_user = post.author
-
-        if sender_user != receiver_user:
-            Notification.objects.create(
-                sender=sender_user,
-                receiver=receiver_user,
-                type='like',
-                post=post
-            )
+        dispatcher.emit(
+            sender_id=like.user_id,
+            receiver_id=like.post.author_id,
+            type='like',
+            post_id=like.post_id
+        )
 
 @receiver(post_save, sender=PostComment)
 def notify_post_comment(sender, instance, created, **kwargs):
@@ -28,17 +31,12 @@ def notify_post_comment(sender, instance, created, **kwargs):
     """
     if created:
         comment = instance
-        post = comment.post
-        sender_user = comment.user
-        receiver_user = post.author
-
-        if sender_user != receiver_user:
-            Notification.objects.create(
-                sender=sender_user,
-                receiver=receiver_user,
-                type='comment',
-                post=post
-            )
+        dispatcher.emit(
+            sender_id=comment.user_id,
+            receiver_id=comment.post.author_id,
+            type='comment',
+            post_id=comment.post_id
+        )
 
 @receiver(m2m_changed, sender=CustomUser.followers.through)
 def notify_user_follow(sender, instance, action, reverse, model, pk_set, **kwargs):
@@ -47,18 +45,183 @@ def notify_user_follow(sender, instance, action, reverse, model, pk_set, **kwarg
     action='post_add' - bul jańa jazılıwshı qosıldı degeni.
     """
     if action == 'post_add':
-        # instance: Kimge jazılıp atır (Qabıllawshı)
-        # pk_set: Kim jazılıp atır (Jiberiwshi ID-leri)
-        
-        receiver_user = instance
-        
-        for follower_id in pk_set:
-            sender_user = CustomUser.objects.get(pk=follower_id)
-            
-            if sender_user != receiver_user:
-                Notification.objects.create(
-                    sender=sender_user,
-                    receiver=receiver_user,
-                    type='follow',
-                    post=None # Follow ushın post kerek emes
-                )
\ No newline at end of file
+        # reverse=False: instance - Kimge jazılıp atır (Qabıllawshı), pk_set - Jiberiwshi ID-leri
+        # reverse=True: instance - Jiberiwshi, pk_set - Qabıllawshı ID-leri
+        for pk in pk_set:
+            sender_id, receiver_id = (instance.pk, pk) if reverse else (pk, instance.pk)
+            dispatcher.emit(
+                sender_id=sender_id,
+                receiver_id=receiver_id,
+                type='follow',
+                post_id=None # Follow ushın post kerek emes
+            )
+
+
+def _deleted_with_post(origin):
+    """Like/kommentariy posttıń ózi menen birge (cascade) óshirilip atır ma?"""
+    return origin is not None and getattr(origin, 'model', type(origin)) is Post
+
+
+@receiver(post_save, sender=PostLike)
+@receiver(post_delete, sender=PostLike)
+def count_post_likes(sender, instance, created=False, **kwargs):
+    """Post.likes_count sanawıshın jańalaydı."""
+    if kwargs['signal'] is post_save and not created:
+        return
+    if _deleted_with_post(kwargs.get('origin')):
+        return
+    amount = 1 if created else -1
+    increment(Post.objects.filter(pk=instance.post_id), 'likes_count', amount)
+
+
+@receiver(post_save, sender=PostComment)
+@receiver(post_delete, sender=PostComment)
+def count_post_comments(sender, instance, created=False, **kwargs):
+    """Post.comments_count sanawıshın jańalaydı."""
+    if kwargs['signal'] is post_save and not created:
+        return
+    if _deleted_with_post(kwargs.get('origin')):
+        return
+    amount = 1 if created else -1
+    increment(Post.objects.filter(pk=instance.post_id), 'comments_count', amount)
+
+
+@receiver(m2m_changed, sender=CustomUser.followers.through)
+def count_follows(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    followers_count / following_count sanawıshların jańalaydı.
+    reverse=False: instance - jazılıp atırǵan adam (followee), pk_set - jazılıwshılar.
+    reverse=True: instance - jazılıwshı, pk_set - ol jazılǵan adamlar.
+    """
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+
+    sign = 1 if action == 'post_add' else -1
+    if reverse:
+        followee_ids, follower_ids = pk_set, {instance.pk}
+    else:
+        followee_ids, follower_ids = {instance.pk}, pk_set
+
+    increment(CustomUser.objects.filter(pk__in=followee_ids), 'followers_count', sign * len(follower_ids))
+    increment(CustomUser.objects.filter(pk__in=follower_ids), 'following_count', sign * len(followee_ids))
+    if sign < 0:
+        feed.followers_decreased(followee_ids, len(follower_ids))
+
+
+@receiver(pre_delete, sender=CustomUser)
+def count_deleted_user_follows(sender, instance, **kwargs):
+    """
+    Paydalanıwshı óshirilgende onıń follow baylanısları cascade menen óshiriledi
+    (m2m_changed iske túspeydi), sonlıqtan basqalardıń sanawıshların usı jerde kemeytemiz.
+    """
+    Follow = CustomUser.followers.through
+    followed_ids = Follow.objects.filter(to_customuser_id=instance.pk).values('from_customuser_id')
+    increment(CustomUser.objects.filter(pk__in=followed_ids), 'followers_count', -1)
+    feed.followers_decreased(followed_ids, 1, exclude_owner_id=instance.pk)
+    increment(CustomUser.objects.filter(
+        pk__in=Follow.objects.filter(from_customuser_id=instance.pk).values('to_customuser_id')
+    ), 'following_count', -1)
+
+
+
+@receiver(post_delete, sender=Notification)
+def count_deleted_unread(sender, instance, **kwargs):
+    """
+    Oqılmaǵan notification óshirilse (post yamasa jiberiwshi menen cascade, admin)
+    alıwshınıń oqılmaǵanlar sanawıshı kemeyedi.
+    """
+    if not instance.is_read:
+        change_unread({instance.receiver_id: -1})
+
+
+def _indexed_fields_changed(kind, update_fields):
+    return update_fields is None or bool(set(update_fields) & set(search.INDEXED_FIELDS[kind]))
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, update_fields=None, **kwargs):
+    """Post caption-ın izlew indeksine jazadı."""
+    if _indexed_fields_changed('post', update_fields):
+        search.index_object('post', instance)
+
+
+@receiver(post_save, sender=CustomUser)
+def index_user(sender, instance, update_fields=None, **kwargs):
+    """username, first_name, last_name maydanların izlew indeksine jazadı."""
+    if _indexed_fields_changed('user', update_fields):
+        search.index_object('user', instance)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=CustomUser)
+def unindex_object(sender, instance, **kwargs):
+    search.remove_object('post' if sender is Post else 'user', instance.pk)
+
+
+
+@receiver(post_save, sender=Post)
+def extract_post_tags(sender, instance, update_fields=None, **kwargs):
+    """Caption-daǵı #hashtag hám @mention-lardı ajıratıp jazadı."""
+    if update_fields is None or 'caption' in update_fields:
+        tags.sync_post_hashtags(instance)
+        tags.sync_mentions(instance, instance.author_id, instance.caption)
+
+
+@receiver(post_save, sender=PostComment)
+def extract_comment_mentions(sender, instance, update_fields=None, **kwargs):
+    """Kommentariydegi @mention-lardı jazadı."""
+    if update_fields is None or 'text' in update_fields:
+        tags.sync_mentions(instance.post, instance.user_id, instance.text, comment=instance)
+
+
+@receiver(post_delete, sender=PostHashtag)
+def count_hashtag_posts(sender, instance, **kwargs):
+    """Hashtag.posts_count sanawıshın kemeytedi."""
+    increment(Hashtag.objects.filter(pk=instance.hashtag_id), 'posts_count', -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=PostComment)
+@receiver(post_delete, sender=PostComment)
+def invalidate_post_cache(sender, instance, **kwargs):
+    """Posttıń keshtegi payload-ın eskirtedi (caption, kommentariyler, comments_count)."""
+    post_cache.invalidate([instance.pk if sender is Post else instance.post_id])
+
+
+@receiver(post_save, sender=PostLike)
+@receiver(post_delete, sender=PostLike)
+def invalidate_like_cache(sender, instance, **kwargs):
+    """
+    Paydalanıwshınıń is_liked jaǵdayı. likes_count payload-qa hár juwapta qoyıladı,
+    sonlıqtan posttıń versiyası kóbeytilmeydi (populyar post keshte qaladı).
+    """
+    post_cache.invalidate_viewer(instance.user_id, [instance.post_id])
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_cache(sender, instance, created=False, update_fields=None, **kwargs):
+    user_cache.invalidate([instance.pk])
+    # Post payload-larındaǵı author / recent_comments: username hám avatar
+    if kwargs['signal'] is post_save and not created and (
+        update_fields is None or set(update_fields) & {'username', 'avatar', 'avatar_variants'}
+    ):
+        post_cache.invalidate_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=CustomUser.followers.through)
+def invalidate_follow_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    """Jazılıwshınıń is_following jaǵdayı (sanawıshlar payload-qa hár juwapta qoyıladı)."""
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+    for pk in pk_set:
+        follower_id, followee_id = (instance.pk, pk) if reverse else (pk, instance.pk)
+        user_cache.invalidate_viewer(follower_id, [followee_id])
+
+
+@receiver(post_save, sender=CustomUser)
+def revoke_inactive_user_tokens(sender, instance, created, update_fields=None, **kwargs):
+    """Akkaunt bloklanǵanda (is_active=False) onıń token-ları bıykar etiledi."""
+    if not created and not instance.is_active and (update_fields is None or 'is_active' in update_fields):
+        revoke_user_tokens(instance.pk)
@@ -0,0 +1,84 @@
+import re
+
+from .counters import increment
+from .models import CustomUser, Hashtag, PostHashtag, Mention
+from .notifications import dispatcher
+
+HASHTAG_RE = re.compile(r'(?<![\w&])#(\w+)')
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.+-]+)')
+HASHTAG_MAX_LENGTH = 100
+
+
+def extract_hashtags(text):
+    """#Beach #beach -> ['beach'] (kishi hárip, qaytalanbaydı)"""
+    tags = []
+    for match in HASHTAG_RE.findall(text or ''):
+        tag = match.casefold()[:HASHTAG_MAX_LENGTH]
+        if tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def extract_mentions(text):
+    """@alice, @bob. -> ['alice', 'bob']"""
+    usernames = []
+    for match in MENTION_RE.findall(text or ''):
+        username = match.rstrip('.')
+        if username and username not in usernames:
+            usernames.append(username)
+    return usernames
+
+
+def sync_post_hashtags(post):
+    """
+    Post caption-ındaǵı hashtag-lerdi PostHashtag kestesine jazadı.
+    Jańa baylanıslar ushın Hashtag.posts_count usı jerde, óshirilgenler ushın
+    post_delete signalında ózgeredi (post óshirilgendegi cascade-ti de qamtıydı).
+    """
+    names = extract_hashtags(post.caption)
+    current = dict(PostHashtag.objects.filter(post=post).values_list('hashtag__name', 'id'))
+
+    removed = [link_id for name, link_id in current.items() if name not in names]
+    if removed:
+        PostHashtag.objects.filter(id__in=removed).delete()
+
+    added = [name for name in names if name not in current]
+    if not added:
+        return
+
+    Hashtag.objects.bulk_create([Hashtag(name=name) for name in added], ignore_conflicts=True)
+    # Tek haqıyqatında qosılǵan baylanıslar sanaladı (parallel saqlaw sol baylanıstı qosıp qoyǵan bolıwı múmkin)
+    inserted = [
+        hashtag_id for hashtag_id in Hashtag.objects.filter(name__in=added).values_list('id', flat=True)
+        if PostHashtag.objects.get_or_create(
+            post=post, hashtag_id=hashtag_id, defaults={'created_at': post.created_at}
+        )[1]
+    ]
+    increment(Hashtag.objects.filter(pk__in=inserted), 'posts_count')
+
+
+def sync_mentions(post, author_id, text, comment=None):
+    """
+    Tekstdegi @username-lerdi Mention kestesine jazadı hám jańa belgilengen
+    paydalanıwshılarǵa 'mention' notification jiberedi (signals.py-daǵı sıyaqlı dispatcher arqalı).
+    """
+    usernames = extract_mentions(text)
+    mentions = Mention.objects.filter(post=post, comment=comment)
+
+    user_ids = set(CustomUser.objects.filter(username__in=usernames).values_list('id', flat=True))
+    current = set(mentions.values_list('user_id', flat=True))
+
+    if current - user_ids:
+        mentions.filter(user_id__in=current - user_ids).delete()
+
+    added = user_ids - current
+    Mention.objects.bulk_create(
+        [Mention(user_id=user_id, post=post, comment=comment) for user_id in added]
+    )
+    for user_id in added:
+        dispatcher.emit(
+            sender_id=author_id,
+            receiver_id=user_id,
+            type='mention',
+            post_id=post.id
+        )
@@ -1,3 +1,1161 @@
-from django.test import TestCase
+import asyncio
+import base64
+import io
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import feed as feed_service
+from . import db_routers, interactions, profiling, realtime, renderers, tags, uploads
+from .authentication import add_user_claims, deny_token, ensure_not_revoked, revoke_user_tokens
+from .cache import post_cache
+from .counters import reconcile_counters
+from .db_routers import PrimaryReplicaRouter
+from .fast_serializers import notification_rows, serialize_notifications, serialize_posts, serialize_users
+from .images import generate_variants
+from .models import (
+    CustomUser, FeedItem, Hashtag, Notification, Post, PostComment, PostHashtag, PostLike, UploadSession,
+)
+from .notifications import dispatcher
+from .serializers import NotificationSerializer, PostSerializer, UserSerializer
+from .viewer import ViewerContext
+from .write_queue import WriteQueue, WriteQueueBusy
+
+MEDIA_ROOT = tempfile.mkdtemp()
+# Ulıwma kesh default-tan bólek alias: process-ler arası maǵlıwmat sol jerge jazılıwı kerek
+SHARED_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-shared'},
+}
+
+
+def image_file(name='photo.jpg', size=(64, 48)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_VARIANTS_ASYNC=False, NOTIFICATION_QUEUE_ASYNC=False)
+class FastSerializerTests(TestCase):
+    """fast_serializers nátiyjesi DRF serializerleri menen bayt-ba-bayt birdey bolıwı kerek."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.alice = CustomUser.objects.create_user('alice', password='x', avatar=image_file('a.jpg'))
+        self.bob = CustomUser.objects.create_user('bob', password='x', first_name='Bob', bio='hi')
+        self.bob.followers.add(self.alice)
+        self.alice.followers.add(self.bob)
+
+        self.photo = Post.objects.create(author=self.alice, image=image_file(), caption='Sálem @bob #tag')
+        self.empty = Post.objects.create(author=self.bob, image=image_file(), caption='')
+        for i in range(5):
+            PostComment.objects.create(
+                post=self.photo, user=self.alice if i % 2 else self.bob, text=f'kommentariy {i}'
+            )
+        PostLike.objects.create(user=self.bob, post=self.photo)
+
+        generate_variants(CustomUser, self.alice.pk)
+        for post in (self.photo, self.empty):
+            generate_variants(Post, post.pk)
+
+        self.request = APIRequestFactory().get('/api/posts/')
+        self.request.user = self.bob
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_posts(self):
+        ids = [self.empty.id, self.photo.id]
+        posts = Post.objects.select_related('author').in_bulk(ids)
+        expected = PostSerializer([posts[pk] for pk in ids], many=True, context={'request': self.request}).data
+
+        actual = serialize_posts(ids, self.request, ViewerContext(self.bob))
+        self.assertEqual(self.render(actual), self.render(expected))
+        self.assertEqual(len(actual[1]['recent_comments']), 3)
+
+    def test_posts_skip_missing_ids(self):
+        actual = serialize_posts([999, self.photo.id], self.request, ViewerContext(self.bob))
+        self.assertEqual([post['id'] for post in actual], [self.photo.id])
+
+    def test_users(self):
+        ids = [self.alice.id, self.bob.id]
+        users = CustomUser.objects.in_bulk(ids)
+        expected = UserSerializer([users[pk] for pk in ids], many=True, context={'request': self.request}).data
+
+        actual = serialize_users(ids, self.request, ViewerContext(self.bob))
+        self.assertEqual(self.render(actual), self.render(expected))
+
+    def test_notifications(self):
+        queryset = Notification.objects.filter(receiver=self.alice).order_by('-created_at', '-id')
+        self.assertTrue(queryset.filter(post__isnull=True).exists())
+        expected = NotificationSerializer(
+            queryset.select_related('sender', 'post'), many=True, context={'request': self.request}
+        ).data
+
+        actual = serialize_notifications(notification_rows(queryset), self.request)
+        self.assertEqual(self.render(actual), self.render(expected))
+
+
+@unittest.skipIf(renderers.orjson is None, "orjson ornatılmaǵan")
+class RendererTests(TestCase):
+    """ORJSONRenderer / ORJSONParser standart DRF JSON menen bayt-ba-bayt birdey."""
+
+    def test_render(self):
+        data = {
+            'created_at': timezone.now().replace(microsecond=123456),
+            'naive': timezone.now().replace(tzinfo=None),
+            'date': timezone.now().date(),
+            'time': timezone.now().time(),
+            'duration': timedelta(minutes=5),
+            'price': Decimal('1.50'),
+            'id': uuid.uuid4(),
+            'lazy': gettext_lazy("Sálem"),
+            'errors': [ErrorDetail("Qáte", code='invalid')],
+            'text': 'Qaraqalpaqsha «ǵ» 😀 </script>',
+            'numbers': [0, -1, 1.5, 0.1, 2 ** 53, None, True],
+            1: 'san gilt',
+        }
+        self.assertEqual(renderers.ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(renderers.ORJSONRenderer().render(None), b'')
+        # Eksponentalı float-lar ǵana basqasha jazıladı (ekewi de durıs JSON)
+        self.assertEqual(json.loads(renderers.ORJSONRenderer().render([1e20])), [1e20])
+
+        # indent soralsa standart renderer
+        context = {'indent': 2}
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(data, 'application/json', context),
+            JSONRenderer().render(data, 'application/json', context),
+        )
+
+    def test_error_response(self):
+        response = APIClient().post('/api/auth/register/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_parse(self):
+        body = json.dumps({'text': 'ǵ 😀', 'items': [1, 2.5, None], 'nested': {'a': True}}).encode()
+        self.assertEqual(renderers.ORJSONParser().parse(io.BytesIO(body)), json.loads(body))
+
+        response = APIClient().post('/api/auth/token/', b'{"username": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.json()['detail'].startswith('JSON parse error'))
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN - SQLite")
+@override_settings(IMAGE_VARIANTS_ASYNC=False, NOTIFICATION_QUEUE_ASYNC=False)
+class QueryPlanTests(TestCase):
+    """Hár endpoint-tiń sorawları indeks arqalı oqıladı hám bólek sort qádemi (TEMP B-TREE) joq."""
+
+    def setUp(self):
+        self.alice = CustomUser.objects.create_user('alice', password='x')
+        self.bob = CustomUser.objects.create_user('bob', password='x')
+        self.alice.followers.add(self.bob)
+        # Populyar avtor: postları feed oqılǵanda author_id boyınsha alınadı
+        CustomUser.objects.filter(pk=self.alice.pk).update(
+            followers_count=feed_service.FANOUT_FOLLOWER_LIMIT + 1
+        )
+        # Nusqalar tolıq (source menen): soraw waqıtında súwret islenbeydi, plan-ǵa artıqsha soraw qosılmaydı
+        self.post = Post.objects.create(
+            author=self.alice, image='posts/plan.jpg', image_variants=variants('posts/plan.jpg')
+        )
+        for i in range(3):
+            PostComment.objects.create(post=self.post, user=self.bob, text=f'kommentariy {i}')
+        PostLike.objects.create(user=self.bob, post=self.post)
+
+    def plans(self, user, url):
+        """[(sql, [plan qatarları]), ...] - endpoint-tiń SELECT sorawları."""
+        client = APIClient()
+        client.force_authenticate(user)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(client.get(url).status_code, 200)
+
+        plans = []
+        for query in queries.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                plans.append((query['sql'], [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    def assertUsesIndex(self, user, url, index, sorted=True):
+        plans = self.plans(user, url)
+        matching = [(sql, plan) for sql, plan in plans if any(re.search(rf'INDEX {index}\b', line) for line in plan)]
+        report = '\n\n'.join(f'{sql}\n  {plan}' for sql, plan in plans)
+        self.assertTrue(matching, f'{url}: {index} qollanılmadı.\n\n{report}')
+        if sorted:
+            for sql, plan in matching:
+                # 'FOR ORDER BY' hám 'FOR RIGHT PART OF ORDER BY' (indeks tártibi tek bir bóleginde)
+                sorts = [line for line in plan if line.startswith('USE TEMP B-TREE FOR') and 'ORDER BY' in line]
+                self.assertFalse(sorts, f'{url}: sort qádemi bar.\n\n{sql}\n  {plan}')
+
+    def test_posts_list(self):
+        self.assertUsesIndex(self.bob, '/api/posts/', 'post_created_idx')
+
+    def test_feed_popular_authors(self):
+        # Feed derekleri (FeedItem + hár populyar avtor) hár biri indeks tártibinde oqıladı
+        self.assertUsesIndex(self.bob, '/api/posts/feed/', 'post_author_created_idx')
+        self.assertUsesIndex(self.bob, '/api/posts/feed/', 'feeditem_owner_created_idx')
+
+    def test_recent_comments(self):
+        # Window (ROW_NUMBER) nátiyjesi sort qılınadı, kommentariyler indeks tártibinde oqıladı
+        self.assertUsesIndex(self.bob, '/api/posts/', 'postcomment_post_created_idx', sorted=False)
+
+    def test_post_comments(self):
+        self.assertUsesIndex(self.bob, f'/api/posts/{self.post.id}/comments/', 'postcomment_post_created_idx')
+
+    def test_notifications(self):
+        self.assertUsesIndex(self.alice, '/api/notifications/', 'notification_receiver_idx')
+
+    def test_unread_count(self):
+        self.assertUsesIndex(self.alice, '/api/notifications/unread-count/', 'notification_unread_idx')
+
+    def test_tag_posts(self):
+        self.post.caption = '#plan'
+        self.post.save()
+        self.assertUsesIndex(self.bob, '/api/tags/plan/posts/', 'posthashtag_tag_created_idx')
+
+
+@override_settings(IMAGE_VARIANTS_ASYNC=False, NOTIFICATION_QUEUE_ASYNC=False)
+class FeedTests(TestCase):
+    """Feed: FeedItem hám populyar avtor postları bir (created_at, post_id) tártibinde betlenedi."""
+
+    def setUp(self):
+        self.viewer = CustomUser.objects.create_user('viewer', password='x')
+        self.author = author = CustomUser.objects.create_user('author', password='x')
+        popular = CustomUser.objects.create_user('popular', password='x')
+        self.viewer.following.add(author, popular)
+        CustomUser.objects.filter(pk=popular.pk).update(followers_count=feed_service.FANOUT_FOLLOWER_LIMIT + 1)
+
+        start = timezone.now() - timedelta(days=1)
+        for i in range(25):
+            name = f'posts/feed{i}.jpg'
+            post = Post.objects.create(
+                author=popular if i % 3 == 0 else author, image=name, image_variants=variants(name)
+            )
+            # Bir waqıtlı postlar: tártip post_id boyınsha
+            Post.objects.filter(pk=post.pk).update(created_at=start + timedelta(minutes=i // 2))
+        feed_service.rebuild_feed(self.viewer)
+        self.expected = list(Post.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def pages(self):
+        pages = []
+        url = '/api/posts/feed/'
+        while url:
+            pages.append(self.client.get(url).json())
+            url = pages[-1]['next']
+        return pages
+
+    def feed_ids(self):
+        pages = self.pages()
+        # Birdey post eki derekten kelse bet tolıq bolmay qaladı
+        self.assertEqual([len(page['results']) for page in pages[:-1]], [10] * (len(pages) - 1))
+        return [post['id'] for page in pages for post in page['results']]
+
+    def test_pages(self):
+        pages = self.pages()
+        self.assertEqual([post['id'] for page in pages for post in page['results']], self.expected)
+        self.assertEqual(len(pages), 3)
+
+        previous = self.client.get(pages[-1]['previous']).json()
+        self.assertEqual(previous['results'], pages[1]['results'])
+
+    @mock.patch.object(feed_service, 'FANOUT_FOLLOWER_LIMIT', 1)
+    def test_popularity_threshold(self):
+        fan = APIClient()
+        fan.force_authenticate(CustomUser.objects.create_user('fan', password='x'))
+        follow_url = f'/api/users/{self.author.id}/follow/'
+
+        # Avtor populyar boladı: burınǵı postları FeedItem-de de, tikkeley derekte de bar
+        self.assertEqual(fan.put(follow_url).status_code, 200)
+        self.author.refresh_from_db()
+        post = Post.objects.create(author=self.author, image='posts/new.jpg', image_variants=variants('posts/new.jpg'))
+        feed_service.fan_out_post(post)
+        self.assertFalse(FeedItem.objects.filter(post=post).exists())
+        self.assertEqual(self.feed_ids(), [post.id] + self.expected)
+
+        # Shegaradan tústi: populyar waqıttaǵı postı lentaǵa qosıladı
+        self.assertEqual(fan.delete(follow_url).status_code, 200)
+        self.assertTrue(FeedItem.objects.filter(owner=self.viewer, post=post).exists())
+        self.assertEqual(self.feed_ids(), [post.id] + self.expected)
+
+
+def variants(name):
+    # Nusqalar bar dep esaplanadı: juwap waqıtında súwret islenbeydi
+    return {'source': name, 'thumbnail': name, 'feed': name, 'full': name}
+
+
+class UsersFixture:
+    """alice, onıń postı hám bob (client bob atınan). Kesh bos."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.alice = CustomUser.objects.create_user('alice', password='x')
+        self.bob = CustomUser.objects.create_user('bob', password='x')
+        self.post = Post.objects.create(author=self.alice, image='posts/p.jpg', image_variants=variants('posts/p.jpg'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.bob)
+
+
+@override_settings(IMAGE_VARIANTS_ASYNC=False, NOTIFICATION_QUEUE_ASYNC=False)
+class QueryBudgetTests(TestCase):
+    """
+    Endpoint-lardıń soraw sanı bet mazmunınan ǵárezsiz (N+1 joq) hám juwap waqıtı shegarada.
+    Kesh bos (eń jaman jaǵday). Shegaradan asqanda barlıq SQL basıp shıǵarıladı.
+    """
+    # Sekund; áste CI ushın PERF_LATENCY_BUDGET penen ózgertiledi
+    latency_budget = getattr(settings, 'PERF_LATENCY_BUDGET', 0.5)
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(0)
+        cls.viewer = CustomUser.objects.create(username='viewer', first_name='Viewer')
+        users = [CustomUser.objects.create(username=f'user{i}', first_name=f'Ati{i}') for i in range(40)]
+        for user in users[:8]:
+            name = f'avatars/{user.pk}.jpg'
+            CustomUser.objects.filter(pk=user.pk).update(
+                avatar=name, avatar_variants={'source': name, 'small': name, 'thumbnail': name}
+            )
+
+        cls.viewer.following.add(*users[:25])
+        for user in users[25:]:
+            user.followers.add(*rng.sample(users[:25], 5))
+
+        Post.objects.bulk_create([
+            Post(author=rng.choice(users), image=f'posts/{i}.jpg', image_variants=variants(f'posts/{i}.jpg'),
+                 caption=f'post {i}')
+            for i in range(200)
+        ])
+        posts = list(Post.objects.all())
+        PostLike.objects.bulk_create([
+            PostLike(user=user, post=post)
+            for user in (cls.viewer, *users[:20]) for post in rng.sample(posts, 25)
+        ])
+        PostComment.objects.bulk_create([
+            PostComment(user=rng.choice(users), post=rng.choice(posts), text=f'kommentariy {i}')
+            for i in range(600)
+        ])
+        Notification.objects.bulk_create([
+            Notification(sender=rng.choice(users), receiver=cls.viewer, type=rng.choice(['like', 'comment']),
+                         post=rng.choice(posts), is_read=i % 3 == 0)
+            for i in range(60)
+        ] + [
+            Notification(sender=user, receiver=cls.viewer, type='follow') for user in users[:10]
+        ])
+        reconcile_counters()
+        feed_service.rebuild_feed(cls.viewer)
+        cls.post = posts[0]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def measure(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = self.client.get(url)
+            elapsed = time.perf_counter() - started
+        self.assertEqual(response.status_code, 200, url)
+        return response, queries.captured_queries, elapsed
+
+    def assertBudget(self, url, budget, pages=1):
+        """url hám keyingi (pages - 1) bet: hár biri tap `budget` soraw, latency_budget ishinde."""
+        for page in range(pages):
+            self.assertIsNotNone(url, f'{page}-betten keyin keyingi bet joq')
+            response, queries, elapsed = self.measure(url)
+            sql = '\n'.join(f'{i}. {query["sql"]}' for i, query in enumerate(queries, 1))
+            self.assertEqual(
+                len(queries), budget, f'{url}: {len(queries)} soraw (kútilgen {budget}):\n{sql}'
+            )
+            self.assertLess(
+                elapsed, self.latency_budget,
+                f'{url}: {elapsed * 1000:.0f} ms (shegara {self.latency_budget * 1000:.0f} ms):\n{sql}'
+            )
+            if page + 1 < pages:
+                url = response.json()['next']
+
+    # Soraw sanı: bet ID-leri (hám validatorlar), payload-lar, sońǵı kommentariyler, viewer jaǵdayı
+    def test_feed(self):
+        # + jazılǵan populyar avtorlar
+        self.assertBudget('/api/posts/feed/', 5, pages=3)
+
+    def test_posts_list(self):
+        self.assertBudget('/api/posts/', 4, pages=3)
+
+    def test_posts_retrieve(self):
+        self.assertBudget(f'/api/posts/{self.post.id}/', 4)
+
+    def test_users_search(self):
+        self.assertBudget('/api/users/search/?q=user', 3, pages=2)
+
+    def test_me(self):
+        self.assertBudget('/api/users/me/', 2)
+
+    def test_notifications(self):
+        self.assertBudget('/api/notifications/', 3, pages=3)
+
+
+@override_settings(NOTIFICATION_QUEUE_ASYNC=False)
+class InteractionTests(UsersFixture, TestCase):
+    """Like / follow: qayta jiberilgen request sanawısh hám notification-dı ekilemeydi."""
+
+    def counts(self):
+        self.post.refresh_from_db()
+        return self.post.likes_count, PostLike.objects.count(), Notification.objects.filter(type='like').count()
+
+    def test_like_put_delete(self):
+        url = f'/api/posts/{self.post.id}/like/'
+        self.assertEqual(self.client.put(url).status_code, 201)
+        self.assertEqual(self.client.put(url).status_code, 200)
+        self.assertEqual(self.counts(), (1, 1, 1))
+
+        self.assertEqual(self.client.delete(url).status_code, 200)
+        self.assertEqual(self.client.delete(url).status_code, 200)
+        self.assertEqual(self.counts(), (0, 0, 1))
+
+        self.assertEqual(self.client.post(url).status_code, 201)
+        self.assertEqual(self.client.post(url).status_code, 200)
+        self.assertEqual(self.counts()[:2], (0, 0))
+
+    def test_follow_put_delete(self):
+        url = f'/api/users/{self.alice.id}/follow/'
+        for _ in range(2):
+            self.assertEqual(self.client.put(url).status_code, 200)
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.assertEqual((self.alice.followers_count, self.bob.following_count), (1, 1))
+        self.assertEqual(Notification.objects.filter(type='follow').count(), 1)
+        self.assertTrue(self.alice.followers.filter(pk=self.bob.pk).exists())
+
+        for _ in range(2):
+            self.assertEqual(self.client.delete(url).status_code, 200)
+        self.alice.refresh_from_db()
+        self.bob.refresh_from_db()
+        self.assertEqual((self.alice.followers_count, self.bob.following_count), (0, 0))
+        self.assertFalse(self.alice.followers.exists())
+
+    def test_toggle_race(self):
+        # Parallel toggle like-tı unlike-tan keyin, like-tan aldın qostı: qayta urınıp óshiredi
+        interactions.like(self.alice.id, self.post)
+        unlike = interactions.unlike
+        calls = []
+
+        def racing_unlike(user_id, post):
+            calls.append(user_id)
+            return False if len(calls) == 1 else unlike(user_id, post)
+
+        with mock.patch.object(interactions, 'unlike', racing_unlike):
+            self.assertFalse(interactions.toggle_like(self.alice.id, self.post))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.counts()[:2], (0, 0))
+
+    def test_idempotency_key(self):
+        url = f'/api/posts/{self.post.id}/like/'
+        first = self.client.post(url, HTTP_IDEMPOTENCY_KEY='k1')
+        replay = self.client.post(url, HTTP_IDEMPOTENCY_KEY='k1')
+        self.assertEqual((first.status_code, replay.status_code), (201, 201))
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.assertEqual(self.counts()[:2], (1, 1))
+
+        # Basqa kilt - jańa request
+        self.assertEqual(self.client.post(url, HTTP_IDEMPOTENCY_KEY='k2').status_code, 200)
+        self.assertEqual(self.counts()[:2], (0, 0))
+
+
+@override_settings(NOTIFICATION_QUEUE_ASYNC=False)
+class CounterTests(UsersFixture, TestCase):
+    """Cascade menen óshiriwde sanawıshlar kemeyedi, reconcile_counters qalǵan parqtı dúzetedi."""
+
+    def setUp(self):
+        super().setUp()
+        self.carol = CustomUser.objects.create_user('carol', password='x')
+        self.alice.followers.add(self.bob, self.carol)
+        self.carol.followers.add(self.alice, self.bob)
+        for user in (self.bob, self.carol):
+            PostLike.objects.create(user=user, post=self.post)
+            PostComment.objects.create(user=user, post=self.post, text='sálem')
+
+    def counts(self):
+        users = CustomUser.objects.in_bulk([self.alice.id, self.bob.id])
+        self.post.refresh_from_db()
+        return (
+            self.post.likes_count, self.post.comments_count,
+            users[self.alice.id].followers_count, users[self.alice.id].following_count,
+            users[self.bob.id].following_count,
+        )
+
+    def test_user_cascade(self):
+        self.assertEqual(self.counts(), (2, 2, 2, 1, 2))
+        self.carol.delete()
+        self.assertEqual(self.counts(), (1, 1, 1, 0, 1))
+        self.assertEqual(reconcile_counters(), dict.fromkeys(
+            ['Post.likes_count', 'Post.comments_count', 'CustomUser.followers_count', 'CustomUser.following_count'], 0
+        ))
+
+    def test_post_cascade(self):
+        other = Post.objects.create(author=self.alice, image='posts/o.jpg', image_variants=variants('posts/o.jpg'))
+        PostLike.objects.create(user=self.bob, post=other)
+        with CaptureQueriesContext(connection) as queries:
+            self.post.delete()
+        # Óshirilip atırǵan posttıń sanawıshı jańalanbaydı
+        self.assertFalse([query for query in queries.captured_queries if 'likes_count' in query['sql']])
+        other.refresh_from_db()
+        self.assertEqual(other.likes_count, 1)
+
+    def test_reconcile(self):
+        Post.objects.filter(pk=self.post.pk).update(likes_count=7, comments_count=0)
+        CustomUser.objects.filter(pk=self.alice.pk).update(followers_count=0)
+        CustomUser.objects.filter(pk=self.bob.pk).update(following_count=9)
+
+        output = io.StringIO()
+        call_command('reconcile_counters', stdout=output)
+        self.assertIn('Post.likes_count: 1', output.getvalue())
+        self.assertIn('CustomUser.following_count: 1', output.getvalue())
+        self.assertEqual(self.counts(), (2, 2, 2, 1, 2))
+        self.assertEqual(set(reconcile_counters().values()), {0})
+
+
+class SearchTests(UsersFixture, TestCase):
+    """Izlew: hár sóz prefiks, kóp sóz sáykes kelgen birinshi; ?search= barlıq sózlerdi talap etedi."""
+
+    def create_post(self, caption):
+        return Post.objects.create(author=self.alice, image='posts/p.jpg', image_variants=variants('posts/p.jpg'),
+                                   caption=caption)
+
+    def search(self, url):
+        return [item['id'] for item in self.client.get(url).json()['results']]
+
+    def test_ranking(self):
+        both = self.create_post('Teńiz hám quyash')
+        sea = self.create_post('teńizde júzdik')
+        sun = self.create_post('quyash')
+        self.create_post('ten tenge')
+
+        # (rank, id) kemeyiw tártibinde; úlken-kishi hárip parqı joq
+        self.assertEqual(self.search('/api/posts/search/?q=TEŃ quy'), [both.id, sun.id, sea.id])
+        self.assertEqual(self.search('/api/posts/search/?q=teńiz'), [sea.id, both.id])
+        self.assertEqual(self.search('/api/posts/search/?q=teńizdex'), [])
+        self.assertEqual(self.search('/api/posts/search/?q=%20'), [])
+
+    def test_search_filter(self):
+        CustomUser.objects.create_user('alibek', password='x', first_name='Bob')
+        self.assertEqual(
+            sorted(user['username'] for user in self.client.get('/api/users/?search=ali').json()['results']),
+            ['alibek', 'alice'],
+        )
+        # Barlıq sózler tabılıwı shárt
+        self.assertEqual(
+            [user['username'] for user in self.client.get('/api/users/?search=ali bob').json()['results']],
+            ['alibek'],
+        )
+
+
+@override_settings(NOTIFICATION_QUEUE_ASYNC=False)
+class TagTests(UsersFixture, TestCase):
+    """#hashtag hám @mention: caption ózgergende hám post óshirilgende sanawıshlar durıs."""
+
+    def counts(self):
+        return dict(Hashtag.objects.filter(posts_count__gt=0).values_list('name', 'posts_count'))
+
+    def caption(self, post, text):
+        post.caption = text
+        post.save()
+
+    def test_extract(self):
+        self.assertEqual(tags.extract_hashtags('#Beach #beach x#no &#39; #sun.'), ['beach', 'sun'])
+        self.assertEqual(tags.extract_mentions('@alice, @bob. a@b.c @alice'), ['alice', 'bob'])
+
+    def test_counts_and_mentions(self):
+        self.caption(self.post, '#Beach #beach @bob @nobody')
+        self.assertEqual(self.counts(), {'beach': 1})
+        self.assertEqual(list(self.post.mentions.values_list('user__username', flat=True)), ['bob'])
+
+        # Qayta saqlaw hesh nárseni ekilemeydi
+        self.caption(self.post, '#beach @bob')
+        self.assertEqual(self.counts(), {'beach': 1})
+        self.assertEqual(Notification.objects.get(receiver=self.bob, type='mention').count, 1)
+
+        self.caption(self.post, '#sun')
+        other = Post.objects.create(author=self.bob, image='posts/o.jpg', caption='#sun #sea')
+        self.assertEqual(self.counts(), {'sun': 2, 'sea': 1})
+        self.assertFalse(self.post.mentions.exists())
+
+        other.delete()
+        self.assertEqual(self.counts(), {'sun': 1})
+
+    def test_tag_posts(self):
+        posts = [
+            Post.objects.create(author=self.alice, image=f'posts/t{i}.jpg', image_variants=variants(f'posts/t{i}.jpg'),
+                                caption='#sea')
+            for i in range(12)
+        ]
+        # Bir waqıtlı postlar: tártip baylanıs id-i boyınsha
+        start = timezone.now() - timedelta(days=1)
+        for i, post in enumerate(posts):
+            PostHashtag.objects.filter(post=post).update(created_at=start + timedelta(minutes=i // 3))
+        expected = list(PostHashtag.objects.order_by('-created_at', '-id').values_list('post_id', flat=True))
+
+        ids = []
+        url = '/api/tags/sea/posts/'
+        while url:
+            data = self.client.get(url).json()
+            ids += [post['id'] for post in data['results']]
+            url = data['next']
+        self.assertEqual(ids, expected)
+        self.assertEqual(self.client.get('/api/tags/').json()['results'], [{'name': 'sea', 'posts_count': 12}])
+
+
+@override_settings(CACHES=SHARED_CACHES, SHARED_CACHE_ALIAS='shared', NOTIFICATION_QUEUE_ASYNC=False)
+class ReplicaRouterTests(UsersFixture, TestCase):
+    """Oqıw - replica, jazıw - primary; jazıwdan keyin paydalanıwshı primary-den oqıydı."""
+
+    def test_routing(self):
+        router = PrimaryReplicaRouter()
+        with mock.patch.object(db_routers, 'replica_aliases', return_value=['replica']):
+            self.assertEqual(router.db_for_read(Post), 'default')
+            with db_routers.read_from(True):
+                self.assertEqual(router.db_for_read(Post), 'replica')
+                self.assertEqual(router.db_for_write(Post), 'default')
+        # Replica konfiguraciya qılınbaǵan - primary
+        with mock.patch.object(db_routers, 'replica_aliases', return_value=[]), db_routers.read_from(True):
+            self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertTrue(router.allow_migrate('default', 'core'))
+        self.assertFalse(router.allow_migrate('replica', 'core'))
+
+    def test_sticky_after_write(self):
+        # Replica sıpatında default-tıń ózi: replica_aliases() shaqırılsa oqıw replica-ǵa ketken
+        with mock.patch.object(db_routers, 'replica_aliases', return_value=['default']) as replicas:
+            self.assertEqual(self.client.get('/api/posts/').status_code, 200)
+            self.assertTrue(replicas.called)
+
+            self.assertEqual(self.client.put(f'/api/posts/{self.post.id}/like/').status_code, 201)
+            self.assertTrue(caches['shared'].get(f'db:sticky:{self.bob.id}'))
+            self.assertIsNone(caches['default'].get(f'db:sticky:{self.bob.id}'))
+
+            replicas.reset_mock()
+            self.assertEqual(self.client.get('/api/posts/').status_code, 200)
+            self.assertFalse(replicas.called)
+
+            # Basqa paydalanıwshı replica-dan oqıwdı dawam etedi
+            self.client.force_authenticate(self.alice)
+            self.assertEqual(self.client.get('/api/posts/').status_code, 200)
+            self.assertTrue(replicas.called)
+
+    def test_failed_write_not_sticky(self):
+        self.assertEqual(self.client.put('/api/posts/999/like/').status_code, 404)
+        self.assertFalse(db_routers.is_sticky(self.bob.id))
+
+
+@override_settings(NOTIFICATION_QUEUE_ASYNC=False)
+class PayloadCacheTests(UsersFixture, TestCase):
+    """Post payload-ı: avtor ózgerse eskiredi, like basılsa keshte qaladı."""
+
+    def setUp(self):
+        super().setUp()
+        PostComment.objects.create(post=self.post, user=self.bob, text='sálem')
+        self.url = f'/api/posts/{self.post.id}/'
+
+    def test_user_rename(self):
+        self.client.get(self.url)
+        self.alice.username = 'alice2'
+        self.alice.save(update_fields=['username'])
+        self.bob.username = 'bob2'
+        self.bob.save()
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['author']['username'], 'alice2')
+        self.assertEqual(data['recent_comments'][0]['user']['username'], 'bob2')
+
+    def test_etag_follows_payload_version(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.alice.username = 'alice2'
+        self.alice.save(update_fields=['username'])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['author']['username'], 'alice2')
+
+    def test_page_count_in_etag(self):
+        # Birinshi bet ózgermeydi, jámi san ózgeredi
+        last = [CustomUser.objects.create_user(f'user{i}', password='x') for i in range(9)][-1]
+        etag = self.client.get('/api/users/')['ETag']
+        self.assertEqual(self.client.get('/api/users/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        last.delete()
+        response = self.client.get('/api/users/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['count'], response.json()['next']), (10, None))
+
+    def test_like_keeps_payload(self):
+        self.client.get(self.url)
+        version = post_cache.versions([self.post.id])[self.post.id]
+        self.client.put(f'{self.url}like/')
+
+        self.assertEqual(post_cache.versions([self.post.id])[self.post.id], version)
+        data = self.client.get(self.url).json()
+        self.assertEqual((data['likes_count'], data['is_liked']), (1, True))
+        data = self.client.get('/api/posts/').json()['results'][0]
+        self.assertEqual((data['likes_count'], data['is_liked']), (1, True))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, UPLOAD_PARTIAL_DIR=MEDIA_ROOT, UPLOAD_CHUNK_SIZE=256,
+                   IMAGE_VARIANTS_ASYNC=False, NOTIFICATION_QUEUE_ASYNC=False)
+class UploadTests(UsersFixture, TestCase):
+    """Bólip júklew: bólekler tártip penen keledi, artıq bayt hám eski upload-lar óshiriledi."""
+
+    def setUp(self):
+        super().setUp()
+        self.content = image_file(size=(120, 80)).read()
+        self.half = len(self.content) // 2
+
+    def start(self, size=None):
+        response = self.client.post('/api/uploads/', {'size': size or len(self.content)}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def put(self, upload_id, start, end, body=None):
+        return self.client.put(
+            f'/api/uploads/{upload_id}/', self.content[start:end] if body is None else body,
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end - 1}/{len(self.content)}',
+        )
+
+    def test_resume(self):
+        upload_id = self.start()
+        # Ekinshi bólek birinshiden aldın kelse 409, client `received`-ten dawam etedi
+        self.assertEqual(self.put(upload_id, self.half, len(self.content)).status_code, 409)
+        self.assertEqual(self.put(upload_id, 0, self.half).json()['received'], self.half)
+        self.assertEqual(self.put(upload_id, 0, self.half).status_code, 409)
+        self.assertEqual(self.client.get(f'/api/uploads/{upload_id}/').json()['received'], self.half)
+
+        data = self.put(upload_id, self.half, len(self.content)).json()
+        self.assertEqual((data['completed'], data['format'], data['width'], data['height']), (True, 'JPEG', 120, 80))
+
+        session = UploadSession.objects.get(pk=upload_id)
+        path = uploads.partial_path(session)
+        response = self.client.post('/api/posts/', {'upload_id': upload_id, 'caption': 'bólip'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        post = Post.objects.get(caption='bólip')
+        with post.image.open('rb') as image:
+            self.assertEqual(image.read(), self.content)
+        self.assertFalse(UploadSession.objects.filter(pk=upload_id).exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_invalid_content_range(self):
+        upload_id = self.start()
+        response = self.client.put(
+            f'/api/uploads/{upload_id}/', self.content, content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes 0-{len(self.content)}/{len(self.content) + 1}',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).received, 0)
+
+    @override_settings(POST_IMAGE_MAX_SIZE=1024 * 1024)
+    def test_oversize(self):
+        response = self.client.post('/api/uploads/', {'size': 1024 * 1024 + 1}, format='json')
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(UploadSession.objects.exists())
+
+        # Body Content-Range-ten uzın: upload óshiriledi
+        upload_id = self.start()
+        path = uploads.partial_path(UploadSession.objects.get(pk=upload_id))
+        self.assertEqual(self.put(upload_id, 0, self.half, body=self.content).status_code, 413)
+        self.assertFalse(UploadSession.objects.filter(pk=upload_id).exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_clear_uploads(self):
+        expired, fresh = self.start(), self.start()
+        UploadSession.objects.filter(pk=expired).update(updated_at=timezone.now() - timedelta(days=2))
+        path = uploads.partial_path(UploadSession.objects.get(pk=expired))
+
+        output = io.StringIO()
+        call_command('clear_uploads', stdout=output)
+        self.assertIn('1 upload', output.getvalue())
+        self.assertEqual(list(UploadSession.objects.values_list('pk', flat=True)), [uuid.UUID(fresh)])
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(uploads.partial_path(UploadSession.objects.get(pk=fresh))))
+
+
+@override_settings(PROFILING_ENABLED=True, PROFILING_SLOW_THRESHOLD=60, NOTIFICATION_QUEUE_ASYNC=False)
+class ProfilingTests(UsersFixture, TestCase):
+    """Barlıq request-lerdiń waqıtı jazıladı, SQL / render tek tańlanǵanlarda; metrikalar - tek admin."""
+
+    def setUp(self):
+        super().setUp()
+        profiling.metrics.reset()
+        self.addCleanup(profiling.metrics.reset)
+        self.admin = CustomUser.objects.create_user('admin', password='x', is_staff=True)
+
+    def get_metrics(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode().splitlines()
+
+    def test_histogram(self):
+        histogram = profiling.Histogram('x_seconds', "Waqıt.", (0.1, 1))
+        histogram.observe(('post-list', 'GET'), 0.05)
+        histogram.observe(('post-list', 'GET'), 0.5)
+        histogram.observe(('post-list', 'GET'), 2)
+        self.assertEqual(histogram.expose(), [
+            '# HELP x_seconds Waqıt.',
+            '# TYPE x_seconds histogram',
+            'x_seconds_bucket{view="post-list",method="GET",le="0.1"} 1',
+            'x_seconds_bucket{view="post-list",method="GET",le="1"} 2',
+            'x_seconds_bucket{view="post-list",method="GET",le="+Inf"} 3',
+            'x_seconds_sum{view="post-list",method="GET"} 2.550000',
+            'x_seconds_count{view="post-list",method="GET"} 3',
+        ])
+
+    @override_settings(PROFILING_SAMPLE_RATE=0)
+    def test_unsampled(self):
+        self.client.get('/api/posts/')
+        self.client.get('/api/posts/999/')
+        lines = self.get_metrics()
+        self.assertIn('http_requests_total{view="post-list",method="GET",status="200"} 1', lines)
+        self.assertIn('http_requests_total{view="post-detail",method="GET",status="404"} 1', lines)
+        self.assertIn('http_request_duration_seconds_count{view="post-list",method="GET"} 1', lines)
+        self.assertFalse([line for line in lines if line.startswith('db_queries_per_request_count')])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1)
+    def test_sampled(self):
+        self.client.get('/api/posts/')
+        lines = self.get_metrics()
+        self.assertIn('db_queries_per_request_count{view="post-list",method="GET"} 1', lines)
+        queries = next(line for line in lines if line.startswith('db_queries_per_request_sum{view="post-list"'))
+        self.assertGreater(float(queries.split()[-1]), 0)
+        self.assertIn('render_duration_seconds_count{view="post-list",method="GET"} 1', lines)
+
+    @override_settings(PROFILING_SAMPLE_RATE=0)
+    def test_armed_profile(self):
+        admin = APIClient()
+        admin.force_authenticate(self.admin)
+        self.assertEqual(admin.post('/api/metrics/slow/', {'requests': 1}, format='json').status_code, 200)
+        self.client.get('/api/posts/')
+        self.client.get('/api/users/')
+
+        slow = admin.get('/api/metrics/slow/').json()
+        self.assertEqual([entry['view'] for entry in slow], ['post-list'])
+        self.assertIn('cumulative', slow[0]['profile'])
+        self.assertIn('queries', slow[0])
+
+    def test_admin_only(self):
+        self.assertEqual(APIClient().get('/api/metrics/').status_code, 401)
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        self.assertEqual(self.client.get('/api/metrics/slow/').status_code, 403)
+        self.assertEqual(self.client.post('/api/metrics/slow/', {'requests': 1}, format='json').status_code, 403)
+        self.assertFalse(profiling.metrics.take_armed())
+
+
+class CursorTests(TestCase):
+    """Jaramsız mánli cursor 404 beredi (500 emes)."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('alice', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def cursor(self, position):
+        data = json.dumps({'p': position, 'r': 0}).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def test_invalid_values(self):
+        positions = (
+            ['garbage', '1'], [None, 1], [[1], [2]], ['2020-01-01T00:00:00', 'x'], [{}, 1], 'ab',
+        )
+        for url in ('/api/posts/', '/api/posts/feed/', '/api/notifications/', '/api/users/search/?q=a'):
+            for position in positions:
+                with self.subTest(url=url, position=position):
+                    separator = '&' if '?' in url else '?'
+                    response = self.client.get(f'{url}{separator}cursor={self.cursor(position)}')
+                    self.assertEqual(response.status_code, 404)
+
+    def test_valid_cursor(self):
+        cursor = self.cursor(['2020-01-01T00:00:00+00:00', '1'])
+        self.assertEqual(self.client.get(f'/api/posts/?cursor={cursor}').status_code, 200)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_VARIANTS_ASYNC=False)
+class NotificationStreamTests(TestCase):
+    """SSE /api/notifications/stream/ (InMemoryBroker menen)."""
+
+    def setUp(self):
+        cache.clear()
+        name = 'avatars/alice.jpg'
+        self.alice = CustomUser.objects.create_user('alice', password='x')
+        CustomUser.objects.filter(pk=self.alice.pk).update(
+            avatar=name, avatar_variants={'source': name, 'small': name, 'thumbnail': name}
+        )
+        self.bob = CustomUser.objects.create_user('bob', password='x')
+        self.notification = Notification.objects.create(sender=self.alice, receiver=self.bob, type='follow')
+
+    def scope(self, token=None):
+        return {
+            'type': 'http',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': realtime.STREAM_PATH,
+            'query_string': f'token={token}'.encode() if token else b'',
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80),
+        }
+
+    def run_stream(self, scope, scenario):
+        """scenario(sent, received, task) - stream isley turıp orınlanadı."""
+        async def main():
+            sent, received = asyncio.Queue(), asyncio.Queue()
+            task = asyncio.ensure_future(realtime.notification_stream(scope, received.get, sent.put))
+            try:
+                await asyncio.wait_for(scenario(sent, received, task), 5)
+            finally:
+                await received.put({'type': 'http.disconnect'})
+                await asyncio.wait_for(task, 5)
+
+        async_to_sync(main)()
+
+    async def body(self, sent):
+        message = await sent.get()
+        return message['body'].decode()
+
+    def test_unauthenticated(self):
+        async def scenario(sent, received, task):
+            start = await sent.get()
+            self.assertEqual(start['status'], 401)
+            await task
+
+        self.run_stream(self.scope(), scenario)
+
+    @mock.patch.object(realtime, 'KEEPALIVE_INTERVAL', 0.05)
+    def test_delivery_keepalive_and_cleanup(self):
+        token = str(AccessToken.for_user(self.bob))
+        broker = realtime.get_broker()
+
+        async def scenario(sent, received, task):
+            self.assertEqual((await sent.get())['status'], 200)
+            self.assertEqual(await self.body(sent), ': connected\n\n')
+            self.assertEqual(await self.body(sent), ': keepalive\n\n')
+            self.assertEqual(broker.listening({self.bob.id}), {self.bob.id})
+
+            await sync_to_async(realtime.publish_notifications)([self.notification.id], [self.bob.id])
+            body = await self.body(sent)
+            while body == ': keepalive\n\n':
+                body = await self.body(sent)
+            event, data = body.strip().split('\n')
+            self.assertEqual(event, 'event: notification')
+            payload = json.loads(data.removeprefix('data: '))
+            self.assertEqual(payload['id'], self.notification.id)
+            self.assertEqual(payload['sender']['avatar'], 'http://testserver/media/avatars/alice.jpg')
+            self.assertTrue(payload['sender']['avatar_variants']['small'].startswith('http://testserver/'))
+
+            await received.put({'type': 'http.disconnect'})
+            await task
+            self.assertEqual(broker.listening({self.bob.id}), set())
+
+        self.run_stream(self.scope(token), scenario)
+
+
+@override_settings(NOTIFICATION_QUEUE_ASYNC=False)
+class NotificationTests(UsersFixture, TestCase):
+    """
+    Aggregation hám oqılmaǵanlar sanı (keshte incr/decr menen júrgiziledi,
+    tek keshte joq bolsa sanaladı).
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.alice)
+
+    def unread(self, queries):
+        with self.assertNumQueries(queries):
+            return self.client.get('/api/notifications/unread-count/').json()['unread_count']
+
+    def emit(self, type, sender):
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatcher.emit(sender_id=sender.id, receiver_id=self.alice.id, type=type, post_id=self.post.id)
+
+    def test_counter(self):
+        self.assertEqual(self.unread(1), 0)
+        self.emit('like', self.bob)
+        self.emit('mention', self.bob)
+        self.assertEqual(self.unread(0), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/notifications/mark-read/', {})
+        self.assertEqual(self.unread(0), 0)
+
+        # Oqılǵan aggregation qatarı jańa hádiyse menen qayta oqılmaǵan boladı
+        carol = CustomUser.objects.create_user('carol', password='x')
+        self.emit('like', carol)
+        self.assertEqual(self.unread(0), 1)
+        self.assertEqual(Notification.objects.filter(receiver=self.alice, is_read=False).count(), 1)
+
+    def test_cascade_delete(self):
+        carol = CustomUser.objects.create_user('carol', password='x')
+        self.emit('like', self.bob)
+        self.emit('comment', carol)
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatcher.emit(sender_id=carol.id, receiver_id=self.alice.id, type='follow')
+        self.assertEqual(self.unread(1), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        self.assertEqual(self.unread(0), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            carol.delete()
+        self.assertEqual(self.unread(0), 0)
+        self.assertFalse(Notification.objects.filter(receiver=self.alice).exists())
+
+    def test_list_etag(self):
+        carol = CustomUser.objects.create_user('carol', password='x')
+        self.emit('like', self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatcher.emit(sender_id=carol.id, receiver_id=self.alice.id, type='follow')
+
+        def etag_changed(etag):
+            response = self.client.get('/api/notifications/', HTTP_IF_NONE_MATCH=etag)
+            return response.status_code == 200, response.get('ETag')
+
+        etag = self.client.get('/api/notifications/')['ETag']
+        self.assertEqual(etag_changed(etag), (False, None))
+
+        # Jiberiwshiniń atı ózgerdi
+        self.bob.username = 'bob2'
+        self.bob.save(update_fields=['username'])
+        changed, etag = etag_changed(etag)
+        self.assertTrue(changed)
+
+        # Eski (sońǵısı emes) notification post penen birge óshirildi
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        changed, etag = etag_changed(etag)
+        self.assertTrue(changed)
+        self.assertEqual(etag_changed(etag), (False, None))
+
+    def test_repeated_comment(self):
+        self.emit('comment', self.bob)
+        notification = Notification.objects.get(receiver=self.alice, type='comment')
+        Notification.objects.filter(pk=notification.pk).update(is_read=True)
+
+        # Sol adamnıń ekinshi kommentariyi de jańa hádiyse: qatar kóteriledi hám oqılmaǵan boladı
+        self.emit('comment', self.bob)
+        updated = Notification.objects.get(pk=notification.pk)
+        self.assertEqual((updated.count, updated.is_read), (2, False))
+        self.assertGreater(updated.created_at, notification.created_at)
+
+        # Like qaytalanıwı sanalmaydı
+        self.emit('like', self.bob)
+        self.emit('like', self.bob)
+        self.assertEqual(Notification.objects.get(receiver=self.alice, type='like').count, 1)
+
+    def test_repeated_like_outside_recent(self):
+        others = [CustomUser.objects.create_user(name, password='x') for name in ('carol', 'dave', 'erin')]
+        for sender in [self.bob, *others]:
+            self.emit('like', sender)
+        # bob sońǵı jiberiwshiler arasında joq, biraq toparda sanalǵan: qayta like count-tı ósirmeydi
+        for _ in range(3):
+            self.emit('like', self.bob)
+        notification = Notification.objects.get(receiver=self.alice, type='like')
+        self.assertEqual(notification.count, 4)
+        self.assertEqual(notification.senders.count(), 4)
+
+
+class RevocationTests(TestCase):
+    """Barlıq token-lardı bıykar etiw: sol sekundta berilgen token da ótpeydi."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user('alice', password='x')
+
+    def test_same_second(self):
+        token = add_user_claims(AccessToken.for_user(self.user), self.user)
+        self.assertNotIn('avatar', token)
+        revoke_user_tokens(self.user.id)
+        revoked_at = CustomUser.objects.get(pk=self.user.pk).tokens_valid_after.timestamp()
+
+        token['iat'] = int(revoked_at)
+        with self.assertRaises(InvalidToken):
+            ensure_not_revoked(token)
+        token['iat'] = int(revoked_at) + 1
+        self.assertEqual(ensure_not_revoked(token), self.user.id)
+
+    @override_settings(CACHES=SHARED_CACHES, SHARED_CACHE_ALIAS='shared')
+    def test_shared_alias(self):
+        token = AccessToken.for_user(self.user)
+        ensure_not_revoked(token)
+        deny_token(token)
+        for key in (f'auth:denied:{token["jti"]}', f'auth:valid_after:{self.user.id}'):
+            self.assertTrue(caches['shared'].has_key(key))
+            self.assertFalse(caches['default'].has_key(key))
+        with self.assertRaises(InvalidToken):
+            ensure_not_revoked(token)
+
+
+@override_settings(WRITE_QUEUE_ENABLED=True, WRITE_QUEUE_TIMEOUT=0.05)
+class WriteQueueTests(TransactionTestCase):
+    """Timeout: baslanbaǵan jazıw bıykar etiledi (503), baslanǵanı tamamlanıwı kútiledi."""
+
+    def test_timeout(self):
+        queue = WriteQueue()
+        started, release = threading.Event(), threading.Event()
+        result = {}
+
+        def block():
+            started.set()
+            release.wait(5)
+            return 'blocked'
+
+        # Writer aǵımın bánt etedi: timeout-tan keyin de nátiyjesi kútiledi
+        thread = threading.Thread(target=lambda: result.setdefault('value', queue.run(block)))
+        thread.start()
+        self.assertTrue(started.wait(5))
+
+        written = []
+        with self.assertRaises(WriteQueueBusy) as raised:
+            queue.run(lambda: written.append(1))
+        self.assertEqual(raised.exception.wait, 1)
+
+        release.set()
+        thread.join(5)
+        queue.flush()
+        self.assertEqual(result, {'value': 'blocked'})
+        self.assertEqual(written, [])
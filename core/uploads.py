@@ -0,0 +1,206 @@
+import os
+import re
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from PIL import Image
+from rest_framework import exceptions, status
+
+from .models import UploadSession
+
+# Pillow formatı -> fayl keńeytpesi
+ALLOWED_FORMATS = {'JPEG': 'jpg', 'MPO': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+# Usınsha bayt kelgende de header oqılmasa, fayl súwret emes dep esaplanadı
+HEADER_LIMIT = 256 * 1024
+# Multipart body-daǵı caption hám boundary-ler ushın qosımsha orın
+MULTIPART_OVERHEAD = 64 * 1024
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadTooLarge(exceptions.APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Fayl júdá úlken."
+
+
+class UploadOffsetMismatch(exceptions.APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "Bólek basqa orınnan baslanıwı kerek."
+
+
+def max_size():
+    return getattr(settings, 'POST_IMAGE_MAX_SIZE', 20 * 1024 * 1024)
+
+
+def max_pixels():
+    return getattr(settings, 'POST_IMAGE_MAX_PIXELS', 40_000_000)
+
+
+def chunk_size():
+    return getattr(settings, 'UPLOAD_CHUNK_SIZE', 64 * 1024)
+
+
+def partial_path(session):
+    directory = getattr(settings, 'UPLOAD_PARTIAL_DIR', None) or os.path.join(
+        tempfile.gettempdir(), 'uploads'
+    )
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'{session.pk}.part')
+
+
+def check_size(size):
+    if size > max_size():
+        raise UploadTooLarge(f"Fayl {max_size()} baytdan aspawı kerek.")
+
+
+def inspect_image(file):
+    """
+    Tek header-di oqıp (piksellerdi decode etpey) (format, width, height) qaytaradı.
+    Header tolıq kelmegen bolsa None. Súwret emes yamasa júdá úlken bolsa ValidationError.
+    """
+    position = file.tell() if hasattr(file, 'tell') else None
+    try:
+        with Image.open(file) as image:
+            image_format, (width, height) = image.format, image.size
+    except Image.DecompressionBombError:
+        raise exceptions.ValidationError({'image': "Súwret ólshemi júdá úlken."})
+    except (OSError, SyntaxError, ValueError):
+        return None
+    finally:
+        if position is not None:
+            file.seek(position)
+
+    if image_format not in ALLOWED_FORMATS:
+        raise exceptions.ValidationError({'image': f"{image_format} formatı qollanılmaydı."})
+    if width * height > max_pixels():
+        raise exceptions.ValidationError(
+            {'image': f"Súwret {max_pixels()} pikselden aspawı kerek ({width}x{height})."}
+        )
+    return image_format, width, height
+
+
+def validate_image_file(file):
+    """Multipart arqalı kelgen súwretti (PostCreateSerializer) tekseredi."""
+    check_size(file.size)
+    try:
+        info = inspect_image(file)
+    except exceptions.ValidationError as error:
+        raise exceptions.ValidationError(error.detail['image'])
+    if info is None:
+        raise exceptions.ValidationError("Súwret oqılmadı.")
+
+
+def start_upload(owner_id, size):
+    check_size(size)
+    session = UploadSession.objects.create(owner_id=owner_id, size=size)
+    open(partial_path(session), 'wb').close()
+    return session
+
+
+def parse_content_range(header, session):
+    """`Content-Range: bytes 0-65535/1048576` -> (start, end) (end óz ishine alınbaydı)."""
+    match = CONTENT_RANGE_RE.match(header or '')
+    if not match:
+        raise exceptions.ValidationError({'detail': "Content-Range header qáte yamasa joq."})
+    start, last, total = (int(value) for value in match.groups())
+    if total != session.size or last < start or last >= total:
+        raise exceptions.ValidationError({'detail': "Content-Range fayl ólshemine sáykes emes."})
+    return start, last + 1
+
+
+def write_chunk(session, stream, content_range):
+    """
+    Request body-ni bóleklep (UPLOAD_CHUNK_SIZE) partial faylǵa jazadı, yadta tolıq
+    saqlamaydı. Baylanıs úzilse kelgen bólegi saqlanadı, client `received`-ten dawam etedi.
+    Header kelgen zamatta súwret ólshemi tekseriledi, jaramsız bolsa upload óshiriledi.
+    """
+    if session.completed:
+        raise exceptions.ValidationError({'detail': "Upload tamamlanǵan."})
+
+    start, end = parse_content_range(content_range, session)
+    if start != session.received:
+        raise UploadOffsetMismatch(f"Bólek {session.received} baytdan baslanıwı kerek.")
+
+    path = partial_path(session)
+    received = start
+    with open(path, 'r+b') as part:
+        part.seek(start)
+        while stream is not None and received < end:
+            data = stream.read(min(chunk_size(), end - received))
+            if not data:
+                break
+            part.write(data)
+            received += len(data)
+        if stream is not None and received == end and stream.read(1):
+            discard_upload(session)
+            raise UploadTooLarge("Body Content-Range-ten úlken.")
+        part.truncate(received)
+
+    updated = UploadSession.objects.filter(pk=session.pk, received=start).update(
+        received=received, updated_at=timezone.now()
+    )
+    if not updated:
+        raise UploadOffsetMismatch("Bul upload-qa basqa request jazıp atır.")
+    session.received = received
+
+    if session.width is None:
+        try:
+            _inspect_partial(session, path)
+        except exceptions.ValidationError:
+            discard_upload(session)
+            raise
+
+    if session.received == session.size:
+        session.completed = True
+    session.save(update_fields=['format', 'width', 'height', 'completed', 'updated_at'])
+    return session
+
+
+def _inspect_partial(session, path):
+    with open(path, 'rb') as part:
+        info = inspect_image(part)
+    if info is None:
+        if session.received >= min(HEADER_LIMIT, session.size):
+            raise exceptions.ValidationError({'image': "Súwret oqılmadı."})
+        return
+    session.format, session.width, session.height = info
+
+
+class PartialUpload(File):
+    """FileSystemStorage bunday faylı qayta oqıp-jazbay, tek ornın ózgertedi (move)."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def completed_upload(owner_id, upload_id):
+    """Tamamlanǵan upload-tı Post.image ushın File retinde qaytaradı."""
+    expires = timezone.now() - timedelta(seconds=getattr(settings, 'UPLOAD_SESSION_TTL', 24 * 60 * 60))
+    session = UploadSession.objects.filter(
+        pk=upload_id, owner_id=owner_id, completed=True, updated_at__gte=expires
+    ).first()
+    if session is None:
+        raise exceptions.ValidationError({'upload_id': "Tamamlanǵan upload tabılmadı."})
+    extension = ALLOWED_FORMATS[session.format]
+    return session, PartialUpload(open(partial_path(session), 'rb'), name=f'{session.pk}.{extension}')
+
+
+def discard_upload(session):
+    try:
+        os.remove(partial_path(session))
+    except FileNotFoundError:
+        pass
+    if session.pk is not None:
+        UploadSession.objects.filter(pk=session.pk).delete()
+
+
+def clear_expired_uploads():
+    expires = timezone.now() - timedelta(seconds=getattr(settings, 'UPLOAD_SESSION_TTL', 24 * 60 * 60))
+    total = 0
+    for session in UploadSession.objects.filter(updated_at__lt=expires).iterator():
+        discard_upload(session)
+        total += 1
+    return total
@@ -1,14 +1,22 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserViewSet, PostViewSet, NotificationViewSet, RegisterView
+from .views import (
+    UserViewSet, PostViewSet, NotificationViewSet, TagViewSet, UploadViewSet, RegisterView, LogoutView,
+    MetricsView, SlowRequestsView,
+)
 
 router = DefaultRouter()
 
 router.register(r'users', UserViewSet, basename='user')
 router.register(r'posts', PostViewSet, basename='post')
 router.register(r'notifications', NotificationViewSet, basename='notification')
+router.register(r'tags', TagViewSet, basename='tag')
+router.register(r'uploads', UploadViewSet, basename='upload')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('auth/register/', RegisterView.as_view(), name='register'),
+    path('auth/logout/', LogoutView.as_view(), name='logout'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('metrics/slow/', SlowRequestsView.as_view(), name='metrics-slow'),
 ]
\ No newline at end of file
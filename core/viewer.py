@@ -0,0 +1,70 @@
+from .models import CustomUser, PostLike
+
+Follow = CustomUser.followers.through
+
+
+class ViewerContext:
+    """
+    Házirgi paydalanıwshınıń (viewer) jaǵdayı: qaysı postlarǵa like basqan,
+    qaysı paydalanıwshılarǵa jazılǵan. Bir bet ushın bir set-based soraw menen esaplanadı,
+    hár obyekt ushın bólek soraw jiberilmeydi.
+    """
+
+    def __init__(self, user):
+        if user is not None and user.is_authenticated:
+            self.user_id = user.id
+        else:
+            self.user_id = None
+        self._liked = {}
+        self._following = {}
+
+    def prime_posts(self, post_ids):
+        """Berilgen postlar ushın like jaǵdayın bir soraw menen júkleydi."""
+        missing = {post_id for post_id in post_ids if post_id not in self._liked}
+        if not missing:
+            return
+        liked = set()
+        if self.user_id is not None:
+            liked = set(PostLike.objects.filter(
+                user_id=self.user_id, post_id__in=missing
+            ).values_list('post_id', flat=True))
+        for post_id in missing:
+            self._liked[post_id] = post_id in liked
+
+    def prime_users(self, user_ids):
+        """Berilgen paydalanıwshılar ushın follow jaǵdayın bir soraw menen júkleydi."""
+        missing = {user_id for user_id in user_ids if user_id not in self._following}
+        missing.discard(self.user_id)
+        if not missing:
+            return
+        following = set()
+        if self.user_id is not None:
+            following = set(Follow.objects.filter(
+                to_customuser_id=self.user_id, from_customuser_id__in=missing
+            ).values_list('from_customuser_id', flat=True))
+        for user_id in missing:
+            self._following[user_id] = user_id in following
+
+    def has_liked(self, post_id):
+        if self.user_id is None:
+            return False
+        self.prime_posts([post_id])
+        return self._liked[post_id]
+
+    def is_following(self, user_id):
+        if self.user_id is None or user_id == self.user_id:
+            return False
+        self.prime_users([user_id])
+        return self._following[user_id]
+
+
+def get_viewer(context):
+    """
+    Serializer context-inen ViewerContext-ti aladı (bolmasa jaratadı).
+    Context nested serializerler menen ulıwma, sonlıqtan bir bet ushın bir ret jaratıladı.
+    """
+    viewer = context.get('viewer')
+    if viewer is None:
+        request = context.get('request')
+        viewer = context['viewer'] = ViewerContext(request.user if request else None)
+    return viewer
@@ -1,47 +1,218 @@
-from django.db.models import Count
-from rest_framework import viewsets, permissions, status, filters, generics
+from django.db.models import Subquery
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import viewsets, mixins, permissions, status, generics
 from rest_framework.decorators import action
-from drf_spectacular.utils import extend_schema
+from rest_framework.pagination import PageNumberPagination
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework.response import Response
 
-from .models import CustomUser, Post, PostLike, PostComment, Notification
+from .models import CustomUser, Post, PostComment, Notification, Hashtag, PostHashtag, UploadSession
 from .serializers import (
     UserSerializer, 
     PostSerializer, 
     PostCreateSerializer,
     CommentSerializer,
     NotificationSerializer,
+    MarkReadSerializer,
+    HashtagSerializer,
+    UploadSessionSerializer,
     RegisterSerializer,
-    ChangePasswordSerializer
+    ChangePasswordSerializer,
+    LogoutSerializer,
+    ProfileRequestsSerializer,
 )
 from .permissions import IsAuthorOrReadOnly
+from .pagination import FeedPagination, KeysetPagination, SearchPagination
+from .search import IndexedSearchFilter, search
+from . import feed as feed_service
+from . import interactions
+from .idempotency import idempotent
+from .notifications import unread_count, change_unread
+from .images import schedule_variants
+from . import uploads
+from .cache import post_cache, user_cache
+from .conditional import ConditionalGetMixin
+from .db_routers import ReplicaReadMixin
+from .write_queue import write_queue
+from .profiling import metrics
+from .fast_serializers import notification_rows, serialize_notifications
+from .authentication import deny_token, revoke_user_tokens
 
 
 
 
+class RankedSearchMixin:
+    """
+    /search/?q=... - indeks boyınsha izlew, eń kóp sáykes kelgenler birinshi.
+    Prefiks boyınsha izleydi (typeahead), (rank, id) keyset paginaciya.
+    """
+
+    @extend_schema(parameters=[OpenApiParameter('q', str, description="Izlew sózleri")])
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        hits = search(self.search_kind, request.query_params.get('q', ''))
+
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(hits, request, view=self)
+
+        results = self.payload_cache.get_many(
+            [hit['object_id'] for hit in page], self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(results)
+
+
+class CachedPayloadMixin(ConditionalGetMixin):
+    """
+    list / retrieve juwapları payload_cache-ten (core/cache.py) alınadı.
+    Bet ushın tek ID-ler (hám validatorlar) oqıladı, keshte joq obyektler bir ret júklenedi.
+    Juwaplarda ETag (hám retrieve ushın Last-Modified) boladı, ózgeris bolmasa 304.
+    ETag payload-tıń kesh versiyasınan hám payload ústine qoyılatuǵın maydanlardan
+    (sanawıshlar, updated_at) esaplanadı - body menen ETag bir derekten.
+    """
+    payload_cache = None
+    # retrieve validatorları: updated_at hám t.b. (payload_cache.volatile_fields qosıp oqıladı)
+    validator_fields = ('updated_at',)
+    # Bet ushın oqılatuǵın maydanlar (keyset paginaciya hám ETag ushın)
+    page_fields = ('updated_at',)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_page(self.filter_queryset(self.get_queryset()))
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            pk = int(self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except ValueError:
+            raise Http404
+        return self.cached_object(pk)
+
+    def cached_object(self, pk):
+        volatile_fields = self.payload_cache.volatile_fields
+        row = self.get_queryset().filter(pk=pk).values(*self.validator_fields, *volatile_fields).first()
+        if row is None:
+            raise Http404
+        last_modified = max(value for value in row.values() if hasattr(value, 'timestamp'))
+        counters = {pk: {field: row[field] for field in volatile_fields}}
+        versions = self.payload_cache.versions([pk])
+
+        def render():
+            results = self.payload_cache.get_many([pk], self.get_serializer_context(), counters, versions)
+            if not results:
+                raise Http404
+            return Response(results[0])
+
+        validators = (*row.values(), versions[pk])
+        return self.conditional_get(self.request, validators, last_modified, render)
+
+    def cached_page(self, queryset):
+        fields = (*self.page_fields, *self.payload_cache.volatile_fields)
+        queryset = queryset.select_related(None).only('id', *fields)
+        page = self.paginate_queryset(queryset)
+        objects = page if page is not None else queryset
+        rows = [{'id': obj.id, **{field: getattr(obj, field) for field in fields}} for obj in objects]
+        # Nomerli betler: jámi san (count, next/previous) da juwapta
+        extra = ()
+        if page is not None and isinstance(self.paginator, PageNumberPagination):
+            extra = (self.paginator.page.paginator.count,)
+        return self.cached_rows(rows, self.paginator if page is not None else None, extra=extra)
+
+    def cached_rows(self, rows, paginator=None, pk_field='id', extra=()):
+        """
+        Bet qatarları (pk_field, page_fields, volatile_fields) boyınsha juwap: payload-lar keshten,
+        sanawıshlar qatarlardan, ETag kesh versiyası, qatar mánleri hám extra (bet maǵlıwmatı) menen.
+        """
+        volatile_fields = self.payload_cache.volatile_fields
+        ids = [row[pk_field] for row in rows]
+        counters = {row[pk_field]: {field: row[field] for field in volatile_fields} for row in rows}
+        versions = self.payload_cache.versions(ids)
+        validators = [(versions[row[pk_field]], *row.values()) for row in rows] + list(extra)
+
+        def render():
+            results = self.payload_cache.get_many(ids, self.get_serializer_context(), counters, versions)
+            if paginator is not None:
+                return paginator.get_paginated_response(results)
+            return Response(results)
+
+        return self.conditional_get(self.request, validators, None, render)
+
+
 class RegisterView(generics.CreateAPIView):
     queryset = CustomUser.objects.all()
     permission_classes = [permissions.AllowAny]
     serializer_class = RegisterSerializer
 
 
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class LogoutView(generics.GenericAPIView):
+    """
+    /api/auth/logout/
+    Házirgi access token hám berilgen refresh token bıykar etiledi (denylist).
+    all=true bolsa paydalanıwshınıń barlıq token-ları bıykar etiledi.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = LogoutSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        if serializer.validated_data['all']:
+            revoke_user_tokens(request.user.id)
+        else:
+            deny_token(request.auth)
+            refresh = serializer.validated_data.get('refresh')
+            if refresh is not None:
+                deny_token(refresh)
+        return Response({"detail": "Siz shıqtıńız."}, status=status.HTTP_200_OK)
+
+
+class MetricsView(generics.GenericAPIView):
+    """
+    /api/metrics/
+    Prometheus formatındaǵı metrikalar (core/profiling.py, PROFILING_ENABLED bolsa).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(responses={200: OpenApiTypes.STR})
+    def get(self, request):
+        return HttpResponse(metrics.expose(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class SlowRequestsView(generics.GenericAPIView):
+    """
+    /api/metrics/slow/
+    GET: eń áste request-ler (SQL / serializer / render bólimleri, profillengen bolsa cProfile).
+    POST: keyingi `requests` request-ti cProfile menen profillew.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = ProfileRequestsSerializer
+
+    @extend_schema(responses={200: None})
+    def get(self, request):
+        return Response(metrics.slowest())
+
+    @extend_schema(responses={200: None})
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        metrics.arm(serializer.validated_data['requests'])
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class UserViewSet(ReplicaReadMixin, CachedPayloadMixin, RankedSearchMixin, viewsets.ReadOnlyModelViewSet):
     """
     Paydalanıwshılardı kóriw hám olarǵa jazılıw (Follow).
     ReadOnly - sebebi paydalanıwshını jaratıw (Register) bólek auth view-da boladı.
     """
-    queryset = CustomUser.objects.all()
+    queryset = CustomUser.objects.order_by('id')
     permission_classes = [permissions.IsAuthenticated]
     
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [IndexedSearchFilter]
     search_fields = ['username', 'first_name', 'last_name']
+    search_kind = 'user'
+    payload_cache = user_cache
+    replica_actions = ('list', 'retrieve', 'me', 'search')
 
-    def get_queryset(self):
-        return CustomUser.objects.annotate(
-            followers_count=Count('followers'),
-            following_count=Count('following')
-        )
-    
     def get_serializer_class(self):
         """
         Hár qıylı action (háreket) ushın hár qıylı serializer qaytarıw.
@@ -58,13 +229,11 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         GET: Óz profilimdi kóriw.
         PATCH: Óz profilimdi (avatar, bio, website) ózgertiw.
         """
-        user = request.user
-        
         if request.method == 'GET':
-            serializer = self.get_serializer(user)
-            return Response(serializer.data)
+            return self.cached_object(request.user.id)
         
         elif request.method == 'PATCH':
+            user = CustomUser.objects.get(pk=request.user.id)
             serializer = self.get_serializer(user, data=request.data, partial=True)
             if serializer.is_valid():
                 serializer.save()
@@ -75,56 +244,71 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     def change_password(self, request):
         """
         /api/users/change-password/
+        Parol ózgergende burınǵı barlıq token-lar (basqa qurılmalardaǵı da) bıykar etiledi.
         """
-        user = request.user
+        user = CustomUser.objects.get(pk=request.user.id)
         serializer = self.get_serializer(data=request.data)
         
         if serializer.is_valid():
             user.set_password(serializer.validated_data['new_password'])
             user.save()
+            revoke_user_tokens(user.id)
             return Response({"detail": "Parol tabıslı ózgertildi."}, status=status.HTTP_200_OK)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     @extend_schema(request=None, responses={200: None})
-    @action(detail=True, methods=['post'], url_path='follow')
+    @action(detail=True, methods=['post', 'put', 'delete'], url_path='follow')
+    @idempotent
     def follow(self, request, pk=None):
-        """Paydalanıwshıǵa jazılıw"""
+        """
+        PUT (yamasa POST): paydalanıwshıǵa jazılıw, DELETE: jazılıwdı bıykar etiw.
+        Idempotent: qayta jiberilgen request jaǵdaydı ózgertpeydi.
+        """
         target_user = self.get_object()
         user = request.user
-        
-        if target_user == user:
+
+        if request.method == 'DELETE':
+            interactions.unfollow(user, target_user)
+            return Response({"detail": "Jazılıw bıykar etildi."}, status=status.HTTP_200_OK)
+
+        if target_user.id == user.id:
             return Response(
                 {"detail": "Óz-ozińizge jazıla almaysız."}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        target_user.followers.add(user)
+        interactions.follow(user, target_user)
         return Response({"detail": "Siz jazıldıńız."}, status=status.HTTP_200_OK)
 
     @extend_schema(request=None, responses={200: None})
     @action(detail=True, methods=['post'])
+    @idempotent
     def unfollow(self, request, pk=None):
-        """Jazılıwdı bıykar etiw"""
-        target_user = self.get_object()
-        user = request.user
-        target_user.followers.remove(user)
+        """Jazılıwdı bıykar etiw (DELETE follow/ menen birdey)"""
+        interactions.unfollow(request.user, self.get_object())
         return Response({"detail": "Jazılıw bıykar etildi."}, status=status.HTTP_200_OK)
     
     
     
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ReplicaReadMixin, CachedPayloadMixin, RankedSearchMixin, viewsets.ModelViewSet):
     """
     Postlar menen islesiw (CRUD), Feed, Like hám Kommentariy.
     """
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [IndexedSearchFilter]
     search_fields = ['caption']
+    search_kind = 'post'
+    pagination_class = KeysetPagination
+    payload_cache = post_cache
+    validator_fields = ('updated_at', 'author__updated_at')
+    page_fields = ('created_at', 'updated_at')
+    replica_actions = ('list', 'retrieve', 'feed', 'search', 'comments')
 
     def get_serializer_class(self):
         if self.action == 'create':
             return PostCreateSerializer
-        elif self.action == 'comment':
+        elif self.action in ['comment', 'comments']:
             return CommentSerializer
         return PostSerializer
     
@@ -138,50 +322,71 @@ class PostViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated()]
 
     def get_queryset(self):
-        return Post.objects.select_related('author').prefetch_related(
-            'comments', 'comments__user'
-        ).annotate(
-            likes_count=Count('likes'),
-            comments_count=Count('comments')
-        ).order_by('-created_at')
+        return Post.objects.select_related('author').order_by('-created_at')
+
+    def create(self, request, *args, **kwargs):
+        # Júdá úlken multipart body-ni oqımay turıp qaytaramız
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if content_length > uploads.max_size() + uploads.MULTIPART_OVERHEAD:
+            raise uploads.UploadTooLarge()
+        return super().create(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        post = serializer.save(author_id=self.request.user.id)
+        feed_service.fan_out_post(post)
+        schedule_variants(post)
 
     @action(detail=False, methods=['get'])
     def feed(self, request):
         """
         News Feed: Tek men jazılǵan (follow qılǵan) adamlardıń postları.
+        Postlar aldınnan FeedItem-ge tarqatılǵan, populyar avtorlar bólek oqıladı.
+        Bet (created_at, post_id) boyınsha keyset, hár derek indeks diapazonı.
         """
-        user = request.user
-        following_ids = user.following.values_list('id', flat=True)
-        
-        posts = self.get_queryset().filter(author_id__in=following_ids)
-        
-        page = self.paginate_queryset(posts)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-
-        serializer = self.get_serializer(posts, many=True)
-        return Response(serializer.data)
+        fields = [field for field in (*self.page_fields, *post_cache.volatile_fields) if field != 'created_at']
+        paginator = FeedPagination()
+        rows = paginator.paginate_queryset(
+            feed_service.feed_sources(request.user, fields), request, view=self
+        )
+        return self.cached_rows(rows, paginator, pk_field='post_id')
 
-    @extend_schema(request=None, responses={200: None})
-    @action(detail=True, methods=['post'])
+    @extend_schema(request=None, responses={200: None, 201: None})
+    @action(detail=True, methods=['post', 'put', 'delete'])
+    @idempotent
     def like(self, request, pk=None):
-        """Like basıw yamasa qaytarıp alıw (Toggle)"""
+        """
+        PUT: like basıw (201 - jańa, 200 - aldın basılǵan), DELETE: like alıw.
+        POST: toggle (eski klientler ushın). Hár biri bir shártli jazıw, parallel request-ler qáte bermeydi.
+        """
         post = self.get_object()
-        user = request.user
+        user_id = request.user.id
 
-        like_obj = PostLike.objects.filter(user=user, post=post).first()
-        if like_obj:
-            like_obj.delete()
+        if request.method == 'PUT':
+            created = write_queue.run(lambda: interactions.like(user_id, post))
+            return Response(
+                {"detail": "Like basıldı.", "is_liked": True},
+                status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+            )
+        if request.method == 'DELETE':
+            write_queue.run(lambda: interactions.unlike(user_id, post))
+            return Response({"detail": "Like alındı.", "is_liked": False}, status=status.HTTP_200_OK)
+
+        if not write_queue.run(lambda: interactions.toggle_like(user_id, post)):
             return Response({"detail": "Like alındı."}, status=status.HTTP_200_OK)
-        
-        PostLike.objects.create(user=user, post=post)
         return Response({"detail": "Like basıldı."}, status=status.HTTP_201_CREATED)
 
+    @action(detail=True, methods=['get'])
+    def comments(self, request, pk=None):
+        """Posttıń barlıq kommentariyleri (jańaları birinshi)"""
+        post = self.get_object()
+        comments = PostComment.objects.filter(post=post).select_related('user')
+
+        page = self.paginate_queryset(comments)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=['post'])
+    @idempotent
     def comment(self, request, pk=None):
         """Postqa kommentariy qaldırıw"""
         post = self.get_object()
@@ -189,16 +394,134 @@ class PostViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         
         if serializer.is_valid():
-            serializer.save(user=user, post=post)
+            write_queue.run(lambda: serializer.save(user_id=user.id, post=post))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+class NotificationViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    replica_actions = ('list', 'unread_count')
+
+    def list(self, request, *args, **kwargs):
+        """
+        ETag: bettiń qatarları (id, created_at, count, is_read - aggregation hám mark-read ózgertedi;
+        indeks boyınsha tek usı maydanlar), jiberiwshilerdiń kesh versiyaları (atı, avatarı) hám
+        keshtegi oqılmaǵanlar sanı. Ózgeris bolmasa 304, notification maǵlıwmatları oqılmaydı.
+        """
+        rows = self.paginate_queryset(
+            self.get_queryset().select_related(None).values('id', 'created_at', 'count', 'is_read', 'sender_id')
+        )
+        ids = [row['id'] for row in rows]
+        senders = user_cache.versions({row['sender_id'] for row in rows})
+        validators = ([tuple(row.values()) for row in rows], sorted(senders.items()), unread_count(request.user.id))
+
+        def render():
+            notifications = {row['id']: row for row in notification_rows(self.get_queryset().filter(pk__in=ids))}
+            page = [notifications[pk] for pk in ids if pk in notifications]
+            return self.get_paginated_response(serialize_notifications(page, request))
+
+        return self.conditional_get(request, validators, None, render)
 
     def get_queryset(self):
         return Notification.objects.filter(
-            receiver=self.request.user
-        ).select_related('sender', 'post').order_by('-created_at')
\ No newline at end of file
+            receiver_id=self.request.user.id
+        ).select_related('sender', 'post').order_by('-created_at')
+
+    def get_serializer_class(self):
+        if self.action == 'mark_read':
+            return MarkReadSerializer
+        return NotificationSerializer
+
+    @extend_schema(responses={200: None})
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        """
+        /api/notifications/unread-count/
+        Oqılmaǵan notification-lar sanı (badge ushın, keshten).
+        """
+        return Response({"unread_count": unread_count(request.user.id)})
+
+    @extend_schema(responses={200: None})
+    @action(detail=False, methods=['post'], url_path='mark-read')
+    def mark_read(self, request):
+        """
+        /api/notifications/mark-read/
+        up_to notification-ǵa shekemgi (óz ishine alıp) barlıq notification-lardı
+        bir UPDATE menen oqılǵan dep belgileydi.
+        """
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        notifications = Notification.objects.filter(receiver_id=request.user.id, is_read=False)
+        up_to = serializer.validated_data.get('up_to')
+        if up_to is not None:
+            notifications = notifications.filter(created_at__lte=Subquery(
+                Notification.objects.filter(pk=up_to, receiver_id=request.user.id).values('created_at')
+            ))
+
+        updated = notifications.update(is_read=True)
+        change_unread({request.user.id: -updated})
+        return Response({"updated": updated}, status=status.HTTP_200_OK)
+
+
+class UploadViewSet(mixins.CreateModelMixin,
+                    mixins.RetrieveModelMixin,
+                    mixins.DestroyModelMixin,
+                    viewsets.GenericViewSet):
+    """
+    Úlken súwretlerdi bólip (resumable) júklew:
+    POST /api/uploads/ {"size": ...} -> upload id
+    PUT /api/uploads/<id>/ (Content-Range: bytes start-end/size, body - bólek baytları)
+    GET /api/uploads/<id>/ -> `received` (úzilgen jerden dawam etiw ushın)
+    Sońınan POST /api/posts/ {"upload_id": ..., "caption": ...}
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(owner_id=self.request.user.id)
+
+    def perform_create(self, serializer):
+        serializer.instance = uploads.start_upload(self.request.user.id, serializer.validated_data['size'])
+
+    @extend_schema(request={'application/octet-stream': OpenApiTypes.BINARY})
+    def update(self, request, pk=None):
+        # request.data-ǵa tiymeymiz: body parser arqalı yadqa oqılmaydı, aǵım (stream) retinde jazıladı
+        session = uploads.write_chunk(
+            self.get_object(), request.stream, request.META.get('HTTP_CONTENT_RANGE')
+        )
+        return Response(self.get_serializer(session).data)
+
+    def perform_destroy(self, instance):
+        uploads.discard_upload(instance)
+
+
+class TagViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Hashtag-ler: eń kóp qollanılǵanları birinshi (posts_count boyınsha).
+    /api/tags/<tag>/posts/ - usı tegtegi postlar (jańaları birinshi).
+    """
+    queryset = Hashtag.objects.order_by('-posts_count', 'name')
+    serializer_class = HashtagSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_field = 'name'
+    lookup_value_regex = '[^/]+'
+
+    def get_object(self):
+        return get_object_or_404(Hashtag, name=self.kwargs['name'].casefold())
+
+    @extend_schema(responses={200: PostSerializer(many=True)})
+    @action(detail=True, methods=['get'])
+    def posts(self, request, name=None):
+        hashtag = self.get_object()
+        links = PostHashtag.objects.filter(hashtag=hashtag).values('id', 'post_id', 'created_at')
+
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(links, request, view=self)
+
+        results = post_cache.get_many([link['post_id'] for link in page], self.get_serializer_context())
+        return paginator.get_paginated_response(results)
\ No newline at end of file
@@ -0,0 +1,144 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from rest_framework import exceptions, status
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueueBusy(exceptions.APIException):
+    """Jazıw náwbette timeout-qa shekem baslanbadı hám bıykar etildi - hesh nárse jazılmadı."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Server bánt, birazdan qayta urınıp kóriń."
+
+    def __init__(self, wait):
+        super().__init__()
+        # DRF exception handler Retry-After header-in qoyadı
+        self.wait = wait
+
+
+class WriteQueue:
+    """
+    SQLite ushın jazıwlardı bir aǵımǵa (writer thread) jıynaydı.
+    SQLite-te bir waqıtta tek bir jazıwshı bola aladı: request-ler bir-birin kútip
+    `database is locked` alǵannıń ornına kishi jazıwlar (like, kommentariy) náwbetke qoyıladı
+    hám writer olardı bir transaction-ǵa toplap jazadı (hár biri óz savepoint-ında,
+    biriniń qáteligi basqaların qaytarmaydı). Bir commit - bir fsync.
+    WRITE_QUEUE_ENABLED = False bolsa funkciya sol aǵımda transaction.atomic() ishinde orınlanadı.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'WRITE_QUEUE_ENABLED', False)
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'WRITE_QUEUE_BATCH_SIZE', 100)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'WRITE_QUEUE_FLUSH_INTERVAL', 0.005)
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'WRITE_QUEUE_TIMEOUT', 10)
+
+    @property
+    def retry_after(self):
+        return getattr(settings, 'WRITE_QUEUE_RETRY_AFTER', 1)
+
+    def run(self, func):
+        """
+        func()-ti jazıw transaction-ında orınlap nátiyjesin qaytaradı (qáteligin kóteredi).
+        Shaqırıwshı ózi transaction ishinde bolsa náwbet qollanılmaydı: writer aǵımı
+        commit qılınbaǵan maǵlıwmattı kórmeydi.
+        Timeout-ta jazıw ele baslanbaǵan bolsa ol bıykar etilip WriteQueueBusy (503, Retry-After)
+        kóteriledi; baslanıp qoyǵan bolsa (commit bolıwı múmkin) tamamlanıwı kútiledi.
+        """
+        if not self.enabled or connection.in_atomic_block:
+            with transaction.atomic():
+                return func()
+
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((func, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise WriteQueueBusy(wait=self.retry_after)
+            return future.result()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='write-queue', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batch)
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        results = []
+        try:
+            with transaction.atomic():
+                for func, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with transaction.atomic():
+                            results.append((future, func(), None))
+                    except Exception as exc:
+                        results.append((future, None, exc))
+        except Exception as exc:
+            # Commit ámelge aspadı: toptaǵı hesh bir jazıw saqlanbadı
+            logger.exception("Jazıw topları saqlanbadı (%d jazıw).", len(batch))
+            for func, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for future, result, exc in results:
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+    def flush(self):
+        """Náwbettegi barlıq jazıwlar orınlanǵansha kútedi."""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.join()
+
+
+write_queue = WriteQueue()
+atexit.register(write_queue.flush)